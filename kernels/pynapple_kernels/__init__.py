@@ -0,0 +1,244 @@
+"""
+Compiled kernels for pynapple.
+
+This package holds C versions of the loops that pynapple compiles with numba
+(`core/_jitted_functions.py`, `process/_process_functions.py` and
+`process/correlograms._cross_correlogram`). It is meant for platforms where numba is
+not available, e.g. Pyodide. The extension only relies on the buffer protocol of
+CPython and builds both natively and with Emscripten.
+
+The functions below have the signature and the outputs of the pynapple function they
+replace. pynapple uses them automatically when this package is installed.
+"""
+
+import numpy as np
+
+from . import _kernels
+
+__version__ = "0.8.5"
+
+__all__ = [
+    "restrict",
+    "restrict_with_count",
+    "value_from",
+    "in_interval",
+    "remove_nan",
+    "threshold",
+    "intersect",
+    "union",
+    "diff",
+    "union_isets",
+    "fix_iset",
+    "cross_correlogram",
+    "continuous_perievent",
+    "perievent_trigger_average",
+]
+
+
+def _f64(array):
+    return np.ascontiguousarray(array, dtype=np.float64)
+
+
+def _i64(array):
+    return np.ascontiguousarray(array, dtype=np.int64)
+
+
+################################
+# Time only functions
+################################
+def restrict_with_count(time_array, starts, ends, dtype=np.int64):
+    time_array, starts, ends = _f64(time_array), _f64(starts), _f64(ends)
+    ix = np.empty(len(time_array), dtype=np.int64)
+    count = np.zeros(len(starts), dtype=np.int64)
+    x = _kernels.restrict(time_array, starts, ends, ix, count)
+    return ix[0:x], count.astype(dtype, copy=False)
+
+
+def restrict(time_array, starts, ends):
+    return restrict_with_count(time_array, starts, ends)[0]
+
+
+def value_from(time_array, time_target_array, count, count_target, starts, mode):
+    time_array = _f64(time_array)
+    idx = np.full(len(time_array), np.nan)
+    _kernels.value_from(
+        time_array,
+        _f64(time_target_array),
+        _i64(count),
+        _i64(count_target),
+        int(mode),
+        idx,
+    )
+    return idx
+
+
+def in_interval(time_array, starts, ends):
+    time_array = _f64(time_array)
+    data = np.full(len(time_array), np.nan)
+    _kernels.in_interval(time_array, _f64(starts), _f64(ends), data)
+    return data
+
+
+def remove_nan(time_array, index_nan):
+    index_nan = np.asarray(index_nan, dtype=bool)
+    valid = ~index_nan
+    ix_start = valid & np.concatenate(([True], index_nan[:-1]))
+    ix_end = valid & np.concatenate((index_nan[1:], [True]))
+    return time_array[ix_start], time_array[ix_end]
+
+
+################################
+# Time Data functions
+################################
+def threshold(time_array, data_array, starts, ends, thr, method="above"):
+    if method == "above":
+        ix = data_array > thr
+    elif method == "below":
+        ix = data_array < thr
+    elif method == "aboveequal":
+        ix = data_array >= thr
+    elif method == "belowequal":
+        ix = data_array <= thr
+
+    n = len(time_array)
+    ix_start = np.zeros(n, dtype=np.uint8)
+    ix_end = np.zeros(n, dtype=np.uint8)
+    new_start = np.zeros(n, dtype=np.float64)
+    new_end = np.zeros(n, dtype=np.float64)
+    _kernels.threshold(
+        _f64(time_array),
+        np.ascontiguousarray(ix, dtype=np.uint8),
+        _f64(starts),
+        _f64(ends),
+        ix_start,
+        ix_end,
+        new_start,
+        new_end,
+    )
+    return (
+        time_array[ix],
+        data_array[ix],
+        new_start[ix_start.view(bool)],
+        new_end[ix_end.view(bool)],
+    )
+
+
+################################
+# IntervalSet functions
+################################
+def _set_operation(func, start1, end1, start2, end2, meta_shape=None):
+    size = len(start1) + len(start2)
+    newstart = np.zeros(size, dtype=np.float64)
+    newend = np.zeros(size, dtype=np.float64)
+    args = [_f64(start1), _f64(end1), _f64(start2), _f64(end2), newstart, newend]
+    if meta_shape is not None:
+        newmeta = np.zeros((size, *meta_shape), dtype=np.int32)
+        ct = func(*args, newmeta)
+        return newstart[0:ct], newend[0:ct], newmeta[0:ct]
+    ct = func(*args)
+    return newstart[0:ct], newend[0:ct]
+
+
+def intersect(start1, end1, start2, end2):
+    return _set_operation(_kernels.intersect, start1, end1, start2, end2, (2,))
+
+
+def union(start1, end1, start2, end2):
+    return _set_operation(_kernels.union, start1, end1, start2, end2)
+
+
+def diff(start1, end1, start2, end2):
+    return _set_operation(_kernels.diff, start1, end1, start2, end2, ())
+
+
+def union_isets(starts, ends):
+    idx = np.argsort(starts)
+    starts = _f64(starts[idx])
+    ends = _f64(ends[idx])
+    new_start = np.zeros(len(starts), dtype=np.float64)
+    new_end = np.zeros(len(starts), dtype=np.float64)
+    ct = _kernels.union_isets(starts, ends, new_start, new_end)
+    return new_start[0:ct], new_end[0:ct]
+
+
+def fix_iset(start, end):
+    data = np.zeros((len(start), 2), dtype=np.float64)
+    to_warn = np.zeros(4, dtype=np.uint8)
+    ct = _kernels.fix_iset(_f64(start), _f64(end), data, to_warn)
+    return data[0:ct], to_warn.view(bool)
+
+
+################################
+# Process functions
+################################
+def cross_correlogram(t1, t2, binsize, windowsize):
+    nbins = int((windowsize * 2) // binsize)
+    if np.floor(nbins / 2) * 2 == nbins:
+        nbins = nbins + 1
+
+    w = (nbins / 2) * binsize
+    C = np.zeros(nbins)
+    _kernels.cross_correlogram(_f64(t1), _f64(t2), float(binsize), float(w), C)
+    C = C / (len(t1) * binsize)
+
+    B = (-w + binsize / 2) + np.arange(nbins) * binsize
+    return C, B
+
+
+def continuous_perievent(time_array, time_target_array, starts, ends, windowsize):
+    idx, count_target = restrict_with_count(time_target_array, starts, ends)
+    time_target_array = _f64(time_target_array)[idx]
+
+    idx, count = restrict_with_count(time_array, starts, ends)
+    time_array = _f64(time_array)[idx]
+
+    N_target = len(time_target_array)
+    slice_idx = np.zeros((N_target, 2), dtype=np.int64)
+    start_w = np.zeros(N_target, dtype=np.int64)
+    _kernels.continuous_perievent(
+        time_array,
+        time_target_array,
+        count,
+        count_target,
+        int(windowsize[0]),
+        int(windowsize[1]),
+        slice_idx,
+        start_w,
+    )
+    return idx, slice_idx, np.sum(count_target), start_w
+
+
+def perievent_trigger_average(
+    time_array,
+    count_array,
+    time_target_array,
+    data_target_array,
+    starts,
+    ends,
+    windows,
+    binsize,
+):
+    idx, count = restrict_with_count(time_target_array, starts, ends)
+    time_target_array = _f64(time_target_array)[idx]
+    data_target_array = np.asarray(data_target_array)[idx]
+
+    shape = data_target_array.shape[1:]
+    data = _f64(data_target_array.reshape(len(idx), -1))
+    counts = _f64(count_array)
+    W = int(windows.sum()) + 1
+    new_data_array = np.zeros((W, counts.shape[1], data.shape[1]))
+    _kernels.perievent_trigger_average(
+        _f64(time_array),
+        counts,
+        counts.shape[1],
+        time_target_array,
+        data,
+        data.shape[1],
+        count,
+        _f64(ends),
+        int(windows[1]),
+        float(binsize),
+        new_data_array,
+        W,
+    )
+    return new_data_array.reshape((W, counts.shape[1], *shape))
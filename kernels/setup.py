@@ -0,0 +1,7 @@
+from setuptools import Extension, setup
+
+setup(
+    ext_modules=[
+        Extension("pynapple_kernels._kernels", sources=["src/_kernels.c"]),
+    ]
+)
@@ -0,0 +1,930 @@
+/*
+ * C versions of the loops of pynapple that are compiled with numba upstream.
+ *
+ * The module only uses the buffer protocol of CPython: the arrays are allocated
+ * and converted (float64, int64, uint8, C-contiguous) by `pynapple_kernels/__init__.py`
+ * and the functions below fill the output buffers. It does not depend on the NumPy
+ * C-API, so that the same source builds natively and with Emscripten (Pyodide).
+ *
+ * Each function follows the loop of the Python function of the same name in pynapple.
+ * Inputs that would make the Python version fail (e.g. empty time arrays) return
+ * empty results instead of reading out of bounds.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+#include <string.h>
+#include <stdint.h>
+
+#define LEN(buf, type) ((buf).len / (Py_ssize_t)sizeof(type))
+
+static double
+round9(double x)
+{
+    /* np.round(x, 9) */
+    return rint(x * 1e9) / 1e9;
+}
+
+static double
+max2(double a, double b)
+{
+    /* Python max(a, b) */
+    return (b > a) ? b : a;
+}
+
+static double
+min2(double a, double b)
+{
+    /* Python min(a, b) */
+    return (b < a) ? b : a;
+}
+
+/* ------------------------------------------------------------------------ */
+/* Time only functions                                                       */
+/* ------------------------------------------------------------------------ */
+
+static Py_ssize_t
+restrict_(const double *time, Py_ssize_t n, const double *starts,
+          const double *ends, Py_ssize_t m, int64_t *ix, int64_t *count)
+{
+    Py_ssize_t k = 0, t = 0, x = 0;
+
+    if (n == 0 || m == 0)
+        return 0;
+
+    while (k < m && ends[k] < time[0])
+        k++;
+
+    while (k < m) {
+        /* Outside */
+        while (t < n && time[t] < starts[k])
+            t++;
+        /* Inside */
+        while (t < n) {
+            if (time[t] > ends[k]) {
+                k++;
+                break;
+            }
+            ix[x++] = t;
+            count[k]++;
+            t++;
+        }
+        if (t == n)
+            break;
+    }
+    return x;
+}
+
+static void
+value_from_(const double *time, Py_ssize_t n, const double *target, Py_ssize_t d,
+            const int64_t *count, const int64_t *count_target, Py_ssize_t m,
+            int mode, double *idx)
+{
+    Py_ssize_t k, t, i, maxt, maxi, t0 = 0, i0 = 0;
+    double interval, new_interval;
+    int break_cond, nan_cond = 0;
+
+    if (n == 0 || d == 0)
+        return;
+
+    for (k = 0; k < m; t0 += count[k], i0 += count_target[k], k++) {
+        if (count[k] <= 0 || count_target[k] <= 0)
+            continue;
+        t = t0;
+        i = i0;
+        maxt = t + count[k];
+        maxi = i + count_target[k];
+        while (t < maxt) {
+            if (mode != 1)
+                interval = target[i] - time[t];
+            else
+                interval = fabs(target[i] - time[t]);
+
+            idx[t] = (double)i;
+            i++;
+            while (i < maxi) {
+                if (mode != 1) {
+                    new_interval = target[i] - time[t];
+                    if (mode == 0) {
+                        break_cond = ((new_interval > 0) && (interval <= 0)) ||
+                                     (interval >= 0);
+                        nan_cond = interval > 0;
+                    }
+                    else {
+                        break_cond = ((new_interval < 0) && (interval >= 0)) ||
+                                     (interval >= 0);
+                        nan_cond = new_interval < 0;
+                    }
+                }
+                else {
+                    new_interval = fabs(target[i] - time[t]);
+                    break_cond = new_interval > interval;
+                    nan_cond = 0;
+                }
+                if (break_cond) {
+                    if (nan_cond)
+                        idx[t] = NAN;
+                    break;
+                }
+                idx[t] = (double)i;
+                interval = new_interval;
+                i++;
+            }
+            if (i == maxi) {
+                if (mode == 2)
+                    nan_cond = (target[i - 1] - time[t]) < 0;
+                if (nan_cond)
+                    idx[t] = NAN;
+            }
+            i--;
+            t++;
+        }
+    }
+}
+
+static void
+in_interval_(const double *time, Py_ssize_t n, const double *starts,
+             const double *ends, Py_ssize_t m, double *data)
+{
+    Py_ssize_t k = 0, t = 0;
+
+    if (n == 0 || m == 0)
+        return;
+
+    while (k < m && ends[k] < time[0])
+        k++;
+
+    while (k < m) {
+        while (t < n && time[t] < starts[k])
+            t++;
+        while (t < n) {
+            if (time[t] > ends[k]) {
+                k++;
+                break;
+            }
+            data[t] = (double)k;
+            t++;
+        }
+        if (t == n)
+            break;
+    }
+}
+
+/* ------------------------------------------------------------------------ */
+/* Time Data functions                                                       */
+/* ------------------------------------------------------------------------ */
+
+static void
+threshold_(const double *time, const uint8_t *ix, Py_ssize_t n,
+           const double *starts, const double *ends, Py_ssize_t m,
+           uint8_t *ix_start, uint8_t *ix_end, double *new_start, double *new_end)
+{
+    Py_ssize_t k = 0, t = 0;
+
+    if (n == 0)
+        return;
+
+    while (k < m && time[0] < starts[k])
+        k++;
+
+    if (ix[0]) {
+        ix_start[0] = 1;
+        new_start[0] = time[0];
+    }
+    if (n == 1) {
+        if (ix[0]) {
+            ix_end[0] = 1;
+            new_end[0] = time[0];
+        }
+        return;
+    }
+
+    t = 1;
+    while (t < n - 1) {
+        if (k < m && time[t] > ends[k]) {
+            /* transition */
+            k++;
+            if (ix[t - 1]) {
+                ix_end[t - 1] = 1;
+                new_end[t - 1] = time[t - 1];
+            }
+            if (ix[t]) {
+                ix_start[t] = 1;
+                new_start[t] = time[t];
+            }
+        }
+        else {
+            if (!ix[t - 1] && ix[t]) {
+                ix_start[t] = 1;
+                new_start[t] = time[t] - (time[t] - time[t - 1]) / 2;
+            }
+            if (ix[t - 1] && !ix[t]) {
+                ix_end[t] = 1;
+                new_end[t] = time[t] - (time[t] - time[t - 1]) / 2;
+            }
+        }
+        t++;
+    }
+
+    if (ix[t] && ix[t - 1]) {
+        ix_end[t] = 1;
+        new_end[t] = time[t];
+    }
+    if (ix[t] && !ix[t - 1]) {
+        ix_start[t] = 1;
+        ix_end[t] = 1;
+        new_start[t] = time[t] - (time[t] - time[t - 1]) / 2;
+        new_end[t] = time[t];
+    }
+    else if (ix[t - 1] && !ix[t]) {
+        ix_end[t] = 1;
+        new_end[t] = time[t] - (time[t] - time[t - 1]) / 2;
+    }
+}
+
+/* ------------------------------------------------------------------------ */
+/* IntervalSet functions                                                     */
+/* ------------------------------------------------------------------------ */
+
+static Py_ssize_t
+intersect_(const double *start1, const double *end1, Py_ssize_t m,
+           const double *start2, const double *end2, Py_ssize_t n,
+           double *newstart, double *newend, int32_t *newmeta)
+{
+    Py_ssize_t i = 0, j = 0, ct = 0;
+
+    while (i < m) {
+        while (j < n && !(end2[j] > start1[i]))
+            j++;
+        if (j == n)
+            break;
+        if (start2[j] < end1[i]) {
+            newstart[ct] = max2(start1[i], start2[j]);
+            newend[ct] = min2(end1[i], end2[j]);
+            newmeta[2 * ct] = (int32_t)i;
+            newmeta[2 * ct + 1] = (int32_t)j;
+            ct++;
+            if (end2[j] < end1[i])
+                j++;
+            else
+                i++;
+        }
+        else {
+            i++;
+        }
+    }
+    return ct;
+}
+
+static Py_ssize_t
+union_(const double *start1, const double *end1, Py_ssize_t m,
+       const double *start2, const double *end2, Py_ssize_t n,
+       double *newstart, double *newend)
+{
+    Py_ssize_t i = 0, j = 0, ct = 0;
+
+    while (i < m) {
+        while (j < n) {
+            if (end2[j] > start1[i])
+                break;
+            newstart[ct] = start2[j];
+            newend[ct] = end2[j];
+            ct++;
+            j++;
+        }
+        if (j == n)
+            break;
+
+        if (start2[j] < end1[i]) {
+            newstart[ct] = min2(start1[i], start2[j]);
+            while (i < m && j < n) {
+                newend[ct] = max2(end1[i], end2[j]);
+                if (end1[i] < end2[j])
+                    i++;
+                else
+                    j++;
+                if (i == m) {
+                    j++;
+                    ct++;
+                    break;
+                }
+                if (j == n) {
+                    i++;
+                    ct++;
+                    break;
+                }
+                if (end2[j] < start1[i]) {
+                    j++;
+                    ct++;
+                    break;
+                }
+                else if (end1[i] < start2[j]) {
+                    i++;
+                    ct++;
+                    break;
+                }
+            }
+        }
+        else {
+            newstart[ct] = start1[i];
+            newend[ct] = end1[i];
+            ct++;
+            i++;
+        }
+    }
+    while (i < m) {
+        newstart[ct] = start1[i];
+        newend[ct] = end1[i];
+        ct++;
+        i++;
+    }
+    while (j < n) {
+        newstart[ct] = start2[j];
+        newend[ct] = end2[j];
+        ct++;
+        j++;
+    }
+    return ct;
+}
+
+static Py_ssize_t
+diff_(const double *start1, const double *end1, Py_ssize_t m,
+      const double *start2, const double *end2, Py_ssize_t n,
+      double *newstart, double *newend, int32_t *newmeta)
+{
+    Py_ssize_t i = 0, j = 0, ct = 0;
+
+    while (i < m) {
+        while (j < n && !(end2[j] > start1[i]))
+            j++;
+        if (j == n)
+            break;
+
+        if (start2[j] < end1[i]) {
+            if (start2[j] < start1[i] && end1[i] < end2[j]) {
+                /* set 1 interval completely within set 2 interval */
+                i++;
+            }
+            else {
+                if (start2[j] > start1[i]) {
+                    newstart[ct] = start1[i];
+                    newend[ct] = start2[j];
+                    newmeta[ct] = (int32_t)i;
+                    ct++;
+                    j++;
+                }
+                else {
+                    newstart[ct] = end2[j];
+                    newend[ct] = end1[i];
+                    newmeta[ct] = (int32_t)i;
+                    j++;
+                }
+                while (j < n && start2[j] < end1[i]) {
+                    newstart[ct] = end2[j - 1];
+                    newend[ct] = start2[j];
+                    newmeta[ct] = (int32_t)i;
+                    ct++;
+                    j++;
+                }
+                if (end2[j - 1] < end1[i]) {
+                    newstart[ct] = end2[j - 1];
+                    newend[ct] = end1[i];
+                    newmeta[ct] = (int32_t)i;
+                    ct++;
+                }
+                else {
+                    j--;
+                }
+                i++;
+            }
+        }
+        else {
+            newstart[ct] = start1[i];
+            newend[ct] = end1[i];
+            newmeta[ct] = (int32_t)i;
+            ct++;
+            i++;
+        }
+    }
+    while (i < m) {
+        newstart[ct] = start1[i];
+        newend[ct] = end1[i];
+        newmeta[ct] = (int32_t)i;
+        ct++;
+        i++;
+    }
+    return ct;
+}
+
+static Py_ssize_t
+union_isets_(const double *starts, const double *ends, Py_ssize_t n,
+             double *new_start, double *new_end)
+{
+    Py_ssize_t i, ct = 0;
+    double e;
+
+    if (n == 0)
+        return 0;
+
+    new_start[0] = starts[0];
+    e = ends[0];
+    for (i = 1; i < n; i++) {
+        if (starts[i] > e) {
+            new_end[ct] = e;
+            ct++;
+            new_start[ct] = starts[i];
+            e = ends[i];
+        }
+        else {
+            e = max2(e, ends[i]);
+        }
+    }
+    new_end[ct] = e;
+    return ct + 1;
+}
+
+static Py_ssize_t
+fix_iset_(const double *start, const double *end, Py_ssize_t m, double *data,
+          uint8_t *to_warn)
+{
+    Py_ssize_t i = 0, ct = 0;
+    double newstart, newend;
+
+    while (i < m) {
+        newstart = start[i];
+        newend = end[i];
+
+        while (i < m) {
+            if (end[i] == start[i]) {
+                to_warn[3] = 1;
+                i++;
+            }
+            else {
+                newstart = start[i];
+                newend = end[i];
+                break;
+            }
+        }
+        while (i < m) {
+            if (end[i] < start[i]) {
+                to_warn[1] = 1;
+                i++;
+            }
+            else {
+                newstart = start[i];
+                newend = end[i];
+                break;
+            }
+        }
+        if (i >= m)
+            break;
+
+        while (i < m - 1) {
+            if (start[i + 1] < end[i]) {
+                to_warn[2] = 1;
+                i++;
+                newend = max2(end[i - 1], end[i]);
+            }
+            else {
+                break;
+            }
+        }
+        if (i < m - 1 && newend == start[i + 1]) {
+            to_warn[0] = 1;
+            newend -= 1.0e-6;
+        }
+
+        data[2 * ct] = newstart;
+        data[2 * ct + 1] = newend;
+        ct++;
+        i++;
+    }
+    return ct;
+}
+
+/* ------------------------------------------------------------------------ */
+/* Process functions                                                         */
+/* ------------------------------------------------------------------------ */
+
+static void
+cross_correlogram_(const double *t1, Py_ssize_t nt1, const double *t2,
+                   Py_ssize_t nt2, double binsize, double w, double *C,
+                   Py_ssize_t nbins)
+{
+    Py_ssize_t i1, i2 = 0, j, leftb, k;
+    double lbound, rbound;
+
+    for (i1 = 0; i1 < nt1; i1++) {
+        lbound = t1[i1] - w;
+        while (i2 < nt2 && t2[i2] < lbound)
+            i2++;
+        while (i2 > 0 && t2[i2 - 1] > lbound)
+            i2--;
+
+        rbound = lbound;
+        leftb = i2;
+        for (j = 0; j < nbins; j++) {
+            k = 0;
+            rbound = rbound + binsize;
+            while (leftb < nt2 && t2[leftb] < rbound) {
+                leftb++;
+                k++;
+            }
+            C[j] += (double)k;
+        }
+    }
+}
+
+static void
+continuous_perievent_(const double *time, const double *target,
+                      const int64_t *count, const int64_t *count_target,
+                      Py_ssize_t m, int64_t w0, int64_t w1, int64_t *slice_idx,
+                      int64_t *start_w)
+{
+    Py_ssize_t k, t, i, maxt, maxi, start_t, t_pos, t0 = 0, i0 = 0;
+    int64_t left, right;
+    double interval, new_interval;
+
+    for (k = 0; k < m; t0 += count[k], i0 += count_target[k], k++) {
+        if (count[k] <= 0 || count_target[k] <= 0)
+            continue;
+        t = t0;
+        i = i0;
+        maxt = t + count[k];
+        maxi = i + count_target[k];
+        start_t = t;
+
+        while (i < maxi) {
+            interval = fabs(time[t] - target[i]);
+            t_pos = t;
+            t++;
+            while (t < maxt) {
+                new_interval = fabs(time[t] - target[i]);
+                if (new_interval > interval)
+                    break;
+                interval = new_interval;
+                t_pos = t;
+                t++;
+            }
+            left = w0 < t_pos - start_t ? w0 : t_pos - start_t;
+            right = w1 < maxt - t_pos - 1 ? w1 : maxt - t_pos - 1;
+
+            slice_idx[2 * i] = t_pos - left;
+            slice_idx[2 * i + 1] = t_pos + right + 1;
+            start_w[i] = w0 - left;
+
+            t--;
+            i++;
+        }
+    }
+}
+
+static void
+shift_hankel(double *hankel, Py_ssize_t W, Py_ssize_t F)
+{
+    /* hankel[0:-1] = hankel[1:]; hankel[-1] = 0 */
+    memmove(hankel, hankel + F, (size_t)((W - 1) * F) * sizeof(double));
+    memset(hankel + (W - 1) * F, 0, (size_t)F * sizeof(double));
+}
+
+static void
+add_hankel(double *out, const double *hankel, const double *counts,
+           Py_ssize_t W, Py_ssize_t N, Py_ssize_t F)
+{
+    /* out[:, n] += hankel * counts[n] for each n */
+    Py_ssize_t w, n, f;
+
+    for (w = 0; w < W; w++)
+        for (n = 0; n < N; n++)
+            for (f = 0; f < F; f++)
+                out[(w * N + n) * F + f] += hankel[w * F + f] * counts[n];
+}
+
+static int
+perievent_trigger_average_(const double *time, Py_ssize_t T, const double *counts,
+                           Py_ssize_t N, const double *target, const double *data,
+                           Py_ssize_t F, const int64_t *count, Py_ssize_t m,
+                           const double *ends, int64_t w1, double binsize,
+                           double *out, Py_ssize_t W)
+{
+    Py_ssize_t k, t = 0, t_start, i, i_start = 0, i_stop, maxi = 0, f, j, n;
+    double lbound, rbound, checknan;
+    double *hankel, *v;
+
+    hankel = (double *)calloc((size_t)(W * F + F), sizeof(double));
+    if (hankel == NULL)
+        return -1;
+    v = hankel + W * F;
+
+    for (k = 0; k < m; k++) {
+        maxi += count[k];
+        if (count[k] <= 0)
+            continue;
+        t_start = t;
+        i = maxi - count[k];
+        i_start = i;
+
+        while (t < T) {
+            lbound = time[t];
+            rbound = round9(lbound + binsize);
+
+            if (target[i] < rbound) {
+                i_start = i;
+                i_stop = i;
+                while (i_stop < maxi && target[i_stop] < rbound)
+                    i_stop++;
+                while (i_start < i_stop - 1 && target[i_start] < lbound)
+                    i_start++;
+
+                checknan = 0.0;
+                for (f = 0; f < F; f++) {
+                    v[f] = 0.0;
+                    for (j = i_start; j < i_stop; j++)
+                        v[f] += data[j * F + f];
+                    v[f] /= (double)(i_stop - i_start);
+                    checknan += v[f];
+                }
+                if (!isnan(checknan))
+                    memcpy(hankel + (W - 1) * F, v, (size_t)F * sizeof(double));
+            }
+
+            if (t - t_start >= w1)
+                add_hankel(out, hankel, counts + (t - w1) * N, W, N, F);
+
+            shift_hankel(hankel, W, F);
+            t++;
+            i = i_start;
+
+            if (t == T || time[t] > ends[k]) {
+                if (t - t_start > w1) {
+                    for (j = 0; j < w1; j++) {
+                        add_hankel(out, hankel, counts + (t - w1 + j) * N, W, N,
+                                   F);
+                        shift_hankel(hankel, W, F);
+                    }
+                }
+                memset(hankel, 0, (size_t)(W * F) * sizeof(double));
+                break;
+            }
+        }
+    }
+
+    for (n = 0; n < N; n++) {
+        double total = 0.0;
+        for (t = 0; t < T; t++)
+            total += counts[t * N + n];
+        if (total > 0.0)
+            for (j = 0; j < W; j++)
+                for (f = 0; f < F; f++)
+                    out[(j * N + n) * F + f] /= total;
+    }
+
+    free(hankel);
+    return 0;
+}
+
+/* ------------------------------------------------------------------------ */
+/* Python wrappers                                                           */
+/* ------------------------------------------------------------------------ */
+
+static void
+release(Py_buffer *buffers, int n)
+{
+    int i;
+
+    for (i = 0; i < n; i++)
+        PyBuffer_Release(&buffers[i]);
+}
+
+static PyObject *
+py_restrict(PyObject *self, PyObject *args)
+{
+    Py_buffer b[5];
+    Py_ssize_t x;
+
+    if (!PyArg_ParseTuple(args, "y*y*y*w*w*", &b[0], &b[1], &b[2], &b[3], &b[4]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    x = restrict_(b[0].buf, LEN(b[0], double), b[1].buf, b[2].buf,
+                  LEN(b[1], double), b[3].buf, b[4].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 5);
+    return PyLong_FromSsize_t(x);
+}
+
+static PyObject *
+py_value_from(PyObject *self, PyObject *args)
+{
+    Py_buffer b[5];
+    int mode;
+
+    if (!PyArg_ParseTuple(args, "y*y*y*y*iw*", &b[0], &b[1], &b[2], &b[3], &mode,
+                          &b[4]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    value_from_(b[0].buf, LEN(b[0], double), b[1].buf, LEN(b[1], double),
+                b[2].buf, b[3].buf, LEN(b[2], int64_t), mode, b[4].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 5);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+py_in_interval(PyObject *self, PyObject *args)
+{
+    Py_buffer b[4];
+
+    if (!PyArg_ParseTuple(args, "y*y*y*w*", &b[0], &b[1], &b[2], &b[3]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    in_interval_(b[0].buf, LEN(b[0], double), b[1].buf, b[2].buf,
+                 LEN(b[1], double), b[3].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 4);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+py_threshold(PyObject *self, PyObject *args)
+{
+    Py_buffer b[8];
+
+    if (!PyArg_ParseTuple(args, "y*y*y*y*w*w*w*w*", &b[0], &b[1], &b[2], &b[3],
+                          &b[4], &b[5], &b[6], &b[7]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    threshold_(b[0].buf, b[1].buf, LEN(b[0], double), b[2].buf, b[3].buf,
+               LEN(b[2], double), b[4].buf, b[5].buf, b[6].buf, b[7].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 8);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+py_intersect(PyObject *self, PyObject *args)
+{
+    Py_buffer b[7];
+    Py_ssize_t ct;
+
+    if (!PyArg_ParseTuple(args, "y*y*y*y*w*w*w*", &b[0], &b[1], &b[2], &b[3], &b[4],
+                          &b[5], &b[6]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    ct = intersect_(b[0].buf, b[1].buf, LEN(b[0], double), b[2].buf, b[3].buf,
+                    LEN(b[2], double), b[4].buf, b[5].buf, b[6].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 7);
+    return PyLong_FromSsize_t(ct);
+}
+
+static PyObject *
+py_union(PyObject *self, PyObject *args)
+{
+    Py_buffer b[6];
+    Py_ssize_t ct;
+
+    if (!PyArg_ParseTuple(args, "y*y*y*y*w*w*", &b[0], &b[1], &b[2], &b[3], &b[4],
+                          &b[5]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    ct = union_(b[0].buf, b[1].buf, LEN(b[0], double), b[2].buf, b[3].buf,
+                LEN(b[2], double), b[4].buf, b[5].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 6);
+    return PyLong_FromSsize_t(ct);
+}
+
+static PyObject *
+py_diff(PyObject *self, PyObject *args)
+{
+    Py_buffer b[7];
+    Py_ssize_t ct;
+
+    if (!PyArg_ParseTuple(args, "y*y*y*y*w*w*w*", &b[0], &b[1], &b[2], &b[3], &b[4],
+                          &b[5], &b[6]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    ct = diff_(b[0].buf, b[1].buf, LEN(b[0], double), b[2].buf, b[3].buf,
+               LEN(b[2], double), b[4].buf, b[5].buf, b[6].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 7);
+    return PyLong_FromSsize_t(ct);
+}
+
+static PyObject *
+py_union_isets(PyObject *self, PyObject *args)
+{
+    Py_buffer b[4];
+    Py_ssize_t ct;
+
+    if (!PyArg_ParseTuple(args, "y*y*w*w*", &b[0], &b[1], &b[2], &b[3]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    ct = union_isets_(b[0].buf, b[1].buf, LEN(b[0], double), b[2].buf, b[3].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 4);
+    return PyLong_FromSsize_t(ct);
+}
+
+static PyObject *
+py_fix_iset(PyObject *self, PyObject *args)
+{
+    Py_buffer b[4];
+    Py_ssize_t ct;
+
+    if (!PyArg_ParseTuple(args, "y*y*w*w*", &b[0], &b[1], &b[2], &b[3]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    ct = fix_iset_(b[0].buf, b[1].buf, LEN(b[0], double), b[2].buf, b[3].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 4);
+    return PyLong_FromSsize_t(ct);
+}
+
+static PyObject *
+py_cross_correlogram(PyObject *self, PyObject *args)
+{
+    Py_buffer b[3];
+    double binsize, w;
+
+    if (!PyArg_ParseTuple(args, "y*y*ddw*", &b[0], &b[1], &binsize, &w, &b[2]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    cross_correlogram_(b[0].buf, LEN(b[0], double), b[1].buf, LEN(b[1], double),
+                       binsize, w, b[2].buf, LEN(b[2], double));
+    Py_END_ALLOW_THREADS
+    release(b, 3);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+py_continuous_perievent(PyObject *self, PyObject *args)
+{
+    Py_buffer b[6];
+    long long w0, w1;
+
+    if (!PyArg_ParseTuple(args, "y*y*y*y*LLw*w*", &b[0], &b[1], &b[2], &b[3], &w0,
+                          &w1, &b[4], &b[5]))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    continuous_perievent_(b[0].buf, b[1].buf, b[2].buf, b[3].buf,
+                          LEN(b[2], int64_t), (int64_t)w0, (int64_t)w1, b[4].buf,
+                          b[5].buf);
+    Py_END_ALLOW_THREADS
+    release(b, 6);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+py_perievent_trigger_average(PyObject *self, PyObject *args)
+{
+    Py_buffer b[7];
+    Py_ssize_t N, F, W;
+    long long w1;
+    double binsize;
+    int err;
+
+    if (!PyArg_ParseTuple(args, "y*y*ny*y*ny*y*Ldw*n", &b[0], &b[1], &N, &b[2],
+                          &b[3], &F, &b[4], &b[5], &w1, &binsize, &b[6], &W))
+        return NULL;
+    Py_BEGIN_ALLOW_THREADS
+    err = perievent_trigger_average_(b[0].buf, LEN(b[0], double), b[1].buf, N,
+                                     b[2].buf, b[3].buf, F, b[4].buf,
+                                     LEN(b[4], int64_t), b[5].buf, (int64_t)w1,
+                                     binsize, b[6].buf, W);
+    Py_END_ALLOW_THREADS
+    release(b, 7);
+    if (err)
+        return PyErr_NoMemory();
+    Py_RETURN_NONE;
+}
+
+static PyMethodDef methods[] = {
+    {"restrict", py_restrict, METH_VARARGS, NULL},
+    {"value_from", py_value_from, METH_VARARGS, NULL},
+    {"in_interval", py_in_interval, METH_VARARGS, NULL},
+    {"threshold", py_threshold, METH_VARARGS, NULL},
+    {"intersect", py_intersect, METH_VARARGS, NULL},
+    {"union", py_union, METH_VARARGS, NULL},
+    {"diff", py_diff, METH_VARARGS, NULL},
+    {"union_isets", py_union_isets, METH_VARARGS, NULL},
+    {"fix_iset", py_fix_iset, METH_VARARGS, NULL},
+    {"cross_correlogram", py_cross_correlogram, METH_VARARGS, NULL},
+    {"continuous_perievent", py_continuous_perievent, METH_VARARGS, NULL},
+    {"perievent_trigger_average", py_perievent_trigger_average, METH_VARARGS, NULL},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef module = {
+    PyModuleDef_HEAD_INIT,
+    "_kernels",
+    "C kernels of pynapple, see pynapple_kernels.",
+    -1,
+    methods,
+};
+
+PyMODINIT_FUNC
+PyInit__kernels(void)
+{
+    return PyModule_Create(&module);
+}
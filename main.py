@@ -3,6 +3,7 @@ import sys
 sys.path.append("scripts")
 from download_pynapple import download_pynapple_and_unzip
 from strip_numba import strip_numba_folder_tree,strip_numba_from_pyproject
+from build_kernels import build_kernels
 import subprocess
 
 if __name__ == '__main__':
@@ -22,6 +23,9 @@ if __name__ == '__main__':
     # create the wheel file
     result = subprocess.run(["python", "-m", "build"], cwd=out, capture_output=True, text=True)
 
+    # build the optional compiled kernels (native and Pyodide wheels)
+    build_kernels(os.path.join(out, "dist"))
+
     # Twine check
     result = subprocess.run(["twine", "check", "dist/*"], cwd=out, capture_output=True, text=True)
     print(result.stdout)
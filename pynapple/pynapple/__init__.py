@@ -1,8 +1,11 @@
+from importlib import import_module as _import_module
 from importlib.metadata import PackageNotFoundError as _PackageNotFoundError
 from importlib.metadata import version as _get_version
 
 from .core import (
     IntervalSet,
+    OnlineBinner,
+    RegularTsIndex,
     Ts,
     Tsd,
     TsdFrame,
@@ -11,7 +14,113 @@ from .core import (
     TsIndex,
     nap_config,
 )
-from .io import *
-from .process import *
 
 __version__ = "0.8.5"
+
+# The io and process modules (and their dependencies, e.g. scipy or pynwb) are
+# imported on first access of one of their attributes (PEP 562). The names are the
+# ones `from .io import *` and `from .process import *` used to bind, i.e. the public
+# names of the packages and their submodules. tests/test_lazy_import.py checks them.
+_LAZY_NAMES = {
+    "io": (
+        "Folder",
+        "NPZFile",
+        "NWBFile",
+        "append_NWB_LFP",
+        "cnmfe",
+        "folder",
+        "interface_npz",
+        "interface_nwb",
+        "load_eeg",
+        "load_file",
+        "load_folder",
+        "load_session",
+        "loader",
+        "misc",
+        "neurosuite",
+        "phy",
+        "suite2p",
+    ),
+    "process": (
+        "BackgroundExecutor",
+        "BackgroundFuture",
+        "BaseStorage",
+        "BrowserStorage",
+        "DirectoryStorage",
+        "OnlineBayesianDecoder",
+        "ProcessExecutor",
+        "SurrogateStatistics",
+        "Surrogates",
+        "WebWorkerExecutor",
+        "apply_bandpass_filter",
+        "apply_bandstop_filter",
+        "apply_highpass_filter",
+        "apply_lowpass_filter",
+        "background",
+        "build_tensor",
+        "cache",
+        "compute_1d_mutual_info",
+        "compute_1d_tuning_curves",
+        "compute_1d_tuning_curves_continuous",
+        "compute_2d_mutual_info",
+        "compute_2d_tuning_curves",
+        "compute_2d_tuning_curves_continuous",
+        "compute_autocorrelogram",
+        "compute_crosscorrelogram",
+        "compute_discrete_tuning_curves",
+        "compute_event_trigger_average",
+        "compute_eventcorrelogram",
+        "compute_fft",
+        "compute_mean_power_spectral_density",
+        "compute_perievent",
+        "compute_perievent_continuous",
+        "compute_power_spectral_density",
+        "compute_wavelet_transform",
+        "correlograms",
+        "decode_1d",
+        "decode_2d",
+        "decoding",
+        "disable_cache",
+        "enable_cache",
+        "filtering",
+        "generate_morlet_filterbank",
+        "get_background_executor",
+        "get_cache",
+        "get_filter_frequency_response",
+        "jitter_timestamps",
+        "perievent",
+        "randomize",
+        "resample_timestamps",
+        "set_background_executor",
+        "shift_timestamps",
+        "shuffle_ts_intervals",
+        "spectrum",
+        "surrogates",
+        "tuning_curves",
+        "warp_tensor",
+        "warping",
+        "wavelets",
+    ),
+}
+_LAZY_PACKAGES = tuple(_LAZY_NAMES)
+_LAZY_MODULES = {
+    name: package for package, names in _LAZY_NAMES.items() for name in names
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_PACKAGES:
+        return _import_module("." + name, __name__)
+    if name in _LAZY_MODULES:
+        package = _import_module("." + _LAZY_MODULES[name], __name__)
+        if hasattr(package, name):
+            value = getattr(package, name)
+        else:  # submodule not imported by the package __init__
+            value = _import_module(".{}.{}".format(_LAZY_MODULES[name], name), __name__)
+        globals()[name] = value  # next accesses skip __getattr__
+        return value
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_PACKAGES) | set(_LAZY_MODULES))
@@ -1,5 +1,6 @@
 from .config import nap_config
 from .interval_set import IntervalSet
-from .time_index import TsIndex
+from .streaming import OnlineBinner
+from .time_index import RegularTsIndex, TsIndex
 from .time_series import Ts, Tsd, TsdFrame, TsdTensor
 from .ts_group import TsGroup
@@ -0,0 +1,48 @@
+"""
+Dispatch to the optional compiled kernels of the `pynapple-kernels` package.
+
+`pynapple-kernels` holds C versions of the loops of `_jitted_functions.py`,
+`process/_process_functions.py` and `process/correlograms.py`. It is built for native
+platforms and for Pyodide, where numba is not available (see `scripts/build_kernels.py`).
+
+If the package is installed, the functions decorated with `compiled` are replaced by their
+compiled version. The Python function stays available as the `py_func` attribute, like
+for numba dispatchers.
+"""
+
+import functools
+
+try:
+    import pynapple_kernels
+except ImportError:
+    pynapple_kernels = None
+
+
+def compiled(name):
+    """
+    Replace the decorated function by the kernel `name` of `pynapple-kernels`, if available.
+
+    Parameters
+    ----------
+    name : str
+        Name of the kernel in `pynapple_kernels`
+
+    Returns
+    -------
+    callable
+        The decorator
+    """
+
+    def decorator(func):
+        kernel = getattr(pynapple_kernels, name, None)
+        if kernel is None:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return kernel(*args, **kwargs)
+
+        wrapper.py_func = func
+        return wrapper
+
+    return decorator
@@ -11,33 +11,131 @@ Otherwise the module will call the functions within `_jitted_functions.py`.
 from typing import Literal
 
 import numpy as np
-from scipy import signal
 
 from ._jitted_functions import (  # pjitconvolve,
-    jitbin_array,
-    jitcount,
     jitremove_nan,
     jitrestrict,
     jitrestrict_with_count,
     jitthreshold,
     jitvaluefrom,
 )
-from .utils import get_backend
+from .utils import _take_rows, get_backend
 
 
 def _restrict(time_array, starts, ends):
     return jitrestrict(time_array, starts, ends)
 
 
+def _bin_bounds(starts, ends, bin_size):
+    """
+    Tile each epoch with bins of `bin_size`. A bin is kept if its center falls within
+    the epoch. See `_get_bins`.
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Centers of the bins, epoch of each bin, left bounds (included) and right bounds
+        (excluded) of the bins.
+    """
+    nb_bins = np.where(
+        (ends - starts) > bin_size, np.ceil((ends + bin_size - starts) / bin_size), 1
+    ).astype(np.int64)
+    ep = np.repeat(np.arange(len(starts)), nb_bins)
+    i = np.arange(len(ep)) - np.repeat(np.cumsum(nb_bins) - nb_bins, nb_bins)
+
+    lbound = np.round(starts[ep] + i * bin_size, 9)
+    centers = lbound + bin_size / 2
+    keep = centers <= ends[ep]
+    ep, lbound, centers = ep[keep], lbound[keep], centers[keep]
+    rbound = np.round(lbound + bin_size, 9)  # similar to numpy histogram
+    return centers, ep, lbound, rbound
+
+
+def _get_bins(time_array, starts, ends, bin_size):
+    """
+    Tile each epoch with bins of `bin_size` and locate the time points of each bin.
+
+    A bin is kept if its center falls within the epoch. Since the time array is sorted
+    and the bins of an epoch are contiguous, the time points of each bin are given by
+    a range of indices. Time points after the end of the epoch are excluded from the last bin.
+
+    Parameters
+    ----------
+    time_array : numpy.ndarray
+        Sorted timestamps
+    starts : numpy.ndarray
+        Start of the epochs
+    ends : numpy.ndarray
+        End of the epochs
+    bin_size : float
+        The bin size
+
+    Returns
+    -------
+    tuple of numpy.ndarray
+        Centers of the bins, epoch of each bin, first index and last index (excluded)
+        of the time points within each bin.
+    """
+    centers, ep, lbound, rbound = _bin_bounds(starts, ends, bin_size)
+    idx_start = np.searchsorted(time_array, lbound, side="left")
+    idx_end = np.minimum(
+        np.searchsorted(time_array, rbound, side="left"),
+        np.searchsorted(time_array, ends, side="right")[ep],
+    )
+    return centers, ep, idx_start, idx_end
+
+
 def _count(time_array, starts, ends, bin_size=None, dtype=None):
+    dtype = np.int64 if dtype is None else dtype
     if isinstance(bin_size, (float, int)):
-        t, d = jitcount(time_array, starts, ends, bin_size, dtype)
+        t, _, idx_start, idx_end = _get_bins(time_array, starts, ends, bin_size)
     else:
-        _, d = jitrestrict_with_count(time_array, starts, ends, dtype)
+        idx_start = np.searchsorted(time_array, starts, side="left")
+        idx_end = np.searchsorted(time_array, ends, side="right")
         t = starts + (ends - starts) / 2
+    d = (idx_end - idx_start).astype(dtype)
     return t, d
 
 
+def _bin_array(time_array, data_array, starts, ends, bin_size):
+    """
+    Average the data points within bins of `bin_size`.
+
+    The bins are processed epoch by epoch. If all the bins of an epoch hold the same
+    number of points, which is the case for regularly sampled data, the average is
+    computed by reshaping the data. Otherwise the points are summed with
+    `numpy.add.reduceat`. Bins without points are NaN.
+    """
+    t, ep, idx_start, idx_end = _get_bins(time_array, starts, ends, bin_size)
+    cnt = idx_end - idx_start
+    f = data_array.shape[1:]
+    new_data_array = np.full((len(t), *f), np.nan)
+
+    bounds = np.searchsorted(ep, np.arange(len(starts) + 1))
+    for k in range(len(starts)):
+        b = slice(bounds[k], bounds[k + 1])
+        n = cnt[b]
+        if not np.any(n):
+            continue
+        first, last = idx_start[b][0], idx_end[b][-1]
+        data = data_array[first:last]  # contiguous read for lazy arrays
+
+        if np.all(n == n[0]):
+            new_data_array[b] = (
+                data.reshape((len(n), n[0], *f)).sum(axis=1, dtype=np.float64) / n[0]
+            )
+        else:
+            # Empty bins share their index with the next bin and can be skipped
+            nonempty = n > 0
+            sums = np.add.reduceat(
+                data, idx_start[b][nonempty] - first, axis=0, dtype=np.float64
+            )
+            n = n[nonempty].reshape((-1,) + (1,) * len(f))
+            new_data_array[bounds[k] + np.flatnonzero(nonempty)] = sums / n
+
+    return t, new_data_array
+
+
 def _value_from(
     time_array,
     time_target_array,
@@ -86,7 +184,9 @@ def _value_from(
         )
 
     idx2 = ~np.isnan(idx)
-    new_data_array[idx2] = data_target_array[idx_target][idx[idx2].astype(int)]
+    new_data_array[idx2] = _take_rows(data_target_array, idx_target)[
+        idx[idx2].astype(int)
+    ]
 
     return new_time_array, new_data_array
 
@@ -118,6 +218,87 @@ def _dropna(time_array, data_array, starts, ends, update_time_support, ndim):
         return (time_array, data_array, starts, ends)
 
 
+def _interpolate(
+    time_array, data_array, time_target_array, starts, ends, left=None, right=None
+):
+    """
+    Linear interpolation of `data_array` at `time_target_array` within each epoch.
+
+    All the epochs are processed at once. The target times are searched once
+    into the source times and each target time is paired with the two
+    surrounding source points of the same epoch. The interpolation weights are
+    computed once and broadcasted over the remaining dimensions of `data_array`.
+
+    Parameters
+    ----------
+    time_array : numpy.ndarray
+        Source timestamps, sorted.
+    data_array : array-like
+        Source data. First dimension is time.
+    time_target_array : numpy.ndarray
+        Target timestamps, sorted and restricted to the epochs.
+    starts : numpy.ndarray
+        Start of the epochs
+    ends : numpy.ndarray
+        End of the epochs
+    left : Number, optional
+        Value for target times before the first source point of an epoch.
+        Default is the value of the first source point of the epoch.
+    right : Number, optional
+        Value for target times after the last source point of an epoch.
+        Default is the value of the last source point of the epoch.
+
+    Returns
+    -------
+    numpy.ndarray
+        The interpolated values, NaN for epochs without source points. Complex data
+        stays complex, other data is cast to float.
+    """
+    n = time_target_array.shape[0]
+    dtype = np.result_type(data_array.dtype, np.float64)  # keeps complex data
+    new_data_array = np.full((n, *data_array.shape[1:]), np.nan, dtype=dtype)
+
+    if n == 0 or len(time_array) == 0:
+        return new_data_array
+
+    # Bounds of the source points within the epoch of each target point
+    ep_target = np.searchsorted(starts, time_target_array, side="right") - 1
+    lo = np.searchsorted(time_array, starts, side="left")[ep_target]
+    hi = np.searchsorted(time_array, ends, side="right")[ep_target] - 1
+    valid = hi >= lo
+    if not np.any(valid):
+        return new_data_array
+
+    # Neighbours clipped to the epoch of the target point
+    j = np.searchsorted(time_array, time_target_array, side="right")[valid]
+    lo = lo[valid]
+    hi = hi[valid]
+    i0 = np.clip(j - 1, lo, hi)
+    i1 = np.clip(j, lo, hi)
+    x = time_target_array[valid]
+
+    # Read each needed source row once, in increasing order (lazy arrays)
+    rows, inverse = np.unique(np.concatenate((i0, i1)), return_inverse=True)
+    d = np.asarray(_take_rows(data_array, rows), dtype=dtype)
+    d0 = d[inverse[0 : len(i0)]]
+    d1 = d[inverse[len(i0) :]]
+
+    dt = time_array[i1] - time_array[i0]
+    w = np.divide(x - time_array[i0], dt, out=np.zeros_like(x), where=dt > 0)
+    w = w.reshape((-1,) + (1,) * (d.ndim - 1))
+
+    # Exact source points are copied, as np.interp, even if the next one is NaN
+    out = np.where(w == 0, d0, d0 + (d1 - d0) * w)
+    if left is not None:
+        out[x < time_array[lo]] = left
+    if right is not None:
+        out[x > time_array[hi]] = right
+
+    new_data_array[valid] = out
+
+    return new_data_array
+
+
 ####################################
 # Can call pynajax
 ####################################
@@ -129,6 +310,8 @@ def _convolve(time_array, data_array, starts, ends, array, trim="both"):
 
         return convolve(time_array, data_array, starts, ends, array, trim)
     else:
+        from scipy import signal
+
         # reshape to 2d
         shape = data_array.shape
         data_array = np.reshape(data_array, (shape[0], -1))
@@ -168,7 +351,7 @@ def _bin_average(time_array, data_array, starts, ends, bin_size):
 
         return bin_average(time_array, data_array, starts, ends, bin_size)
     else:
-        return jitbin_array(time_array, data_array, starts, ends, bin_size)
+        return _bin_array(time_array, data_array, starts, ends, bin_size)
 
 
 def _threshold(time_array, data_array, starts, ends, thr, method):
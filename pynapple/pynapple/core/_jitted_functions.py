@@ -1,4 +1,7 @@
 import numpy as np
+
+from ._compiled import compiled
+
 # from numba import jit  # , njit, prange
 
 
@@ -6,6 +9,7 @@ import numpy as np
 # Time only functions
 ################################
 # @jit(nopython=True, cache=True)
+@compiled("restrict")
 def jitrestrict(time_array, starts, ends):
     n = len(time_array)
     m = len(starts)
@@ -44,6 +48,7 @@ def jitrestrict(time_array, starts, ends):
 
 
 # @jit(nopython=True, cache=True)
+@compiled("restrict_with_count")
 def jitrestrict_with_count(time_array, starts, ends, dtype=np.int64):
     n = len(time_array)
     m = len(starts)
@@ -84,6 +89,7 @@ def jitrestrict_with_count(time_array, starts, ends, dtype=np.int64):
 
 
 # @jit(nopython=True, cache=True)
+@compiled("value_from")
 def jitvaluefrom(
     time_array,
     time_target_array,
@@ -181,59 +187,7 @@ def jitvaluefrom(
 
 
 # @jit(nopython=True, cache=True)
-def jitcount(time_array, starts, ends, bin_size, dtype):
-    idx, countin = jitrestrict_with_count(time_array, starts, ends)
-    time_array = time_array[idx]
-
-    m = starts.shape[0]
-
-    nb_bins = np.zeros(m, dtype=np.int32)
-    for k in range(m):
-        if (ends[k] - starts[k]) > bin_size:
-            nb_bins[k] = int(np.ceil((ends[k] + bin_size - starts[k]) / bin_size))
-        else:
-            nb_bins[k] = 1
-
-    nb = np.sum(nb_bins)
-    bins = np.zeros(nb, dtype=np.float64)
-    cnt = np.zeros(nb, dtype=dtype)
-
-    k = 0
-    t = 0
-    b = 0
-
-    while k < m:
-        maxb = b + nb_bins[k]
-        maxt = t + countin[k]
-        lbound = starts[k]
-
-        while b < maxb:
-            xpos = lbound + bin_size / 2
-            if xpos > ends[k]:
-                break
-            else:
-                bins[b] = xpos
-                rbound = np.round(lbound + bin_size, 9)
-                while t < maxt:
-                    if time_array[t] < rbound:  # similar to numpy hisrogram
-                        cnt[b] += 1
-                        t += 1
-                    else:
-                        break
-
-                lbound += bin_size
-                lbound = np.round(lbound, 9)
-                b += 1
-        t = maxt
-        k += 1
-
-    new_time_array = bins[0:b]
-    new_data_array = cnt[0:b]
-
-    return (new_time_array, new_data_array)
-
-
-# @jit(nopython=True, cache=True)
+@compiled("in_interval")
 def jitin_interval(time_array, starts, ends):
     n = len(time_array)
     m = len(starts)
@@ -274,6 +228,7 @@ def jitin_interval(time_array, starts, ends):
 
 
 # @jit(nopython=True, cache=True)
+@compiled("remove_nan")
 def jitremove_nan(time_array, index_nan):
     n = len(time_array)
     ix_start = np.zeros(n, dtype=np.bool_)
@@ -302,6 +257,7 @@ def jitremove_nan(time_array, index_nan):
 # Time Data functions
 ################################
 # @jit(nopython=True, cache=True)
+@compiled("threshold")
 def jitthreshold(time_array, data_array, starts, ends, thr, method="above"):
     n = time_array.shape[0]
 
@@ -375,68 +331,6 @@ def jitthreshold(time_array, data_array, starts, ends, thr, method="above"):
     return (new_time_array, new_data_array, new_starts, new_ends)
 
 
-def jitbin_array(time_array, data_array, starts, ends, bin_size):
-    """Slice first for compatibility with lazy loading."""
-    idx, countin = jitrestrict_with_count(time_array, starts, ends)
-    return _jitbin_array(
-        countin, time_array[idx], data_array[idx], starts, ends, bin_size
-    )
-
-
-# @jit(nopython=True, cache=True)
-def _jitbin_array(countin, time_array, data_array, starts, ends, bin_size):
-    m = starts.shape[0]
-    f = data_array.shape[1:]
-
-    nb_bins = np.zeros(m, dtype=np.int32)
-    for k in range(m):
-        if (ends[k] - starts[k]) > bin_size:
-            nb_bins[k] = int(np.ceil((ends[k] + bin_size - starts[k]) / bin_size))
-        else:
-            nb_bins[k] = 1
-
-    nb = np.sum(nb_bins)
-    bins = np.zeros(nb, dtype=np.float64)
-    cnt = np.zeros((nb, *f), dtype=np.float64)
-    average = np.zeros((nb, *f), dtype=np.float64)
-
-    k = 0
-    t = 0
-    b = 0
-
-    while k < m:
-        maxb = b + nb_bins[k]
-        maxt = t + countin[k]
-        lbound = starts[k]
-
-        while b < maxb:
-            xpos = lbound + bin_size / 2
-            if xpos > ends[k]:
-                break
-            else:
-                bins[b] = xpos
-                rbound = np.round(lbound + bin_size, 9)
-                while t < maxt:
-                    if time_array[t] < rbound:  # similar to numpy hisrogram
-                        cnt[b] += 1.0
-                        average[b] += data_array[t]
-                        t += 1
-                    else:
-                        break
-
-                lbound += bin_size
-                lbound = np.round(lbound, 9)
-                b += 1
-        t = maxt
-        k += 1
-
-    new_time_array = bins[0:b]
-
-    new_data_array = average[0:b] / cnt[0:b]
-
-    return (new_time_array, new_data_array)
-
-
 # @jit(nopython=True, cache=True)
 # def jitconvolve(d, a):
 #     return np.convolve(d, a)
@@ -470,6 +364,7 @@ def _jitbin_array(countin, time_array, data_array, starts, ends, bin_size):
 # IntervalSet functions
 ################################
 # @jit(nopython=True, cache=True)
+@compiled("intersect")
 def jitintersect(start1, end1, start2, end2):
     m = start1.shape[0]  # number of intervals in set 1
     n = start2.shape[0]  # number of intervals in set 2
@@ -518,6 +413,7 @@ def jitintersect(start1, end1, start2, end2):
 
 
 # @jit(nopython=True, cache=True)
+@compiled("union")
 def jitunion(start1, end1, start2, end2):
     m = start1.shape[0]  # number of intervals in set 1
     n = start2.shape[0]  # number of intervals in set 2
@@ -601,6 +497,7 @@ def jitunion(start1, end1, start2, end2):
 
 
 # @jit(nopython=True, cache=True)
+@compiled("diff")
 def jitdiff(start1, end1, start2, end2):
     m = start1.shape[0]  # number of intervals in set 1
     n = start2.shape[0]  # number of intervals in set 2
@@ -691,6 +588,7 @@ def jitdiff(start1, end1, start2, end2):
 
 
 # @jit(nopython=True, cache=True)
+@compiled("union_isets")
 def jitunion_isets(starts, ends):
     idx = np.argsort(starts)
     starts = starts[idx]
@@ -722,6 +620,7 @@ def jitunion_isets(starts, ends):
 
 
 # @jit(nopython=True, cache=True)
+@compiled("fix_iset")
 def _jitfix_iset(start, end):
     """
     0 - > "Some starts and ends are equal. Removing 1 microsecond!",
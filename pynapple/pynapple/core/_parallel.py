@@ -0,0 +1,175 @@
+"""
+Parallel execution of the per-unit operations of TsGroup.
+
+The number of workers is set with `nap_config.n_jobs` (1 by default, i.e. serial) and
+the kind of pool with `nap_config.parallel_backend`:
+
+- 'process' (default) runs the units in a pool of processes. The timestamps of all the
+  units are copied once into a block of shared memory that the workers map, instead of
+  pickling them for each task. Only the results are pickled back.
+- 'thread' runs the units in a pool of threads. It only helps for functions releasing
+  the GIL, e.g. numpy or the compiled kernels of pynapple-kernels.
+
+The units are split in contiguous chunks with about the same number of timestamps, one
+per worker, and the results are returned in the order of the units.
+
+Random functions receive one `numpy.random.Generator` per unit, spawned from a single
+`numpy.random.SeedSequence`, so that their output does not depend on the number of
+workers.
+"""
+
+import atexit
+import concurrent.futures
+import os
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .config import nap_config
+
+_pools = {}
+
+
+def _get_n_jobs():
+    n_jobs = nap_config.n_jobs
+    if sys.platform == "emscripten":
+        return 1
+    if n_jobs < 0:
+        n_jobs = max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
+def _get_pool(backend, n_jobs):
+    key = (backend, n_jobs)
+    if key not in _pools:
+        if backend == "thread":
+            _pools[key] = concurrent.futures.ThreadPoolExecutor(n_jobs)
+        else:
+            _pools[key] = concurrent.futures.ProcessPoolExecutor(n_jobs)
+    return _pools[key]
+
+
+@atexit.register
+def _shutdown_pools():
+    for pool in _pools.values():
+        if sys.version_info >= (3, 9):
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:  # cancel_futures is new in Python 3.9
+            pool.shutdown(wait=False)
+    _pools.clear()
+
+
+def spawn_generators(n, seed=None):
+    """
+    Independent random generators for `n` units.
+
+    Parameters
+    ----------
+    n : int
+        Number of generators
+    seed : int, numpy.random.SeedSequence or None
+        The seed. If None, the entropy is drawn from the global numpy random state so
+        that `numpy.random.seed` makes the output reproducible.
+
+    Returns
+    -------
+    list of numpy.random.Generator
+    """
+    if seed is None:
+        seed = np.random.randint(0, 2**32, size=4, dtype=np.uint64)
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(s) for s in seed.spawn(n)]
+
+
+def _chunks(lengths, n):
+    """Bounds of `n` contiguous chunks of units with about the same number of timestamps."""
+    n = min(n, len(lengths))
+    total = np.cumsum(lengths)
+    bounds = np.searchsorted(total, np.linspace(0, total[-1], n + 1)[1:-1], "right")
+    return np.unique(np.r_[0, bounds, len(lengths)])
+
+
+def _apply(func, arrays, args, rngs):
+    if rngs is None:
+        return [func(t, *args) for t in arrays]
+    return [func(t, rng, *args) for t, rng in zip(arrays, rngs)]
+
+
+def _apply_shared(name, offsets, func, args, rngs):
+    # Run in a worker process on the arrays stored in the shared memory block `name`
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        flat = np.ndarray((offsets[-1],), dtype=np.float64, buffer=shm.buf)
+        arrays = [flat[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+        out = _apply(func, arrays, args, rngs)
+        del flat, arrays
+    finally:
+        shm.close()
+    return out
+
+
+def map_units(func, arrays, args=(), rngs=None):
+    """
+    Compute `func(t, *args)` for each array `t` of `arrays`, in parallel if
+    `nap_config.n_jobs` is not 1.
+
+    Parameters
+    ----------
+    func : callable
+        A module-level function (it is pickled by reference with the process backend).
+        It should return new arrays, not views of `t`.
+    arrays : list of numpy.ndarray or TsIndex
+        The timestamps of each unit. The process backend passes them to `func` as
+        numpy arrays.
+    args : tuple, optional
+        The other arguments of `func`, shared by all the units
+    rngs : list of numpy.random.Generator, optional
+        One generator per unit, passed as the second argument of `func`
+
+    Returns
+    -------
+    list
+        The result for each unit, in the order of `arrays`
+    """
+    n_jobs = _get_n_jobs()
+    if n_jobs == 1 or len(arrays) < 2:
+        return _apply(func, arrays, args, rngs)
+
+    lengths = np.array([len(t) for t in arrays])
+    bounds = _chunks(np.maximum(lengths, 1), n_jobs)
+    pool = _get_pool(nap_config.parallel_backend, n_jobs)
+
+    def chunk_rngs(a, b):
+        return None if rngs is None else rngs[a:b]
+
+    if nap_config.parallel_backend == "thread":
+        futures = [
+            pool.submit(_apply, func, arrays[a:b], args, chunk_rngs(a, b))
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+        return [out for future in futures for out in future.result()]
+
+    offsets = np.r_[0, np.cumsum(lengths)]
+    shm = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]) * 8, 8))
+    try:
+        flat = np.ndarray((offsets[-1],), dtype=np.float64, buffer=shm.buf)
+        for t, a, b in zip(arrays, offsets[:-1], offsets[1:]):
+            flat[a:b] = getattr(t, "values", t)
+        del flat
+        futures = [
+            pool.submit(
+                _apply_shared,
+                shm.name,
+                offsets[a : b + 1],
+                func,
+                args,
+                chunk_rngs(a, b),
+            )
+            for a, b in zip(bounds[:-1], bounds[1:])
+        ]
+        return [out for future in futures for out in future.result()]
+    finally:
+        shm.close()
+        shm.unlink()
@@ -5,14 +5,55 @@ Abstract class for `core` time series.
 
 import abc
 from numbers import Number
+from typing import Union
 
 import numpy as np
-import pandas as pd
 
-from ._core_functions import _count, _restrict, _value_from
+from ._core_functions import _count, _value_from
 from .interval_set import IntervalSet
-from .time_index import TsIndex
-from .utils import check_filename, convert_to_numpy_array
+from .time_index import RegularTsIndex, TsIndex
+from .utils import (
+    _last_saved_time,
+    _take_rows,
+    check_filename,
+    convert_to_numpy_array,
+)
+
+
+def _restrict_index(index, starts, ends):
+    """Return the indices of the time index within the epochs.
+
+    Parameters
+    ----------
+    index : TsIndex, RegularTsIndex or numpy.ndarray
+        The time index
+    starts : numpy.ndarray
+        Start of the epochs
+    ends : numpy.ndarray
+        End of the epochs
+
+    Returns
+    -------
+    slice or numpy.ndarray
+        The indices of the time points within the epochs
+    """
+    if isinstance(index, RegularTsIndex):
+        return index.restrict_index(starts, ends)
+
+    # Epochs are sorted and non-overlapping, each one is a range of indices
+    values = getattr(index, "values", index)
+    idx_start = np.searchsorted(values, starts, side="left")
+    idx_end = np.maximum(np.searchsorted(values, ends, side="right"), idx_start)
+    lengths = idx_end - idx_start
+    nonempty = np.flatnonzero(lengths)
+    if len(nonempty):
+        first, last = idx_start[nonempty[0]], idx_end[nonempty[-1]]
+        if last - first == np.sum(lengths):
+            # Contiguous indices, a slice avoids loading memory-mapped data
+            return slice(int(first), int(last))
+
+    offsets = np.repeat(idx_start - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(np.sum(lengths))
 
 
 class _Base(abc.ABC):
@@ -23,7 +64,7 @@ class _Base(abc.ABC):
 
     _initialized = False
 
-    index: TsIndex
+    index: Union[TsIndex, RegularTsIndex]
     """The time index of the time series"""
 
     rate: float
@@ -33,7 +74,7 @@ class _Base(abc.ABC):
     """The time support of the time series"""
 
     def __init__(self, t, time_units="s", time_support=None):
-        if isinstance(t, TsIndex):
+        if isinstance(t, (TsIndex, RegularTsIndex)):
             self.index = t
         else:
             self.index = TsIndex(convert_to_numpy_array(t, "t"), time_units)
@@ -364,13 +405,15 @@ class _Base(abc.ABC):
         if not isinstance(iset, IntervalSet):
             raise TypeError("Argument should be IntervalSet")
 
-        time_array = self.index.values
-        starts = iset.start
-        ends = iset.end
+        idx = _restrict_index(self.index, iset.start, iset.end)
+        return self._restrict_rows(idx, iset)
 
-        idx = _restrict(time_array, starts, ends)
-        data = None if not hasattr(self, "values") else self.values[idx]
-        return self._define_instance(time_array[idx], iset, values=data)
+    def _restrict_rows(self, idx, iset):
+        """Object holding the rows `idx` (given by `_restrict_index`) with time support `iset`."""
+        data = None if not hasattr(self, "values") else _take_rows(self.values, idx)
+        if isinstance(idx, slice) and type(data) is np.ndarray:
+            data = data.copy()  # Same as fancy indexing, except for memory maps
+        return self._define_instance(self.index[idx], iset, values=data)
 
     def copy(self):
         """Copy the data, index and time support"""
@@ -577,24 +620,26 @@ class _Base(abc.ABC):
             )
 
         # get index of preceding time value
-        idx_start = np.searchsorted(self.t, start, side="left")
-        if idx_start == len(self.t) and mode != "restrict":
+        idx_start = self.index.searchsorted(start, side="left")
+        if idx_start == len(self.index) and mode != "restrict":
             idx_start -= 1  # make sure the index is not out of bound
 
         if mode == "before_t":
             # in order to get the index preceding start
             # subtract one except if self.t[idx_start] is exactly equal to start
-            idx_start -= self.t[idx_start] > start
+            idx_start -= self.index[idx_start] > start
         elif mode == "closest_t":
             # subtract 1 if start is closer to the previous index
-            di = self.t[idx_start] - start > np.abs(self.t[idx_start - 1] - start)
+            di = self.index[idx_start] - start > np.abs(
+                self.index[idx_start - 1] - start
+            )
             idx_start -= di
 
         if end is None:
             if idx_start < 0:  # happens only on backwards if start < self.t[0]
                 return slice(0, 0)
             elif (
-                idx_start == len(self.t) - 1 and mode == "after_t"
+                idx_start == len(self.index) - 1 and mode == "after_t"
             ):  # happens only on forward if start >= self.t[-1]
                 return slice(idx_start, idx_start)
             return slice(idx_start, idx_start + 1)
@@ -606,23 +651,23 @@ class _Base(abc.ABC):
         if start > end:
             raise ValueError("'start' should not precede 'end'.")
 
-        idx_end = np.searchsorted(self.t, end, side="left")
+        idx_end = self.index.searchsorted(end, side="left")
         add_if_forward = 0
-        if idx_end == len(self.t):
+        if idx_end == len(self.index):
             idx_end -= 1  # make sure the index is not out of bound
             add_if_forward = 1  # add back the index if forward
 
         if mode == "before_t":
             # remove 1 if self.t[idx_end] is larger than end, except if idx_end is 0
-            idx_end -= (self.t[idx_end] > end) - int(idx_end == 0)
+            idx_end -= (self.index[idx_end] > end) - int(idx_end == 0)
         elif mode == "closest_t":
             # subtract 1 if end is closer to self.t[idx_end - 1]
-            di = self.t[idx_end] - end > np.abs(self.t[idx_end - 1] - end)
+            di = self.index[idx_end] - end > np.abs(self.index[idx_end - 1] - end)
             idx_end -= di
-        elif mode == "after_t" and idx_end == len(self.t) - 1:
+        elif mode == "after_t" and idx_end == len(self.index) - 1:
             idx_end += add_if_forward  # add one if idx_start < len(self.t)
         elif mode == "restrict":
-            idx_end += int(self.t[idx_end] <= end)
+            idx_end += int(self.index[idx_end] <= end)
 
         step = None
         if n_points:
@@ -655,6 +700,14 @@ class _Base(abc.ABC):
 
         return check_filename(filename)
 
+    def _samples_after(self, filename):
+        """The object without the timestamps already saved in the bundle `filename`.
+
+        Used to append a growing object to a `.nap` bundle in O(new samples).
+        """
+        i = np.searchsorted(self.index.values, _last_saved_time(filename), side="right")
+        return self[i:]
+
     @classmethod
     def _from_npz_reader(cls, file):
         """Load a time series object from a npz file interface.
@@ -672,12 +725,18 @@ class _Base(abc.ABC):
         kwargs = {
             key: file[key]
             for key in file.keys()
-            if key not in ["start", "end", "type", "_metadata"]
+            if key not in ["start", "end", "type", "_metadata", "_validated"]
         }
+        if "_validated" in file:  # timestamps saved by pynapple
+            kwargs["t"] = TsIndex(kwargs["t"], validated=bool(file["_validated"]))
+        if "d" in kwargs and type(kwargs["d"]) is not np.ndarray:  # directory bundle
+            kwargs["load_array"] = False
         iset = IntervalSet(start=file["start"], end=file["end"])
         ts = cls(time_support=iset, **kwargs)
         if "_metadata" in file:  # load metadata if it exists
             if file["_metadata"]:  # check if metadata is not empty
+                import pandas as pd
+
                 m = pd.DataFrame.from_dict(file["_metadata"].item())
                 ts.set_info(m)
         return ts
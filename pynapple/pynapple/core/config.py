@@ -21,6 +21,17 @@ You can view the current backend with
 >>> print(nap.nap_config.backend)
 'jax'
 
+## Parallel execution
+
+The per-unit operations of `TsGroup` (e.g. `count`, `restrict`, `value_from`, the
+randomization functions or `compute_autocorrelogram`) can run in parallel across the units.
+It is off by default.
+
+>>> nap.nap_config.n_jobs = 8  # -1 uses all the CPUs
+>>> nap.nap_config.parallel_backend = "process"  # Default. Or "thread".
+
+The results do not depend on the number of workers.
+
 ## Warnings configuration
 
 pynapple gives warnings that can be helpful to debug. For example when passing time indexes that are not sorted:
@@ -51,6 +62,8 @@ shape: 3
 import importlib.util
 import warnings
 
+import numpy as np
+
 
 class PynappleConfig:
     """
@@ -73,12 +86,19 @@ class PynappleConfig:
         It can be useful to catch data where timestamps are not properly sorted before using pynapple.
     time_index_precision : int
         Number of decimal places to round time index. Pynapple's precision is set by default to 9.
+    n_jobs : int
+        Number of workers for the per-unit operations of TsGroup. 1 [default] runs them
+        serially and -1 uses all the CPUs.
+    parallel_backend : str
+        Pool of workers used if `n_jobs` is not 1. Options are ('process' [default], 'thread')
     """
 
     def __init__(self):
         self.suppress_conversion_warnings = False
         self.suppress_time_index_sorting_warnings = False
         self.backend = "numba"
+        self.n_jobs = 1
+        self.parallel_backend = "process"
 
     @property
     def backend(self):
@@ -119,6 +139,35 @@ class PynappleConfig:
         """
         return 9
 
+    @property
+    def n_jobs(self):
+        """
+        Gets or sets the number of workers for the per-unit operations of TsGroup.
+        Negative values count from the number of CPUs (-1 uses all of them).
+        """
+        return self._n_jobs
+
+    @n_jobs.setter
+    def n_jobs(self, value):
+        if not isinstance(value, (int, np.integer)) or isinstance(value, bool):
+            raise ValueError("n_jobs must be an integer.")
+        if value == 0:
+            raise ValueError("n_jobs must be different from 0.")
+        self._n_jobs = int(value)
+
+    @property
+    def parallel_backend(self):
+        """
+        Gets or sets the pool of workers: "process" or "thread".
+        """
+        return self._parallel_backend
+
+    @parallel_backend.setter
+    def parallel_backend(self, value):
+        if value not in ["process", "thread"]:
+            raise ValueError("Options for parallel_backend are 'process' or 'thread'")
+        self._parallel_backend = value
+
     @property
     def suppress_conversion_warnings(self):
         """
@@ -159,6 +208,8 @@ class PynappleConfig:
         """
         self.suppress_conversion_warnings = False
         self.suppress_time_index_sorting_warnings = False
+        self.n_jobs = 1
+        self.parallel_backend = "process"
 
 
 # Initialize a config instance
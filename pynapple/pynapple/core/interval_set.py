@@ -7,7 +7,6 @@ import warnings
 from numbers import Number
 
 import numpy as np
-import pandas as pd
 from numpy.lib.mixins import NDArrayOperatorsMixin
 from tabulate import tabulate
 
@@ -25,6 +24,8 @@ from .utils import (
     _convert_iter_to_str,
     _get_terminal_size,
     _IntervalSetSliceHelper,
+    _is_pandas,
+    _save_arrays,
     check_filename,
     convert_to_numpy_array,
     is_array_like,
@@ -191,7 +192,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
             end = start.end.astype(np.float64)
             start = start.start.astype(np.float64)
 
-        elif isinstance(start, pd.DataFrame):
+        elif _is_pandas(start, "DataFrame"):
             assert (
                 "start" in start.columns and "end" in start.columns
             ), """
@@ -228,7 +229,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
                     args[arg] = np.array([data])
                 elif isinstance(data, (list, tuple)):
                     args[arg] = np.ravel(np.array(data))
-                elif isinstance(data, pd.Series):
+                elif _is_pandas(data, "Series"):
                     args[arg] = data.values
                 elif isinstance(data, np.ndarray):
                     args[arg] = np.ravel(data)
@@ -293,6 +294,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         _MetadataMixin.__init__(self)
         self._class_attributes = self.__dir__()  # get list of all attributes
         self._class_attributes.append("_class_attributes")  # add this property
+        self._class_attributes.append("_metadata")  # created on first access
         self._initialized = True
         if (drop_meta is False) and (metadata is not None):
             self.set_info(metadata)
@@ -306,13 +308,11 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         # By default, the first three columns should always show.
 
         # Adding an extra column between actual values and metadata
-        try:
-            metadata = self._metadata
-            col_names = metadata.columns
-        except Exception:
-            # Necessary for backward compatibility when saving IntervalSet as pickle
-            metadata = pd.DataFrame(index=self.index)
-            col_names = []
+        col_names = self.metadata_columns
+        if len(col_names):
+            metadata = self._metadata.values
+        else:
+            metadata = np.empty((len(self), 0), dtype=object)
 
         headers = ["index", "start", "end"]
         if len(col_names):
@@ -328,7 +328,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
                         (
                             self.index[0:n_rows, None],
                             self.values[0:n_rows],
-                            _convert_iter_to_str(metadata.values[0:n_rows]),
+                            _convert_iter_to_str(metadata[0:n_rows]),
                         ),
                         dtype=object,
                     ),
@@ -337,7 +337,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
                         (
                             self.index[-n_rows:, None],
                             self.values[-n_rows:],
-                            _convert_iter_to_str(metadata.values[-n_rows:]),
+                            _convert_iter_to_str(metadata[-n_rows:]),
                         ),
                         dtype=object,
                     ),
@@ -348,7 +348,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
                 (
                     self.index[:, None],
                     self.values,
-                    _convert_iter_to_str(metadata.values),
+                    _convert_iter_to_str(metadata),
                 ),
                 dtype=object,
             )
@@ -381,14 +381,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         if name in ("__getstate__", "__setstate__", "__reduce__", "__reduce_ex__"):
             raise AttributeError(name)
 
-        try:
-            metadata = self._metadata
-        except Exception:
-            metadata = pd.DataFrame(index=self.index)
-
-        if name == "_metadata":
-            return metadata
-        elif name in metadata.columns:
+        if name == "_metadata" or name in self.metadata_columns:
             return _MetadataMixin.__getattr__(self, name)
         else:
             return super().__getattr__(name)
@@ -412,11 +405,11 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
                 return self.values[:, 0]
             elif key == "end":
                 return self.values[:, 1]
-            elif key in self._metadata.columns:
+            elif key in self.metadata_columns:
                 return _MetadataMixin.__getitem__(self, key)
             else:
                 raise IndexError(
-                    f"Unknown string argument. Should be in {['start', 'end'] + list(self._metadata.keys())}"
+                    f"Unknown string argument. Should be in {['start', 'end'] + self.metadata_columns}"
                 )
         elif isinstance(key, list) and all(isinstance(x, str) for x in key):
             # self[[*str]]
@@ -430,14 +423,14 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         elif isinstance(key, Number):
             # self[Number]
             output = self.values.__getitem__(key)
-            metadata = self._metadata.iloc[key]
+            metadata = self._metadata_rows([key])
             return IntervalSet(start=output[0], end=output[1], metadata=metadata)
         elif isinstance(key, (slice, list, np.ndarray)):
             # self[array_like], use iloc for metadata
             output = self.values.__getitem__(key)
-            metadata = self._metadata.iloc[key].reset_index(drop=True)
+            metadata = self._metadata_rows(key)
             return IntervalSet(start=output[:, 0], end=output[:, 1], metadata=metadata)
-        elif isinstance(key, (pd.Series, pd.Index)):
+        elif _is_pandas(key, "Series", "Index"):
             # use loc for metadata
             output = self.values.__getitem__(key)
             metadata = _MetadataMixin.__getitem__(self, key).reset_index(drop=True)
@@ -455,7 +448,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
                         return self.values[key[0], 0]
                     elif key[1] == "end":
                         return self.values[key[0], 1]
-                    elif key[1] in self._metadata.columns:
+                    elif key[1] in self.metadata_columns:
                         return _MetadataMixin.__getitem__(self, key)
 
                 elif isinstance(key[1], (list, np.ndarray)):
@@ -488,17 +481,18 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
                     if key[1] == slice(None, None, None):
                         # self[Any, :]
                         output = self.values.__getitem__(key[0])
-                        metadata = self._metadata.iloc[key[0]]
 
                         if isinstance(key[0], Number):
                             return IntervalSet(
-                                start=output[0], end=output[1], metadata=metadata
+                                start=output[0],
+                                end=output[1],
+                                metadata=self._metadata_rows([key[0]]),
                             )
                         else:
                             return IntervalSet(
                                 start=output[:, 0],
                                 end=output[:, 1],
-                                metadata=metadata.reset_index(drop=True),
+                                metadata=self._metadata_rows(key[0]),
                             )
 
                     elif (key[1] == slice(0, 2, None)) or (
@@ -646,6 +640,8 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         ep = cls(start=file["start"], end=file["end"])
         if "_metadata" in file:  # load metadata if it exists
             if file["_metadata"]:  # check that metadata is not empty
+                import pandas as pd
+
                 metadata = pd.DataFrame.from_dict(file["_metadata"].item())
                 ep.set_info(metadata)
         return ep
@@ -704,8 +700,10 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         start2 = a.values[:, 0]
         end2 = a.values[:, 1]
         s, e, m = jitintersect(start1, end1, start2, end2)
-        m1 = self._metadata.loc[m[:, 0]].reset_index(drop=True)
-        m2 = a._metadata.loc[m[:, 1]].reset_index(drop=True)
+        m1 = self._metadata_rows(m[:, 0])
+        m2 = a._metadata_rows(m[:, 1])
+        if m1 is None or m2 is None:
+            return IntervalSet(s, e, metadata=m2 if m1 is None else m1)
         # In case some columns overlap
         overlap = np.intersect1d(m1.columns, m2.columns)
         if len(overlap):
@@ -758,8 +756,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         start2 = a.values[:, 0]
         end2 = a.values[:, 1]
         s, e, m = jitdiff(start1, end1, start2, end2)
-        m1 = self._metadata.loc[m].reset_index(drop=True)
-        return IntervalSet(s, e, metadata=m1)
+        return IntervalSet(s, e, metadata=self._metadata_rows(m))
 
     def in_interval(self, tsd):
         """
@@ -845,6 +842,8 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         if units == "us":
             data = data.astype(np.int64)
 
+        import pandas as pd
+
         df = pd.DataFrame(index=self.index, data=data, columns=self.columns)
 
         return df
@@ -924,6 +923,8 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         out: pandas.DataFrame
             _
         """
+        import pandas as pd
+
         df = pd.DataFrame(data=self.values, columns=["start", "end"])
         return pd.concat([df, self._metadata], axis=1)
 
@@ -941,7 +942,8 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         Parameters
         ----------
         filename : str
-            The filename
+            The filename. If the extension is `.nap`, the object is saved as a directory
+            bundle of `.npy` files that is memory-mapped by `nap.load_file`.
 
         Examples
         --------
@@ -964,12 +966,13 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         RuntimeError
             If filename is not str, path does not exist or filename is a directory.
         """
-        np.savez(
+        _save_arrays(
             check_filename(filename),
             start=self.values[:, 0],
             end=self.values[:, 1],
             type=np.array(["IntervalSet"], dtype=np.str_),
-            _metadata=self._metadata.to_dict(),  # save metadata as dictionary
+            # save metadata as dictionary
+            _metadata=self._metadata.to_dict() if len(self.metadata_columns) else {},
         )
 
         return
@@ -1048,7 +1051,7 @@ class IntervalSet(NDArrayOperatorsMixin, _MetadataMixin):
         new_starts = new_starts[tokeep]
         new_ends = new_ends[tokeep]
         new_meta = new_meta[tokeep]
-        metadata = self._metadata.loc[new_meta].reset_index(drop=True)
+        metadata = self._metadata_rows(new_meta)
 
         # Removing 1 microsecond to have strictly non-overlapping intervals for intervals coming from the same epoch
         new_ends -= 1e-6
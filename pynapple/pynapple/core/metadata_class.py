@@ -1,10 +1,14 @@
 import inspect
 import warnings
 from numbers import Number
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 import numpy as np
-import pandas as pd
+
+from .utils import _is_pandas
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def add_meta_docstring(meta_func, sep="\n"):
@@ -23,22 +27,23 @@ class _MetadataMixin:
     This is a private mixin that is not meant to be instantiated on its own.
     """
 
-    metadata_index: Union[np.ndarray, pd.Index]
+    metadata_index: Union[np.ndarray, "pd.Index"]
     """Row index for metadata DataFrame. This matches the index for TsGroup and IntervalSet, and the columns for TsdFrame."""
 
     def __init__(self):
         """
-        Metadata initializer. This sets the metadata index using properties of the inheriting class and initialized an empty metadata DataFrame.
-        Metadata can be set using the `set_info()` method.
+        Metadata initializer. This sets the metadata index using properties of the inheriting class.
+        The metadata DataFrame is only created on first access (see `__getattr__`), so that pandas is not
+        needed by objects without metadata. Metadata can be set using the `set_info()` method.
         """
         if self.__class__.__name__ == "TsdFrame":
             # metadata index is the same as the columns for TsdFrame
-            self.metadata_index = self.columns
+            self.metadata_index = self._columns
         else:
             # metadata index is the same as the index for TsGroup and IntervalSet
             self.metadata_index = self.index
-
-        self._metadata = pd.DataFrame(index=self.metadata_index)
+        # Metadata columns kept as arrays until the metadata DataFrame is created
+        self._initial_metadata = {}
 
     def __dir__(self):
         """
@@ -66,8 +71,17 @@ class _MetadataMixin:
         # self._metadata.column having attributes '__reduce__', '__reduce_ex__'
         if name in ("__getstate__", "__setstate__", "__reduce__", "__reduce_ex__"):
             raise AttributeError(name)
+        if name == "_metadata":
+            # Empty metadata DataFrame, created on first access
+            import pandas as pd
+
+            metadata = pd.DataFrame(
+                data=self._initial_metadata, index=self.metadata_index
+            )
+            self.__dict__["_metadata"] = metadata
+            return metadata
         # Check if the requested attribute is part of the metadata
-        if name in self._metadata.columns:
+        if name in self.metadata_columns:
             return self._metadata[name]
         else:
             # If the attribute is not part of the metadata, raise AttributeError
@@ -102,8 +116,19 @@ class _MetadataMixin:
         """
         List of metadata column names.
         """
+        # do not create the metadata DataFrame if it does not exist yet
+        if "_metadata" not in self.__dict__:
+            return list(self._initial_metadata)
         return list(self._metadata.columns)
 
+    def _metadata_rows(self, rows):
+        """
+        Metadata of the positional indices `rows` with a reset index, or None if there is no metadata.
+        """
+        if not len(self.metadata_columns):
+            return None
+        return self._metadata.iloc[rows].reset_index(drop=True)
+
     def _raise_invalid_metadata_column_name(self, name):
         """
         Check if metadata name is valid and raise warnings if it cannot be accessed as an attribute or key.
@@ -157,7 +182,7 @@ class _MetadataMixin:
         Throw warnings when metadata names cannot be accessed as attributes or keys. Wrapper for _raise_invalid_metadata_column_name.
         """
         if metadata is not None:
-            if isinstance(metadata, pd.DataFrame):
+            if _is_pandas(metadata, "DataFrame"):
                 [
                     self._raise_invalid_metadata_column_name(col)
                     for col in metadata.columns
@@ -165,7 +190,7 @@ class _MetadataMixin:
             elif isinstance(metadata, dict):
                 [self._raise_invalid_metadata_column_name(k) for k in metadata.keys()]
 
-            elif isinstance(metadata, pd.Series) and len(self) == 1:
+            elif _is_pandas(metadata, "Series") and len(self) == 1:
                 [self._raise_invalid_metadata_column_name(k) for k in metadata.index]
 
         for k in kwargs:
@@ -207,6 +232,10 @@ class _MetadataMixin:
         TypeError
             If key-word arguments are not of type `pandas.Series`, `tuple`, `list`, or `numpy.ndarray` and cannot be set.
         """
+        if metadata is None and not len(kwargs):
+            return
+        import pandas as pd
+
         # check for duplicate names and/or formatted names that cannot be accessed as attributes or keys
         self._check_metadata_column_names(metadata, **kwargs)
         not_set = []
@@ -291,6 +320,8 @@ class _MetadataMixin:
         IndexError
             If the metadata index is not found.
         """
+        import pandas as pd
+
         # string indexing of one or more metadata columns
         if isinstance(key, str) or (
             isinstance(key, list) and all([isinstance(k, str) for k in key])
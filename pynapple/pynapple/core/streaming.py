@@ -0,0 +1,279 @@
+"""
+Incremental binning of spike streams.
+
+The class `OnlineBinner` receives the spikes of a population as they arrive, in batches
+of (unit ids, times), and keeps the counts of the latest bins in a ring buffer, along
+with rates smoothed by a causal kernel. Adding a batch costs O(batch size) and the
+latest window can be read at any time as a TsdFrame, with the same bins and counts as
+`TsGroup.count` on the whole history:
+
+>>> import pynapple as nap
+>>> binner = nap.OnlineBinner([0, 1, 2], bin_size=0.01, window=1.0)
+>>> binner.push([0, 2, 2], [0.0012, 0.0034, 0.0125])
+>>> binner.advance(0.02)
+>>> binner.counts()
+Time (s)      0    1    2
+----------  ---  ---  ---
+0.005         1    0    1
+0.015         0    0    1
+dtype: int64, shape: (2, 3)
+"""
+
+import numpy as np
+
+from .interval_set import IntervalSet
+from .time_index import TsIndex
+from .time_series import TsdFrame
+from .ts_group import TsGroup
+
+
+class OnlineBinner:
+    """
+    Rolling binned counts and smoothed rates of a stream of spikes.
+
+    Bins are aligned on `start`, with the bounds of `TsGroup.count`: the bin `j` covers
+    `[start + j * bin_size, start + (j + 1) * bin_size)`. The current time is the time of
+    the latest spike pushed or the time passed to `advance`, whichever is later. The
+    window holds the last `window / bin_size` bins whose center is before the current
+    time, so that `counts()` equals the last rows of
+    `group.count(bin_size, ep=nap.IntervalSet(start, binner.time))`.
+
+    Spikes may arrive out of order as long as their bin is still in the window. Older
+    spikes and spikes before `start` are dropped and counted in `n_dropped`.
+
+    The rates are the counts convolved with a causal kernel, divided by the bin size.
+    The kernel is either given directly, as weights of the current and previous bins,
+    or is the causal half of a gaussian of standard deviation `std`. Without kernel,
+    the rates are the counts divided by the bin size.
+
+    Parameters
+    ----------
+    units : array_like or TsGroup
+        The unit ids, or a TsGroup whose keys are the unit ids
+    bin_size : float
+        The bin size
+    window : float
+        The duration of the window of bins kept in memory
+    start : float, optional
+        The start of the first bin. Default is 0.
+    std : float, optional
+        Standard deviation of the causal gaussian kernel of the rates
+    kernel : array_like, optional
+        Weights of the current bin, the previous bin, etc. in the rates. Bypasses std.
+    time_units : str, optional
+        The time units of bin_size, window, start and std ('us', 'ms', 's' [default])
+
+    Attributes
+    ----------
+    index : numpy.ndarray
+        The unit ids
+    bin_size : float
+        The bin size, in seconds
+    time : float
+        The current time, in seconds
+    n_dropped : int
+        The number of spikes dropped because they were too old or before start
+    """
+
+    def __init__(
+        self,
+        units,
+        bin_size,
+        window,
+        start=0.0,
+        std=None,
+        kernel=None,
+        time_units="s",
+    ):
+        if not isinstance(time_units, str) or time_units not in ["s", "ms", "us"]:
+            raise ValueError("time_units argument should be 's', 'ms' or 'us'.")
+        if isinstance(units, TsGroup):
+            units = units.keys()
+        self.index = np.asarray(units)
+        if len(np.unique(self.index)) != len(self.index):
+            raise ValueError("units should be unique.")
+        self._order = np.argsort(self.index)
+
+        bin_size, window, start = TsIndex.format_timestamps(
+            np.array([bin_size, window, start], dtype=np.float64), time_units
+        )
+        if not bin_size > 0:
+            raise ValueError("bin_size should be positive.")
+        if window < bin_size:
+            raise ValueError("window should be at least one bin.")
+        self.bin_size = bin_size
+        self._start = start
+        self._n_bins = int(np.round(window / bin_size))
+
+        if kernel is None and std is not None:
+            std = TsIndex.format_timestamps(
+                np.array([std], dtype=np.float64), time_units
+            )
+            lags = np.arange(int(np.ceil(3 * std[0] / bin_size)) + 1) * bin_size
+            kernel = np.exp(-0.5 * (lags / std[0]) ** 2)
+            kernel /= kernel.sum()
+        self._kernel = np.ones(1) if kernel is None else np.asarray(kernel, float)
+        if self._kernel.ndim != 1 or len(self._kernel) == 0:
+            raise ValueError("kernel should be a non-empty 1-d array.")
+
+        # The counts keep one bin more than the window, the bin holding the current
+        # time. The rates also hold the future bins reached by the kernel.
+        n_units = len(self.index)
+        self._counts = np.zeros((self._n_bins + 1, n_units), dtype=np.int64)
+        self._rates = np.zeros((self._n_bins + len(self._kernel), n_units))
+        self._head = -1  # Bin of the current time
+        self.time = start
+        self.n_dropped = 0
+
+    def __repr__(self):
+        return "{}: {} units, {} bins of {} s, time {} s".format(
+            type(self).__name__,
+            len(self.index),
+            self._n_bins,
+            self.bin_size,
+            self.time,
+        )
+
+    def _lbound(self, j):
+        return np.round(self._start + j * self.bin_size, 9)
+
+    def _rbound(self, j):
+        return np.round(self._lbound(j) + self.bin_size, 9)
+
+    def _bin(self, t):
+        """Last bin whose left bound is before each time of `t`."""
+        j = np.floor((t - self._start) / self.bin_size).astype(np.int64)
+        j -= t < self._lbound(j)
+        j += t >= self._lbound(j + 1)
+        return j
+
+    def _columns(self, units):
+        units = np.asarray(units)
+        pos = np.searchsorted(self.index, units, sorter=self._order)
+        pos = np.minimum(pos, len(self.index) - 1)
+        columns = self._order[pos]
+        if len(units) and not np.array_equal(self.index[columns], units):
+            unknown = units[self.index[columns] != units]
+            raise ValueError("Unknown unit ids: {}".format(np.unique(unknown)))
+        return columns
+
+    def _clear(self, buffer, first, last):
+        # Zero the slots of the bins first to last (included)
+        n = len(buffer)
+        if last - first + 1 >= n:
+            buffer[:] = 0
+        elif last >= first:
+            buffer[np.arange(first, last + 1) % n] = 0
+
+    def advance(self, t, time_units="s"):
+        """
+        Move the current time to `t`, completing the bins without spikes.
+        The current time never decreases.
+
+        Parameters
+        ----------
+        t : float
+            The new current time
+        time_units : str, optional
+            The time units of t ('us', 'ms', 's' [default])
+        """
+        t = TsIndex.format_timestamps(np.array([t], dtype=np.float64), time_units)[0]
+        if t < self.time or t < self._start:
+            return
+        head = int(self._bin(np.array([t]))[0])
+        if head > self._head:
+            k = len(self._kernel)
+            self._clear(self._counts, self._head + 1, head)
+            self._clear(self._rates, self._head + k, head + k - 1)
+            self._head = head
+        self.time = t
+
+    def push(self, units, times, time_units="s"):
+        """
+        Add a batch of spikes.
+
+        Parameters
+        ----------
+        units : array_like
+            The unit id of each spike
+        times : array_like
+            The time of each spike. They do not need to be sorted.
+        time_units : str, optional
+            The time units of times ('us', 'ms', 's' [default])
+
+        Raises
+        ------
+        ValueError
+            If units and times do not have the same length or if a unit id is unknown
+        """
+        times = np.asarray(times, dtype=np.float64).ravel()
+        columns = self._columns(np.asarray(units).ravel())
+        if len(columns) != len(times):
+            raise ValueError("units and times should have the same length.")
+        if len(times) == 0:
+            return
+        times = TsIndex.format_timestamps(times, time_units)
+        self.advance(times.max())
+
+        # A spike belongs to the bins whose bounds contain it. Because of the rounding
+        # of the bounds, it can also belong to the previous bin, as in TsGroup.count.
+        last = self._bin(times)
+        previous = times < self._rbound(last - 1)
+        j = np.concatenate([last, last[previous] - 1])
+        c = np.concatenate([columns, columns[previous]])
+        t = np.concatenate([times, times[previous]])
+        valid = (j >= 0) & (j > self._head - len(self._counts)) & (t < self._rbound(j))
+        counted = valid[: len(times)]
+        counted[previous] |= valid[len(times) :]
+        self.n_dropped += len(times) - int(np.sum(counted))
+
+        j, c = j[valid], c[valid]
+        np.add.at(self._counts, (j % len(self._counts), c), 1)
+        lags = np.arange(len(self._kernel))
+        np.add.at(
+            self._rates,
+            ((j[:, None] + lags) % len(self._rates), c[:, None]),
+            self._kernel,
+        )
+
+    def _window(self):
+        # Bins of the window, i.e. the last bins whose center is before the time
+        last = self._head
+        if last >= 0 and self._lbound(last) + self.bin_size / 2 > self.time:
+            last -= 1
+        return np.arange(max(last - self._n_bins + 1, 0), last + 1)
+
+    def _frame(self, bins, values):
+        if len(bins) == 0:
+            return TsdFrame(t=np.zeros(0), d=values[:0], columns=self.index)
+        lbound = self._lbound(bins)
+        return TsdFrame(
+            t=lbound + self.bin_size / 2,
+            d=values,
+            time_support=IntervalSet(lbound[0], self.time),
+            columns=self.index,
+        )
+
+    def counts(self):
+        """
+        The counts of the bins of the window.
+
+        Returns
+        -------
+        TsdFrame
+            The counts, with the units in columns
+        """
+        bins = self._window()
+        return self._frame(bins, self._counts[bins % len(self._counts)])
+
+    def rates(self):
+        """
+        The smoothed rates of the bins of the window, in Hz.
+
+        Returns
+        -------
+        TsdFrame
+            The rates, with the units in columns
+        """
+        bins = self._window()
+        return self._frame(bins, self._rates[bins % len(self._rates)] / self.bin_size)
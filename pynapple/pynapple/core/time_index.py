@@ -4,6 +4,9 @@ Similar to pandas.Index, `TsIndex` holds the timestamps associated with the data
 This class deals with conversion between different time units for all pynapple objects as well
 as making sure that timestamps are property sorted before initializing any objects.
 
+`RegularTsIndex` holds the timestamps of a regularly sampled time series (i.e. lfp) without
+storing them. It only keeps the start time, the sampling rate and the number of samples.
+
     - `us`: microseconds
     - `ms`: milliseconds
     - `s`: seconds  (overall default)
@@ -12,6 +15,7 @@ as making sure that timestamps are property sorted before initializing any objec
 from warnings import warn
 
 import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
 
 from .config import nap_config
 
@@ -19,6 +23,10 @@ from .config import nap_config
 class TsIndex(np.ndarray):
     """
     Holder for timestamps. Similar to pandas.Index. Subclass numpy.ndarray
+
+    By default, timestamps are converted to seconds, rounded and sorted. If `validated` is True,
+    timestamps are assumed to be already sorted seconds at pynapple precision (for example when
+    loading a file saved by pynapple) and are used without any copy or check.
     """
 
     @staticmethod
@@ -110,11 +118,15 @@ class TsIndex(np.ndarray):
             t = np.sort(t)
         return t
 
-    def __new__(cls, t, time_units="s"):
+    def __new__(cls, t, time_units="s", validated=False):
         assert t.ndim == 1, "t should be 1 dimensional"
-        t = t.astype(np.float64)
-        t = TsIndex.format_timestamps(t, time_units)
-        t = TsIndex.sort_timestamps(t)
+        if validated:
+            # Timestamps already in pynapple format, i.e. saved by pynapple.
+            t = np.asarray(t, dtype=np.float64)
+        else:
+            t = t.astype(np.float64)
+            t = TsIndex.format_timestamps(t, time_units)
+            t = TsIndex.sort_timestamps(t)
         obj = np.asarray(t).view(cls)
         return obj
 
@@ -151,3 +163,233 @@ class TsIndex(np.ndarray):
             The timestamps in seconds
         """
         return TsIndex.return_timestamps(self.values, time_units)
+
+
+class RegularTsIndex(NDArrayOperatorsMixin):
+    """
+    Holder for regularly sampled timestamps.
+
+    Only the start time, the sampling rate and the number of samples are stored.
+    The timestamps `t[i] = start + i / rate` are generated when requested, either explicitly
+    with `values` or when the object is converted with `numpy.asarray`.
+    Slicing, `searchsorted` and restricting to epochs are computed arithmetically.
+
+    Examples
+    --------
+    >>> import pynapple as nap
+    >>> import numpy as np
+    >>> index = nap.RegularTsIndex(start=0, rate=1250, n=1000000)
+    >>> tsd = nap.Tsd(t=index, d=np.random.randn(1000000))
+    """
+
+    def __init__(self, start, rate, n):
+        """
+        Parameters
+        ----------
+        start : float
+            The first timestamp in seconds
+        rate : float
+            The sampling rate in Hz
+        n : int
+            The number of timestamps
+
+        Raises
+        ------
+        ValueError
+            If rate is not strictly positive or n is negative
+        """
+        if not rate > 0:
+            raise ValueError("rate should be strictly positive.")
+        if int(n) < 0:
+            raise ValueError("n should be positive.")
+
+        # t[i] = round(t0 + (offset + i * step) / fs) so that slices
+        # generate exactly the same timestamps as their parent index.
+        self._t0 = float(start)
+        self._fs = float(rate)
+        self._offset = 0
+        self._step = 1
+        self._n = int(n)
+
+    def _new(self, offset, step, n):
+        new = RegularTsIndex.__new__(RegularTsIndex)
+        new._t0 = self._t0
+        new._fs = self._fs
+        new._offset = offset
+        new._step = step
+        new._n = n
+        return new
+
+    def _times(self, i):
+        return np.around(
+            self._t0 + (self._offset + i * self._step) / self._fs,
+            nap_config.time_index_precision,
+        )
+
+    @property
+    def start(self):
+        """The first timestamp in seconds"""
+        return self._times(0) if self._n else np.nan
+
+    @property
+    def rate(self):
+        """The sampling rate in Hz"""
+        return self._fs / self._step
+
+    @property
+    def values(self):
+        """Returns the index as a ndarray
+
+        Returns
+        -------
+        numpy.ndarray
+            The timestamps in seconds
+        """
+        return self._times(np.arange(self._n))
+
+    @property
+    def shape(self):
+        return (self._n,)
+
+    @property
+    def ndim(self):
+        return 1
+
+    @property
+    def size(self):
+        return self._n
+
+    @property
+    def dtype(self):
+        return np.dtype(np.float64)
+
+    def __len__(self):
+        return self._n
+
+    def __repr__(self):
+        return "RegularTsIndex(start={}, rate={}, n={})".format(
+            self.start, self.rate, self._n
+        )
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.values, dtype=dtype)
+
+    def __array_ufunc__(self, ufunc, method, *args, **kwargs):
+        args = [a.values if isinstance(a, RegularTsIndex) else a for a in args]
+        return getattr(ufunc, method)(*args, **kwargs)
+
+    def __getattr__(self, name):
+        # Fall back on the materialized timestamps for any other array method
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.values, name)
+
+    def __iter__(self):
+        for i in range(0, self._n, 65536):
+            yield from self._times(np.arange(i, min(i + 65536, self._n)))
+
+    def __setitem__(self, *args, **kwargs):
+        raise RuntimeError("TsIndex object is not mutable.")
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if not -self._n <= key < self._n:
+                raise IndexError(
+                    "index {} is out of bounds for axis 0 with size {}".format(
+                        key, self._n
+                    )
+                )
+            return self._times(key % self._n)
+        elif isinstance(key, slice):
+            start, stop, step = key.indices(self._n)
+            if step > 0:
+                return self._new(
+                    self._offset + start * self._step,
+                    self._step * step,
+                    len(range(start, stop, step)),
+                )
+        elif isinstance(key, tuple) and len(key) and isinstance(key[0], slice):
+            return np.asarray(self[key[0]])[(slice(None),) + key[1:]]
+
+        return self.values[key].view(TsIndex)
+
+    def searchsorted(self, v, side="left", sorter=None):
+        """Find the indices where the times `v` should be inserted to maintain order.
+
+        Equivalent to `numpy.searchsorted` on the timestamps, without generating them.
+
+        Parameters
+        ----------
+        v : float or array-like
+            Times in seconds
+        side : str, optional
+            'left' [default] or 'right'
+
+        Returns
+        -------
+        int or numpy.ndarray
+            The insertion indices
+        """
+        v = np.asarray(v, dtype=np.float64)
+        if self._n == 0:
+            return np.zeros(v.shape, dtype=np.int64)[()]
+
+        pos = ((v - self._t0) * self._fs - self._offset) / self._step
+        i = np.clip(np.ceil(pos), 0, self._n).astype(np.int64)
+
+        # Correct the floating point errors against the generated timestamps
+        if side == "left":
+            i = i - ((i > 0) & (self._times(np.maximum(i - 1, 0)) >= v))
+            i = i + ((i < self._n) & (self._times(np.minimum(i, self._n - 1)) < v))
+        else:
+            i = i - ((i > 0) & (self._times(np.maximum(i - 1, 0)) > v))
+            i = i + ((i < self._n) & (self._times(np.minimum(i, self._n - 1)) <= v))
+        return i[()]
+
+    def restrict_index(self, starts, ends):
+        """Return the indices of the timestamps within a set of epochs.
+
+        Parameters
+        ----------
+        starts : numpy.ndarray
+            Start of the epochs
+        ends : numpy.ndarray
+            End of the epochs
+
+        Returns
+        -------
+        slice or numpy.ndarray
+            A slice for a single epoch, the array of indices otherwise.
+        """
+        idx_start = self.searchsorted(starts, side="left")
+        idx_end = np.maximum(self.searchsorted(ends, side="right"), idx_start)
+        if len(idx_start) == 1:
+            return slice(int(idx_start[0]), int(idx_end[0]))
+
+        lengths = idx_end - idx_start
+        offsets = np.repeat(idx_start - (np.cumsum(lengths) - lengths), lengths)
+        return offsets + np.arange(np.sum(lengths))
+
+    def copy(self):
+        """Return a copy of the index"""
+        return self._new(self._offset, self._step, self._n)
+
+    def to_numpy(self):
+        """Return the index as a ndarray. Useful for matplotlib.
+
+        Returns
+        -------
+        numpy.ndarray
+            The timestamps in seconds
+        """
+        return self.values
+
+    def in_units(self, time_units="s"):
+        """Return the index as a ndarray in the desired units
+
+        Returns
+        -------
+        numpy.ndarray
+            The timestamps in seconds
+        """
+        return TsIndex.return_timestamps(self.values, time_units)
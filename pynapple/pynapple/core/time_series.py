@@ -19,28 +19,44 @@ import abc
 import importlib
 import warnings
 from numbers import Number
+from typing import TYPE_CHECKING
 
 import numpy as np
-import pandas as pd
 from numpy.lib.mixins import NDArrayOperatorsMixin
-from scipy import signal
 from tabulate import tabulate
 
-from ._core_functions import _bin_average, _convolve, _dropna, _restrict, _threshold
-from .base_class import _Base
+from ._core_functions import (
+    _bin_average,
+    _convolve,
+    _dropna,
+    _interpolate,
+    _restrict,
+    _threshold,
+)
+from .base_class import _Base, _restrict_index
 from .interval_set import IntervalSet
 from .metadata_class import _MetadataMixin, add_meta_docstring
 from .time_index import TsIndex
 from .utils import (
+    _chunk_cache,
+    _column_array,
     _concatenate_tsd,
     _convert_iter_to_str,
+    _get_column_indexer,
     _get_terminal_size,
+    _getitem,
+    _is_pandas,
+    _save_arrays,
     _split_tsd,
+    _take_rows,
     _TsdFrameSliceHelper,
     convert_to_array,
     is_array_like,
 )
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 def _get_class(data):
     """Select the right time series object and return the class
@@ -131,16 +147,9 @@ def _initialize_tsd_output(
                 if isinstance(input_object, TsdFrame) and (
                     values.shape[1] == input_object.shape[1]
                 ):
-                    cols = (
-                        cols
-                        if cols is not None
-                        else getattr(input_object, "columns", None)
-                    )
-                    metadata = (
-                        metadata
-                        if metadata is not None
-                        else getattr(input_object, "metadata", None)
-                    )
+                    cols = cols if cols is not None else input_object._columns
+                    if metadata is None and len(input_object.metadata_columns):
+                        metadata = input_object.metadata
 
                 # update the kwargs
                 kwargs.update({"columns": cols, "metadata": metadata})
@@ -179,14 +188,11 @@ class _BaseTsd(_Base, NDArrayOperatorsMixin, abc.ABC):
         )
 
         if isinstance(time_support, IntervalSet) and len(self.index):
-            starts = time_support.start
-            ends = time_support.end
-            idx = _restrict(self.index.values, starts, ends)
-            t = self.index.values[idx]
-            d = self.values[idx]
-
-            self.index = TsIndex(t)
-            self.values = d
+            idx = _restrict_index(self.index, time_support.start, time_support.end)
+            if not (isinstance(idx, slice) and idx == slice(0, len(self.index))):
+                # Lazy data is not read if all the points are kept
+                self.index = self.index[idx]
+                self.values = _take_rows(self.values, idx)
             self.rate = self.index.shape[0] / np.sum(
                 time_support.values[:, 1] - time_support.values[:, 0]
             )
@@ -215,6 +221,7 @@ class _BaseTsd(_Base, NDArrayOperatorsMixin, abc.ABC):
             self.values.__setitem__(key, value)
         except IndexError:
             raise IndexError
+        _chunk_cache.discard(self.values)  # stale chunks of a lazy dataset
 
     def __getattr__(self, name):
         """Allow numpy functions to be attached as attributes of Tsd objects"""
@@ -559,7 +566,9 @@ class _BaseTsd(_Base, NDArrayOperatorsMixin, abc.ABC):
         if M % 2 == 0:
             M += 1
 
-        window = signal.windows.gaussian(M=M, std=std_size)
+        from scipy.signal import windows
+
+        window = windows.gaussian(M=M, std=std_size)
 
         if norm:
             window = window / window.sum()
@@ -601,40 +610,15 @@ class _BaseTsd(_Base, NDArrayOperatorsMixin, abc.ABC):
 
         new_t = ts.restrict(ep).index
 
-        new_shape = (
-            len(new_t) if self.values.ndim == 1 else (len(new_t),) + self.shape[1:]
+        new_d = _interpolate(
+            self.index.values,
+            self.values,
+            new_t.values,
+            ep.start,
+            ep.end,
+            left=left,
+            right=right,
         )
-        new_d = np.full(new_shape, np.nan)
-
-        start = 0
-        for i in range(len(ep)):
-            t = ts.get(ep[i, 0], ep[i, 1])
-            tmp = self.get(ep[i, 0], ep[i, 1])
-
-            if len(t) and len(tmp):
-                if self.values.ndim == 1:
-                    new_d[start : start + len(t)] = np.interp(
-                        t.index.values,
-                        tmp.index.values,
-                        tmp.values,
-                        left=left,
-                        right=right,
-                    )
-                else:
-                    interpolated_values = np.apply_along_axis(
-                        lambda row: np.interp(
-                            t.index.values,
-                            tmp.index.values,
-                            row,
-                            left=left,
-                            right=right,
-                        ),
-                        0,
-                        tmp.values,
-                    )
-                    new_d[start : start + len(t), ...] = interpolated_values
-
-            start += len(t)
 
         return _initialize_tsd_output(self, new_d, time_index=new_t, time_support=ep)
 
@@ -845,7 +829,7 @@ class TsdTensor(_BaseTsd):
                 raise ValueError(
                     "When indexing with a Tsd, it must contain boolean values"
                 )
-            output = self.values[key.values]
+            output = _take_rows(self.values, key.values)
             index = self.index[key.values]
         elif isinstance(key, tuple):
             if any(
@@ -855,17 +839,17 @@ class TsdTensor(_BaseTsd):
                     "When indexing with a Tsd, it must contain boolean values"
                 )
             key = tuple(k.values if isinstance(k, Tsd) else k for k in key)
-            output = self.values.__getitem__(key)
+            output = _getitem(self.values, key)
             index = self.index.__getitem__(key[0])
         else:
-            output = self.values.__getitem__(key)
+            output = _getitem(self.values, key)
             index = self.index.__getitem__(key)
 
         if isinstance(index, Number):
             index = np.array([index])
         return _initialize_tsd_output(self, output, time_index=index)
 
-    def save(self, filename):
+    def save(self, filename, append=False):
         """
         Save TsdTensor object in npz format. The file will contain the timestamps, the
         data and the time support.
@@ -881,7 +865,13 @@ class TsdTensor(_BaseTsd):
         Parameters
         ----------
         filename : str
-            The filename
+            The filename. If the extension is `.nap`, the object is saved as a directory
+            bundle of `.npy` files that is memory-mapped by `nap.load_file`.
+        append : bool, optional
+            Only for `.nap` bundles. Append the timestamps after the last one already
+            saved in the bundle as a new segment instead of overwriting the bundle.
+            The cost is proportional to the number of new timestamps. `nap.load_file`
+            presents the segments as one object.
 
         Examples
         --------
@@ -900,14 +890,17 @@ class TsdTensor(_BaseTsd):
             If filename is not str, path does not exist or filename is a directory.
         """
         filename = self._get_filename(filename)
+        obj = self._samples_after(filename) if append else self
 
-        np.savez(
+        _save_arrays(
             filename,
-            t=self.index.values,
-            d=self.values,
+            append=append,
+            t=obj.index.values,
+            d=obj.values,
             start=self.time_support.start,
             end=self.time_support.end,
             type=np.array([self.nap_class], dtype=np.str_),
+            _validated=np.array(True),
         )
 
         return
@@ -1039,9 +1032,6 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
     dtype: float64, shape: (100, 3)
     """
 
-    columns: pd.Index
-    """Data column names of the TsdFrame"""
-
     def __init__(
         self,
         t,
@@ -1054,7 +1044,7 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
     ):
         c = columns
 
-        if isinstance(t, pd.DataFrame):
+        if _is_pandas(t, "DataFrame"):
             d = t.values
             c = t.columns.values
             t = t.index.values
@@ -1075,16 +1065,28 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
                 len(c) == self.values.shape[1]
             ), "Number of columns should match the second dimension of d"
 
-        self.columns = pd.Index(c)
+        # The pandas.Index of the columns is only built on access of `columns`
+        self._columns = _column_array(c)
         self.nap_class = self.__class__.__name__
         # initialize metadata for class attributes
         _MetadataMixin.__init__(self)
         # get current list of attributes
         self._class_attributes = self.__dir__()
         self._class_attributes.append("_class_attributes")
+        self._class_attributes.append("_metadata")  # created on first access
         # set metadata
         self._initialized = True
-        self.set_info(metadata)
+        if metadata is not None:
+            self.set_info(metadata)
+
+    @property
+    def columns(self) -> "pd.Index":
+        """Data column names of the TsdFrame, as a pandas.Index"""
+        if "_columns_index" not in self.__dict__:
+            import pandas as pd
+
+            self.__dict__["_columns_index"] = pd.Index(self._columns)
+        return self.__dict__["_columns_index"]
 
     @property
     def loc(self):
@@ -1103,7 +1105,7 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
         max_rows = np.maximum(rows - 10, 2)
 
         # Computing headers and bottom
-        headers = ["Time (s)"] + [str(k) for k in self.columns]
+        headers = ["Time (s)"] + [str(k) for k in self._columns]
         bottom = f"dtype: {self.dtype}, shape: {self.shape}"
 
         if self.shape[1] > max_cols:
@@ -1159,7 +1161,7 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
                 end = []
 
             # Adding metadata if any.
-            col_names = self._metadata.columns.values
+            col_names = np.array(self.metadata_columns, dtype=object)
             if len(col_names):
                 ends = np.array([end] * self._metadata.shape[1])
                 table = np.vstack(
@@ -1209,14 +1211,7 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
         if name in ("__getstate__", "__setstate__", "__reduce__", "__reduce_ex__"):
             raise AttributeError(name)
 
-        try:
-            metadata = self._metadata
-        except (AttributeError, RecursionError):
-            metadata = pd.DataFrame(index=self.columns)
-
-        if name == "_metadata":
-            return metadata
-        elif name in metadata.columns:
+        if name == "_metadata" or name in self.metadata_columns:
             return _MetadataMixin.__getattr__(self, name)
         else:
             return super().__getattr__(name)
@@ -1232,20 +1227,21 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
             key = key.d
         try:
             if isinstance(key, str):
-                if key in self.columns:
-                    new_key = self.columns.get_indexer([key])
+                if key in self._columns:
+                    new_key = _get_column_indexer(self._columns, [key])
                     self.values.__setitem__(
                         (slice(None, None, None), new_key[0]), value
                     )
                 else:
                     _MetadataMixin.__setitem__(self, key, value)
             elif hasattr(key, "__iter__") and all([isinstance(k, str) for k in key]):
-                new_key = self.columns.get_indexer(key)
+                new_key = _get_column_indexer(self._columns, key)
                 self.values.__setitem__((slice(None, None, None), new_key), value)
             else:
                 self.values.__setitem__(key, value)
         except IndexError:
             raise IndexError
+        _chunk_cache.discard(self.values)  # stale chunks of a lazy dataset
 
     def __getitem__(self, key, *args, **kwargs):
         if isinstance(key, Tsd):
@@ -1257,7 +1253,7 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
                 )
             key = key.d
         elif isinstance(key, str):
-            if key in self.columns:
+            if key in self._columns:
                 with warnings.catch_warnings():
                     # ignore deprecated warning for loc
                     warnings.simplefilter("ignore")
@@ -1265,7 +1261,7 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
             else:
                 return _MetadataMixin.__getitem__(self, key)
         elif hasattr(key, "__iter__") and all([isinstance(k, str) for k in key]):
-            if all(k in self.columns for k in key):
+            if all(k in self._columns for k in key):
                 with warnings.catch_warnings():
                     # ignore deprecated warning for loc
                     warnings.simplefilter("ignore")
@@ -1273,17 +1269,17 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
             else:
                 return _MetadataMixin.__getitem__(self, key)
         else:
-            if isinstance(key, pd.Series) and key.index.equals(self.columns):
+            if _is_pandas(key, "Series") and key.index.equals(self.columns):
                 # if indexing with a pd.Series from metadata, transform it to tuple with slice(None) in first position
                 key = (slice(None, None, None), key)
 
-            output = self.values.__getitem__(key)
-            columns = self.columns
+            output = _getitem(self.values, key)
+            columns = self._columns
 
             if isinstance(key, tuple):
                 index = self.index.__getitem__(key[0])
                 if len(key) == 2:
-                    columns = self.columns.__getitem__(key[1])
+                    columns = self._columns.__getitem__(key[1])
             else:
                 index = self.index.__getitem__(key)
 
@@ -1310,7 +1306,8 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
                     output = output[None, :]
 
                 kwargs["columns"] = columns
-                kwargs["metadata"] = self._metadata.loc[columns]
+                if len(self.metadata_columns):
+                    kwargs["metadata"] = self._metadata.loc[columns]
                 return _initialize_tsd_output(
                     self, output, time_index=index, kwargs=kwargs
                 )
@@ -1326,6 +1323,8 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
         out: pandas.DataFrame
             _
         """
+        import pandas as pd
+
         return pd.DataFrame(
             index=self.index.values, data=self.values, columns=self.columns
         )
@@ -1348,12 +1347,14 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
         if units == "us":
             t = t.astype(np.int64)
 
+        import pandas as pd
+
         df = pd.DataFrame(index=t, data=self.values)
         df.index.name = "Time (" + str(units) + ")"
         df.columns = self.columns.copy()
         return df
 
-    def save(self, filename):
+    def save(self, filename, append=False):
         """
         Save TsdFrame object in npz format. The file will contain the timestamps, the
         data and the time support.
@@ -1369,7 +1370,13 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
         Parameters
         ----------
         filename : str
-            The filename
+            The filename. If the extension is `.nap`, the object is saved as a directory
+            bundle of `.npy` files that is memory-mapped by `nap.load_file`.
+        append : bool, optional
+            Only for `.nap` bundles. Append the timestamps after the last one already
+            saved in the bundle as a new segment instead of overwriting the bundle.
+            The cost is proportional to the number of new timestamps. `nap.load_file`
+            presents the segments as one object.
 
         Examples
         --------
@@ -1395,19 +1402,24 @@ class TsdFrame(_BaseTsd, _MetadataMixin):
         """
         filename = self._get_filename(filename)
 
-        cols_name = self.columns
+        cols_name = self._columns
         if cols_name.dtype == np.dtype("O"):
             cols_name = cols_name.astype(str)
 
-        np.savez(
+        obj = self._samples_after(filename) if append else self
+
+        _save_arrays(
             filename,
-            t=self.index.values,
-            d=self.values[:],
+            append=append,
+            t=obj.index.values,
+            d=obj.values[:],
             start=self.time_support.start,
             end=self.time_support.end,
             columns=cols_name,
             type=np.array(["TsdFrame"], dtype=np.str_),
-            _metadata=self._metadata.to_dict(),  # save metadata as dictionary
+            # save metadata as dictionary
+            _metadata=self._metadata.to_dict() if len(self.metadata_columns) else {},
+            _validated=np.array(True),
         )
 
         return
@@ -1824,7 +1836,7 @@ class Tsd(_BaseTsd):
             Whether the data should be converted to a numpy (or jax) array. Useful when passing a memory map object like zarr.
             Default is True. Does not apply if `d` is already a numpy array or a numpy memory map.
         """
-        if isinstance(t, pd.Series):
+        if _is_pandas(t, "Series"):
             d = t.values
             t = t.index.values
         else:
@@ -1901,6 +1913,7 @@ class Tsd(_BaseTsd):
                 self.values.__setitem__(key, value)
         except IndexError:
             raise IndexError
+        _chunk_cache.discard(self.values)  # stale chunks of a lazy dataset
 
     def __getitem__(self, key, *args, **kwargs):
         if isinstance(key, Tsd):
@@ -1912,7 +1925,7 @@ class Tsd(_BaseTsd):
                 )
             key = key.d
 
-        output = self.values.__getitem__(key)
+        output = _getitem(self.values, key)
 
         if isinstance(key, tuple):
             index = self.index.__getitem__(key[0])
@@ -1931,6 +1944,8 @@ class Tsd(_BaseTsd):
         out: pandas.Series
             _
         """
+        import pandas as pd
+
         return pd.Series(
             index=self.index.values, data=self.values, copy=True, dtype="float64"
         )
@@ -2065,7 +2080,7 @@ class Tsd(_BaseTsd):
             group, time_support=self.time_support, bypass_check=True
         )
 
-    def save(self, filename):
+    def save(self, filename, append=False):
         """
         Save Tsd object in npz format. The file will contain the timestamps, the
         data and the time support.
@@ -2081,7 +2096,13 @@ class Tsd(_BaseTsd):
         Parameters
         ----------
         filename : str
-            The filename
+            The filename. If the extension is `.nap`, the object is saved as a directory
+            bundle of `.npy` files that is memory-mapped by `nap.load_file`.
+        append : bool, optional
+            Only for `.nap` bundles. Append the timestamps after the last one already
+            saved in the bundle as a new segment instead of overwriting the bundle.
+            The cost is proportional to the number of new timestamps. `nap.load_file`
+            presents the segments as one object.
 
         Examples
         --------
@@ -2105,13 +2126,17 @@ class Tsd(_BaseTsd):
             If filename is not str, path does not exist or filename is a directory.
         """
         filename = self._get_filename(filename)
-        np.savez(
+        obj = self._samples_after(filename) if append else self
+
+        _save_arrays(
             filename,
-            t=self.index.values,
-            d=self.values,
+            append=append,
+            t=obj.index.values,
+            d=obj.values,
             start=self.time_support.start,
             end=self.time_support.end,
             type=np.array([self.nap_class], dtype=np.str_),
+            _validated=np.array(True),
         )
 
         return
@@ -2145,10 +2170,8 @@ class Ts(_Base):
         super().__init__(t, time_units, time_support)
 
         if isinstance(time_support, IntervalSet) and len(self.index):
-            starts = time_support.start
-            ends = time_support.end
-            idx = _restrict(self.index.values, starts, ends)
-            self.index = TsIndex(self.index.values[idx])
+            idx = _restrict_index(self.index, time_support.start, time_support.end)
+            self.index = self.index[idx]
             self.rate = self.index.shape[0] / np.sum(
                 time_support.values[:, 1] - time_support.values[:, 0]
             )
@@ -2211,6 +2234,8 @@ class Ts(_Base):
         out: pandas.Series
             _
         """
+        import pandas as pd
+
         return pd.Series(index=self.index.values, dtype="object")
 
     def as_units(self, units="s"):
@@ -2230,6 +2255,8 @@ class Ts(_Base):
         t = self.index.in_units(units)
         if units == "us":
             t = t.astype(np.int64)
+        import pandas as pd
+
         ss = pd.Series(index=t, dtype="object")
         ss.index.name = "Time (" + str(units) + ")"
         return ss
@@ -2254,7 +2281,7 @@ class Ts(_Base):
         d.fill(value)
         return Tsd(t=self.index, d=d, time_support=self.time_support)
 
-    def save(self, filename):
+    def save(self, filename, append=False):
         """
         Save Ts object in npz format. The file will contain the timestamps and
         the time support.
@@ -2268,7 +2295,13 @@ class Ts(_Base):
         Parameters
         ----------
         filename : str
-            The filename
+            The filename. If the extension is `.nap`, the object is saved as a directory
+            bundle of `.npy` files that is memory-mapped by `nap.load_file`.
+        append : bool, optional
+            Only for `.nap` bundles. Append the timestamps after the last one already
+            saved in the bundle as a new segment instead of overwriting the bundle.
+            The cost is proportional to the number of new timestamps. `nap.load_file`
+            presents the segments as one object.
 
         Examples
         --------
@@ -2292,13 +2325,16 @@ class Ts(_Base):
             If filename is not str, path does not exist or filename is a directory.
         """
         filename = self._get_filename(filename)
+        obj = self._samples_after(filename) if append else self
 
-        np.savez(
+        _save_arrays(
             filename,
-            t=self.index.values,
+            append=append,
+            t=obj.index.values,
             start=self.time_support.start,
             end=self.time_support.end,
             type=np.array(["Ts"], dtype=np.str_),
+            _validated=np.array(True),
         )
 
         return
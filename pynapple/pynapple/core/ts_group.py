@@ -12,12 +12,12 @@ from numbers import Number
 
 import numpy
 import numpy as np
-import pandas as pd
 from tabulate import tabulate
 
-from ._core_functions import _count
+from ._core_functions import _count, _value_from
 from ._jitted_functions import jitunion, jitunion_isets
-from .base_class import _Base
+from ._parallel import map_units
+from .base_class import _Base, _restrict_index
 from .config import nap_config
 from .interval_set import IntervalSet
 from .metadata_class import _MetadataMixin, add_meta_docstring
@@ -26,11 +26,21 @@ from .time_series import Ts, Tsd, TsdFrame, _BaseTsd, is_array_like
 from .utils import (
     _convert_iter_to_str,
     _get_terminal_size,
+    _is_pandas,
+    _last_saved_time,
+    _save_arrays,
     check_filename,
     convert_to_numpy_array,
 )
 
 
+def _concatenate_slices(array, slices):
+    """Concatenate slices of an array, without copy for a single slice."""
+    if len(slices) == 1:
+        return array[slices[0]]
+    return np.concatenate([array[sl] for sl in slices])
+
+
 def _union_intervals(i_sets):
     """
     Helper to merge intervals from ts_group
@@ -63,6 +73,11 @@ def _union_intervals(i_sets):
     return IntervalSet(new_start, new_end)
 
 
+def _count_values(time_array, starts, ends, bin_size, dtype):
+    # Counts of one unit for TsGroup.count, run in parallel by map_units
+    return _count(time_array, starts, ends, bin_size, dtype=dtype)[1]
+
+
 class TsGroup(UserDict, _MetadataMixin):
     """
     Dictionary-like object to group objects with different timestamps (for example timestamps of spikes of a population of neurons).
@@ -244,6 +259,9 @@ class TsGroup(UserDict, _MetadataMixin):
 
         # initialize metadata
         _MetadataMixin.__init__(self)
+        # The rates are kept out of the metadata DataFrame until it is created
+        self._rates = np.zeros(len(self.index))
+        self._initial_metadata["rate"] = self._rates
 
         # Transform elements to Ts/Tsd objects
         for k in self.index:
@@ -282,14 +300,11 @@ class TsGroup(UserDict, _MetadataMixin):
         # grab current attributes before adding metadata
         self._class_attributes = self.__dir__()
         self._class_attributes.append("_class_attributes")  # add this property
+        self._class_attributes.append("_metadata")  # created on first access
 
         # Making the TsGroup non mutable
         self._initialized = True
 
-        # Adding manually the rate column if data is empty.
-        if len(data) == 0:
-            self.set_info(rate=[])
-
         # Trying to add argument as metainfo
         if len(kwargs):
             warnings.warn(
@@ -322,21 +337,14 @@ class TsGroup(UserDict, _MetadataMixin):
         if name in ("__getstate__", "__setstate__", "__reduce__", "__reduce_ex__"):
             raise AttributeError(name)
 
-        try:
-            metadata = self._metadata
-        except Exception:
-            metadata = pd.DataFrame(index=self.index)
-
-        if name == "_metadata":
-            return metadata
-        elif name in metadata.columns:
+        if name == "_metadata" or name in self.metadata_columns:
             return _MetadataMixin.__getattr__(self, name)
         else:
             return super().__getattr__(name)
 
     def __setitem__(self, key, value):
         if not self._initialized:
-            self._metadata.loc[int(key), "rate"] = float(value.rate)
+            self._rates[np.searchsorted(self.index, int(key))] = float(value.rate)
             super().__setitem__(int(key), value)
         else:
             _MetadataMixin.__setitem__(self, key, value)
@@ -346,7 +354,7 @@ class TsGroup(UserDict, _MetadataMixin):
         if isinstance(key, Hashable):
             if self.__contains__(key):
                 return self.data[key]
-            elif key in self._metadata.columns:
+            elif key in self.metadata_columns:
                 return _MetadataMixin.__getitem__(self, key)
             else:
                 raise KeyError(r"Key {} not in group index.".format(key))
@@ -379,15 +387,24 @@ class TsGroup(UserDict, _MetadataMixin):
         return self._ts_group_from_keys(key)
 
     def _ts_group_from_keys(self, keys):
-        metadata = self._metadata.loc[
-            np.sort(keys), self._metadata.columns.drop("rate")
-        ]
         return TsGroup(
             {k: self[k] for k in keys},
             time_support=self.time_support,
-            metadata=metadata,
+            metadata=self._metadata_without_rate(np.sort(keys)),
         )
 
+    def _metadata_without_rate(self, keys=None):
+        """
+        Metadata columns other than rate, of all the elements or of `keys`, or None if
+        there are none. Rates are recomputed by the new TsGroup.
+        """
+        cols = [c for c in self.metadata_columns if c != "rate"]
+        if not len(cols):
+            return None
+        if keys is None:
+            return self._metadata[cols]
+        return self._metadata.loc[keys, cols]
+
     def __repr__(self):
         # Start by determining how many columns and rows.
         # This can be unique for each object
@@ -537,13 +554,22 @@ class TsGroup(UserDict, _MetadataMixin):
            start    end
         0    0.0  100.0
         """
-        newgr = {}
-        for k in self.index:
-            newgr[k] = self.data[k].restrict(ep)
-        cols = self._metadata.columns.drop("rate")
+        if not isinstance(ep, IntervalSet):
+            raise TypeError("Argument should be IntervalSet")
 
+        idx = map_units(
+            _restrict_index,
+            [self.data[k].index for k in self.index],
+            (ep.start, ep.end),
+        )
+        newgr = {}
+        for k, i in zip(self.index, idx):
+            newgr[k] = self.data[k]._restrict_rows(i, ep)
         return TsGroup(
-            newgr, time_support=ep, bypass_check=True, metadata=self._metadata[cols]
+            newgr,
+            time_support=ep,
+            bypass_check=True,
+            metadata=self._metadata_without_rate(),
         )
 
     def value_from(self, tsd, ep=None, mode="closest"):
@@ -597,12 +623,19 @@ class TsGroup(UserDict, _MetadataMixin):
                 f"Argument mode should be 'closest', 'before', or 'after'. {mode} provided instead."
             )
 
+        results = map_units(
+            _value_from,
+            [self.data[k].index.values for k in self.data],
+            (tsd.index.values, tsd.values, ep.start, ep.end, mode),
+        )
+        time_support = IntervalSet(start=ep.start, end=ep.end)
         newgr = {}
-        for k in self.data:
-            newgr[k] = self.data[k].value_from(tsd, ep=ep, mode=mode)
+        for k, (t, d) in zip(self.data, results):
+            newgr[k] = tsd._define_instance(
+                time_index=t, time_support=time_support, values=d
+            )
 
-        cols = self._metadata.columns.drop("rate")
-        return TsGroup(newgr, time_support=ep, metadata=self._metadata[cols])
+        return TsGroup(newgr, time_support=ep, metadata=self._metadata_without_rate())
 
     def count(self, bin_size=None, ep=None, time_units="s", dtype=None):
         """
@@ -698,35 +731,23 @@ class TsGroup(UserDict, _MetadataMixin):
         if isinstance(bin_size, (float, int)):
             bin_size = TsIndex.format_timestamps(np.array([bin_size]), time_units)[0]
 
-        # Call it on first element to pre-allocate the array
-        if len(self) >= 1:
-            time_index, d = _count(
-                self.data[self.index[0]].index.values,
-                starts,
-                ends,
-                bin_size,
-                dtype=dtype,
-            )
-
-            count = np.zeros((len(time_index), len(self.index)), dtype=dtype)
-            count[:, 0] = d
-
-            for i in range(1, len(self.index)):
-                count[:, i] = _count(
-                    self.data[self.index[i]].index.values,
-                    starts,
-                    ends,
-                    bin_size,
-                    dtype=dtype,
-                )[1]
-
-            return TsdFrame(t=time_index, d=count, time_support=ep, columns=self.index)
-        else:
-            time_index, _ = _count(np.array([]), starts, ends, bin_size, dtype=dtype)
+        time_index, _ = _count(np.array([]), starts, ends, bin_size, dtype=dtype)
+        if len(self) == 0:
             return TsdFrame(
                 t=time_index, d=np.empty((len(time_index), 0)), time_support=ep
             )
 
+        counts = map_units(
+            _count_values,
+            [self.data[k].index.values for k in self.index],
+            (starts, ends, bin_size, dtype),
+        )
+        count = np.zeros((len(time_index), len(self.index)), dtype=dtype)
+        for i, d in enumerate(counts):
+            count[:, i] = d
+
+        return TsdFrame(t=time_index, d=count, time_support=ep, columns=self.index)
+
     def to_tsd(self, *args):
         """
         Convert TsGroup to a Tsd. The timestamps of the TsGroup are merged together and sorted.
@@ -806,8 +827,8 @@ class TsGroup(UserDict, _MetadataMixin):
 
         """
         if len(args):
-            if isinstance(args[0], pd.Series):
-                if pd.Index.equals(self._metadata.index, args[0].index):
+            if _is_pandas(args[0], "Series"):
+                if self._metadata.index.equals(args[0].index):
                     _values = args[0].values.flatten()
                 else:
                     raise RuntimeError("Index are not equals")
@@ -974,13 +995,11 @@ class TsGroup(UserDict, _MetadataMixin):
         newgr = {}
         for k in self.index:
             newgr[k] = self.data[k].get(start, end, time_units)
-        cols = self._metadata.columns.drop("rate")
-
         return TsGroup(
             newgr,
             time_support=self.time_support,
             bypass_check=True,
-            metadata=self._metadata[cols],
+            metadata=self._metadata_without_rate(),
         )
 
     #################################
@@ -1199,6 +1218,8 @@ class TsGroup(UserDict, _MetadataMixin):
             print("Only one TsGroup object provided, no merge needed.")
             return tsgroups[0]
 
+        import pandas as pd
+
         tsg1 = tsgroups[0]
         items = tsg1.items()
         keys = set(tsg1.keys())
@@ -1358,7 +1379,7 @@ class TsGroup(UserDict, _MetadataMixin):
             ignore_metadata=ignore_metadata,
         )
 
-    def save(self, filename):
+    def save(self, filename, append=False):
         """
         Save TsGroup object in npz format. The file will contain the timestamps,
         the data (if group of Tsd), group index, the time support and the metadata
@@ -1366,9 +1387,9 @@ class TsGroup(UserDict, _MetadataMixin):
         The main purpose of this function is to save small/medium sized TsGroup
         objects.
 
-        The function will "flatten" the TsGroup by sorting all the timestamps
-        and assigning to each the corresponding index. Typically, a TsGroup like
-        this :
+        The function will "flatten" the TsGroup by concatenating the timestamps
+        of each unit, in the order of the keys, and storing the offsets of each unit
+        in the flat array. Typically, a TsGroup like this :
 
         >>> TsGroup({
             0 : Tsd(t=[0, 2, 4], d=[1, 2, 3])
@@ -1378,27 +1399,39 @@ class TsGroup(UserDict, _MetadataMixin):
 
 
         >>> {
-            't' : [0, 1, 2, 4, 5],
-            'd' : [1, 5, 2, 3, 5],
-            'index' : [0, 1, 0, 0, 1],
+            't' : [0, 2, 4, 1, 5],
+            'd' : [1, 2, 3, 5, 6],
+            'offsets' : [0, 3, 5],
+            'index' : [0, 0, 0, 1, 1],
             'start' : [0],
             'end' : [5],
             'keys' : [0, 1],
             'type' : 'TsGroup'
         }
 
+        Loading a unit is then a slice of the flat arrays. The time-sorted view of
+        all the spikes is given by `TsGroup.to_tsd` after loading. The unit of each
+        timestamp is also saved in 'index' so that the file can be read by previous
+        versions, whose files, with a time-sorted 't', can still be loaded.
+
         Metadata are saved by columns with the column name as the npz key. To avoid
         potential conflicts, make sure the columns name of the metadata are different
-        from ['t', 'd', 'start', 'end', 'index', 'keys']
+        from ['t', 'd', 'start', 'end', 'index', 'offsets', 'keys']
 
         You can load the object with `nap.load_file`. Default keys are 't', 'd'(optional),
-        'start', 'end', 'index', 'keys' and 'type'.
+        'start', 'end', 'offsets', 'index', 'keys' and 'type'.
         See the example below.
 
         Parameters
         ----------
         filename : str
-            The filename
+            The filename. If the extension is `.nap`, the object is saved as a directory
+            bundle of `.npy` files that is memory-mapped by `nap.load_file`.
+        append : bool, optional
+            Only for `.nap` bundles. Append the timestamps of each unit after the last
+            timestamp already saved for that unit as a new segment instead of
+            overwriting the bundle. `nap.load_file` presents the segments as one
+            TsGroup.
 
         Examples
         --------
@@ -1436,7 +1469,8 @@ class TsGroup(UserDict, _MetadataMixin):
 
         dicttosave = {"type": np.array(["TsGroup"], dtype=np.str_)}
         # don't save rate in metadata since it will be re-added when loading
-        dicttosave["_metadata"] = self._metadata.drop(columns="rate").to_dict()
+        metadata = self._metadata_without_rate()
+        dicttosave["_metadata"] = {} if metadata is None else metadata.to_dict()
 
         # are these things that still need to be enforced?
         # for k in self._metadata.columns:
@@ -1447,35 +1481,34 @@ class TsGroup(UserDict, _MetadataMixin):
         #         dicttosave[k] = tmp
 
         # We can't use to_tsd here in case tsgroup contains Tsd and not only Ts.
-        nt = 0
-        for n in self.index:
-            nt += len(self[n])
-
-        times = np.zeros(nt)
-        data = np.full(nt, np.nan)
-        index = np.zeros(nt, dtype=np.int64)
-        k = 0
-        for n in self.index:
-            kl = len(self[n])
-            times[k : k + kl] = self[n].index
-            if isinstance(self[n], _BaseTsd):
-                data[k : k + kl] = self[n].values
-            index[k : k + kl] = int(n)
-            k += kl
-
-        idx = np.argsort(times)
-        times = times[idx]
-        index = index[idx]
+        units = [self[n] for n in self.index]
+        if append:
+            last = _last_saved_time(filename, np.array(self.keys()))
+            units = [
+                u[np.searchsorted(u.index.values, t, side="right") :]
+                for u, t in zip(units, last)
+            ]
+        offsets = np.zeros(len(units) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(u) for u in units])
+
+        times = np.zeros(offsets[-1])
+        data = np.full(offsets[-1], np.nan)
+        for u, a, b in zip(units, offsets[:-1], offsets[1:]):
+            times[a:b] = u.index
+            if isinstance(u, _BaseTsd):
+                data[a:b] = u.values
 
         dicttosave["t"] = times
-        dicttosave["index"] = index
+        dicttosave["offsets"] = offsets
+        dicttosave["index"] = np.repeat(np.array(self.keys()), np.diff(offsets))
         if not np.all(np.isnan(data)):
-            dicttosave["d"] = data[idx]
+            dicttosave["d"] = data
         dicttosave["keys"] = np.array(self.keys())
         dicttosave["start"] = self.time_support.start
         dicttosave["end"] = self.time_support.end
+        dicttosave["_validated"] = np.array(True)
 
-        np.savez(filename, **dicttosave)
+        _save_arrays(filename, append=append, **dicttosave)
 
         return
 
@@ -1496,27 +1529,51 @@ class TsGroup(UserDict, _MetadataMixin):
         """
 
         times = file["t"]
-        index = file["index"]
         has_data = "d" in file.keys()
+        validated = "_validated" in file and bool(file["_validated"])
         time_support = IntervalSet(file["start"], file["end"])
 
         if has_data:
-            data = file["data"]
+            data = file["d"]
 
-        if "keys" in file.keys():
+        if "offsets" in file.keys():
+            # Timestamps grouped by unit
             keys = file["keys"]
+            offsets = file["offsets"]
+            starts, ends = offsets[:-1], offsets[1:]
         else:
-            keys = np.unique(index)
+            # Previous layout: timestamps sorted by time with the unit of each one.
+            # A stable sort by unit keeps the timestamps of each unit sorted.
+            index = file["index"]
+            if "keys" in file.keys():
+                keys = file["keys"]
+            else:
+                keys = np.unique(index)
+            # A stable sort of small integers is a radix sort in numpy.
+            if len(index) and index.min() >= 0 and index.max() < 2**16:
+                order = np.argsort(index.astype(np.uint16), kind="stable")
+            else:
+                order = np.argsort(index, kind="stable")
+            times = times[order]
+            if has_data:
+                data = data[order]
+            index = index[order]
+            starts = np.searchsorted(index, keys, side="left")
+            ends = np.searchsorted(index, keys, side="right")
+
+        # A key appears once per segment in bundles written with append
+        pieces = {}
+        for key, a, b in zip(keys, starts, ends):
+            pieces.setdefault(key, []).append(slice(a, b))
 
         group = {}
-        for key in keys:
-            filtering_index = index == key
-            t = times[filtering_index]
+        for key, slices in pieces.items():
+            t = TsIndex(_concatenate_slices(times, slices), validated=validated)
 
             if has_data:
                 group[key] = Tsd(
                     t=t,
-                    d=data[filtering_index],
+                    d=_concatenate_slices(data, slices),
                     time_support=time_support,
                 )
             else:
@@ -1526,6 +1583,8 @@ class TsGroup(UserDict, _MetadataMixin):
 
         if "_metadata" in file:  # load metadata if it exists
             if file["_metadata"]:  # check that metadata is not empty
+                import pandas as pd
+
                 metainfo = pd.DataFrame.from_dict(file["_metadata"].item())
                 tsgroup.set_info(metainfo)
 
@@ -1535,10 +1594,12 @@ class TsGroup(UserDict, _MetadataMixin):
             "end",
             "t",
             "index",
+            "offsets",
             "d",
             "rate",
             "keys",
             "_metadata",
+            "_validated",
             "type",
         }
 
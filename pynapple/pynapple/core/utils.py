@@ -2,8 +2,12 @@
 Utility functions
 """
 
+import json
 import os
+import sys
+import threading
 import warnings
+from collections import OrderedDict
 from itertools import combinations
 from numbers import Number
 from pathlib import Path
@@ -89,6 +93,72 @@ def _get_terminal_size():
     return (cols, rows)
 
 
+def _is_pandas(obj, *names):
+    """
+    Check if `obj` is an instance of one of the pandas classes `names` without importing pandas.
+
+    An object cannot be a pandas object if pandas has not been imported yet.
+
+    Parameters
+    ----------
+    obj : object
+        The object to check
+    *names : str
+        Names of pandas classes, e.g. "DataFrame" or "Series"
+
+    Returns
+    -------
+    bool
+    """
+    pd = sys.modules.get("pandas")
+    if pd is None:
+        return False
+    return isinstance(obj, tuple(getattr(pd, name) for name in names))
+
+
+def _column_array(columns):
+    """
+    Column names as a 1-d numpy array, without importing pandas.
+
+    Strings and mixed types are kept in an object array, as in a pandas.Index.
+
+    Parameters
+    ----------
+    columns : iterable
+        The column names
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    array = np.asarray(columns)
+    if array.ndim != 1 or array.dtype.kind in "USO":
+        array = np.empty(len(columns), dtype=object)
+        for i, c in enumerate(columns):
+            array[i] = c
+    return array
+
+
+def _get_column_indexer(columns, keys):
+    """
+    Positions of `keys` in the column names, -1 for the missing ones, like
+    `pandas.Index.get_indexer`.
+
+    Parameters
+    ----------
+    columns : numpy.ndarray
+        The column names
+    keys : iterable
+        The names to look for
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    positions = {c: i for i, c in enumerate(columns.tolist())}
+    return np.array([positions.get(k, -1) for k in keys], dtype=np.int64)
+
+
 def is_array_like(obj):
     """
     Check if an object is array-like.
@@ -273,8 +343,8 @@ def _concatenate_tsd(func, *args, **kwargs):
             time_supports.append(arg.time_support)
             nap_types.append(arg.nap_class)
             nap_class = arg.__class__
-            if hasattr(arg, "columns"):
-                columns.append(arg.columns)
+            if hasattr(arg, "_columns"):
+                columns.append(arg._columns)
         else:
             arrays.append(arg)
 
@@ -332,13 +402,13 @@ class _TsdFrameSliceHelper:
     def __getitem__(self, key):
         if hasattr(key, "__iter__") and not isinstance(key, str):
             for k in key:
-                if k not in self.tsdframe.columns:
+                if k not in self.tsdframe._columns:
                     raise IndexError(str(k))
-            index = self.tsdframe.columns.get_indexer(key)
+            index = _get_column_indexer(self.tsdframe._columns, key)
         else:
-            if key not in self.tsdframe.columns:
+            if key not in self.tsdframe._columns:
                 raise IndexError(str(key))
-            index = self.tsdframe.columns.get_indexer([key])
+            index = _get_column_indexer(self.tsdframe._columns, [key])
 
         if len(index) == 1:
             return self.tsdframe.__getitem__((slice(None, None, None), index[0]))
@@ -431,10 +501,13 @@ def check_filename(filename):
     """
     filename = Path(filename).resolve()
 
-    if filename.is_dir():
-        raise RuntimeError("Invalid filename input. {} is directory.".format(filename))
+    if filename.suffix != ".nap":
+        if filename.is_dir():
+            raise RuntimeError(
+                "Invalid filename input. {} is directory.".format(filename)
+            )
 
-    filename = filename.with_suffix(".npz")
+        filename = filename.with_suffix(".npz")
 
     parent_folder = filename.parent
     if not parent_folder.exists():
@@ -443,6 +516,365 @@ def check_filename(filename):
     return filename
 
 
+SEGMENT_KEYS = ("t", "d", "offsets", "index", "keys")
+"""Arrays of a `.nap` bundle that are split in segments when appending."""
+
+
+def _save_arrays(filename, append=False, **arrays):
+    """Save arrays in a single uncompressed npz file or in a directory bundle.
+
+    If `filename` ends with `.nap`, each array is saved in its own `.npy` file inside
+    the directory `filename`, together with a `header.json` file listing the arrays.
+    Contrary to npz files, the arrays of a bundle can be memory-mapped when loading.
+
+    With `append`, the arrays listed in `SEGMENT_KEYS` are written as a new segment
+    of an existing bundle (see `_append_segment`).
+
+    Parameters
+    ----------
+    filename : Path
+        The filename as returned by `check_filename`
+    append : bool, optional
+        Append to an existing bundle instead of overwriting it.
+    **arrays : numpy.ndarray
+        The arrays to save
+    """
+    if filename.suffix != ".nap":
+        if append:
+            raise RuntimeError(
+                "Appending is only supported for .nap bundles, got {}.".format(filename)
+            )
+        np.savez(filename, **arrays)
+        return
+
+    if filename.exists() and not filename.is_dir():
+        raise RuntimeError("Invalid filename input. {} is a file.".format(filename))
+
+    if append and (filename / "header.json").exists():
+        _append_segment(filename, arrays)
+        return
+
+    filename.mkdir(exist_ok=True)
+    for f in filename.glob("*.npy"):  # removing a previous save
+        f.unlink()
+
+    for key, array in arrays.items():
+        np.save(filename / (key + ".npy"), np.asanyarray(array))
+
+    header = {
+        "type": str(np.asarray(arrays["type"])[0]) if "type" in arrays else "",
+        "fields": list(arrays.keys()),
+    }
+    _write_header(filename, header)
+
+
+def _write_header(filename, header):
+    """Write the header of a bundle. The header is replaced atomically so that
+    a bundle is always consistent with the segments listed in its header."""
+    tmp = filename / "header.json.tmp"
+    with open(tmp, "w") as ff:
+        json.dump(header, ff, indent=2)
+    os.replace(tmp, filename / "header.json")
+
+
+def _append_segment(filename, arrays):
+    """Append arrays to an existing `.nap` bundle in O(size of the arrays).
+
+    The arrays in `SEGMENT_KEYS` are written to new files `<key>.<n>.npy` where `n` is
+    the segment number. The time support (`start`, `end`) is merged with the stored one
+    and the other arrays (e.g. columns or metadata) are overwritten. The header lists
+    the number of segments and is written last.
+    """
+    with open(filename / "header.json", "r") as ff:
+        header = json.load(ff)
+
+    type_ = str(np.asarray(arrays["type"])[0]) if "type" in arrays else ""
+    if header["type"] != type_:
+        raise RuntimeError(
+            "Can not append a {} to a bundle of type {}.".format(type_, header["type"])
+        )
+
+    if "segmented" not in header:  # bundle saved in one piece
+        header["segmented"] = [k for k in header["fields"] if k in SEGMENT_KEYS]
+        header["n_segments"] = 1
+        for key in header["segmented"]:
+            os.replace(filename / (key + ".npy"), filename / (key + ".0.npy"))
+
+    segmented = [k for k in arrays if k in SEGMENT_KEYS]
+    if set(segmented) != set(header["segmented"]):
+        raise RuntimeError(
+            "Fields {} do not match the fields {} of the bundle.".format(
+                segmented, header["segmented"]
+            )
+        )
+
+    if len(arrays["t"]):
+        n = header["n_segments"]
+        for key in segmented:
+            np.save(filename / "{}.{}.npy".format(key, n), np.asanyarray(arrays[key]))
+        header["n_segments"] = n + 1
+
+    if "start" in arrays and "end" in arrays:
+        start = np.concatenate((np.load(filename / "start.npy"), arrays["start"]))
+        end = np.concatenate((np.load(filename / "end.npy"), arrays["end"]))
+        order = np.argsort(start)
+        start, end = start[order], end[order]
+        # merge overlapping intervals
+        new = np.r_[True, start[1:] > np.maximum.accumulate(end)[:-1]]
+        end = np.maximum.reduceat(end, np.flatnonzero(new))
+        arrays = dict(arrays, start=start[new], end=end)
+
+    for key, array in arrays.items():
+        if key not in SEGMENT_KEYS:
+            np.save(filename / (key + ".npy"), np.asanyarray(array))
+
+    header["fields"] = list(dict.fromkeys(header["fields"] + list(arrays.keys())))
+    _write_header(filename, header)
+
+
+def _last_saved_time(filename, keys=None):
+    """Last timestamp stored in a `.nap` bundle, or -inf if there is no bundle.
+
+    With `keys`, the bundle holds a TsGroup and the last timestamp of each unit is
+    returned as an array aligned with `keys` (-inf for the units never saved).
+    """
+    filename = Path(filename)
+    last = np.full(len(keys), -np.inf) if keys is not None else -np.inf
+    if not (filename / "header.json").exists():
+        return last
+    with open(filename / "header.json", "r") as ff:
+        header = json.load(ff)
+    if "segmented" in header:
+        suffixes = [".{}.npy".format(n) for n in range(header["n_segments"])]
+    else:
+        suffixes = [".npy"]
+
+    for suffix in suffixes[::-1]:
+        t = np.load(filename / ("t" + suffix), mmap_mode="r")
+        if keys is None:
+            if len(t):
+                return float(t[-1])
+            continue
+        offsets = np.load(filename / ("offsets" + suffix))
+        saved = np.load(filename / ("keys" + suffix))
+        # the timestamps of a unit are sorted in its slice of the segment
+        found = np.isin(saved, keys) & (offsets[1:] > offsets[:-1])
+        order = np.argsort(keys)
+        pos = order[np.searchsorted(keys, saved[found], sorter=order)]
+        new = last[pos] == -np.inf
+        last[pos[new]] = t[offsets[1:][found][new] - 1]
+        if np.all(last > -np.inf):
+            break
+    return last
+
+
+def _dataset_key(array):
+    """Identity of a lazy dataset, from its file and its name, to key its cached chunks.
+
+    Returns
+    -------
+    tuple or None
+        None if the dataset can be written, or if its identity is unknown, in which
+        case its chunks are not cached.
+    """
+    if hasattr(array, "file") and hasattr(array, "id"):  # h5py
+        if array.file.mode != "r":
+            return None
+        return ("h5py", array.file.filename, array.id.fileno, array.name)
+    if hasattr(array, "store") and hasattr(array, "path"):  # zarr
+        store = array.store
+        location = getattr(store, "path", None) or getattr(store, "root", None)
+        if not getattr(array, "read_only", False) or location is None:
+            return None
+        return ("zarr", str(location), array.path)
+    return None
+
+
+class _ChunkCache:
+    """Least recently used cache of the decoded chunks of lazy datasets.
+
+    Entries are keyed by the identity of the dataset (see `_dataset_key`) and the chunk
+    number. The cache is shared by the threads of the "thread" parallel backend (see
+    `nap_config.n_jobs`), its methods hold a lock.
+    """
+
+    def __init__(self, max_nbytes):
+        self.max_nbytes = max_nbytes
+        self.nbytes = 0
+        self._chunks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, i):
+        with self._lock:
+            if (key, i) in self._chunks:
+                self._chunks.move_to_end((key, i))
+                return self._chunks[(key, i)]
+            return None
+
+    def put(self, key, i, block):
+        with self._lock:
+            if (key, i) in self._chunks:
+                self.nbytes -= self._chunks.pop((key, i)).nbytes
+            self._chunks[(key, i)] = block
+            self.nbytes += block.nbytes
+            while self.nbytes > self.max_nbytes and len(self._chunks) > 1:
+                _, old = self._chunks.popitem(last=False)
+                self.nbytes -= old.nbytes
+
+    def discard(self, array):
+        """Drop the chunks of a dataset, e.g. after writing to it."""
+        if isinstance(array, np.ndarray):
+            return
+        key = _dataset_key(array)
+        with self._lock:
+            for k in [k for k in self._chunks if k[0] == key]:
+                self.nbytes -= self._chunks.pop(k).nbytes
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+            self.nbytes = 0
+
+
+_chunk_cache = _ChunkCache(64 * 1024**2)
+
+
+def _lazy_chunks(array):
+    """Chunk size along the first axis of a lazy array (e.g. h5py or zarr dataset).
+
+    Returns
+    -------
+    int, None or False
+        The number of rows per chunk, None for a contiguous (not chunked) dataset,
+        False if the array is not a lazy dataset.
+    """
+    if isinstance(array, np.ndarray) or not hasattr(array, "chunks"):
+        return False
+    chunks = array.chunks
+    if chunks is None:
+        return None
+    if isinstance(chunks, tuple) and len(chunks) and isinstance(chunks[0], Number):
+        return int(chunks[0])
+    return False  # e.g. dask arrays handle indexing themselves
+
+
+def _read_ranges(array, rows):
+    """Read sorted unique rows of a contiguous dataset with one slice per group of
+    nearby rows. Gaps smaller than 1 MB are read rather than split in several reads."""
+    row_nbytes = max(int(np.prod(array.shape[1:])) * array.dtype.itemsize, 1)
+    max_gap = max(1, (1024**2) // row_nbytes)
+    breaks = np.flatnonzero(np.diff(rows) > max_gap) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(rows)]))
+
+    out = np.empty((len(rows), *array.shape[1:]), dtype=array.dtype)
+    for s, e in zip(starts, ends):
+        block = array[rows[s] : rows[e - 1] + 1]
+        out[s:e] = block[rows[s:e] - rows[s]]
+    return out
+
+
+def _read_chunks(array, rows, rows_per_chunk):
+    """Read sorted unique rows of a chunked dataset chunk by chunk.
+
+    Chunks are read with slices aligned to the chunk boundaries, consecutive missing
+    chunks in a single read, and kept in a small LRU cache for the next reads.
+    """
+    n = array.shape[0]
+    chunk_ids = rows // rows_per_chunk
+    needed = np.unique(chunk_ids)
+    key = _dataset_key(array)
+
+    blocks = {}
+    missing = []
+    for i in needed:
+        block = None if key is None else _chunk_cache.get(key, i)
+        if block is None:
+            missing.append(i)
+        else:
+            blocks[i] = block
+
+    if len(missing):
+        missing = np.array(missing)
+        breaks = np.flatnonzero(np.diff(missing) > 2) + 1  # reading one extra chunk
+        for run in np.split(missing, breaks):
+            first, last = run[0], run[-1]
+            data = array[first * rows_per_chunk : min((last + 1) * rows_per_chunk, n)]
+            # Only the last chunks fitting in the cache are kept
+            n_cached = _chunk_cache.max_nbytes // max(data[:rows_per_chunk].nbytes, 1)
+            for i in range(first, last + 1):
+                block = data[
+                    (i - first) * rows_per_chunk : (i - first + 1) * rows_per_chunk
+                ]
+                if key is not None and last - i < n_cached:
+                    block = block.copy()  # not a view of the whole read
+                    _chunk_cache.put(key, i, block)
+                blocks[i] = block
+
+    out = np.empty((len(rows), *array.shape[1:]), dtype=array.dtype)
+    bounds = np.searchsorted(chunk_ids, np.append(needed, needed[-1] + 1))
+    for k, i in enumerate(needed):
+        sel = slice(bounds[k], bounds[k + 1])
+        out[sel] = blocks[i][rows[sel] - i * rows_per_chunk]
+    return out
+
+
+def _take_rows(array, idx):
+    """Select rows along the first axis, i.e. `array[idx]`.
+
+    For lazy datasets (e.g. h5py or zarr), fancy indices and boolean masks are
+    translated into reads of contiguous slices, aligned to the chunks of the dataset,
+    instead of point selections.
+
+    Parameters
+    ----------
+    array : array-like
+        The array
+    idx : slice, int or bool array-like
+        The rows
+
+    Returns
+    -------
+    array-like
+        The selected rows
+    """
+    chunks = _lazy_chunks(array)
+    if chunks is False or isinstance(idx, (slice, Number)):
+        return array[idx]
+
+    idx = np.asarray(idx)
+    if idx.dtype == bool:
+        idx = np.flatnonzero(idx)
+    idx = np.where(idx < 0, idx + array.shape[0], idx).astype(np.int64)
+    if len(idx) == 0:
+        return np.empty((0, *array.shape[1:]), dtype=array.dtype)
+
+    rows, inverse = np.unique(idx, return_inverse=True)
+    if chunks is None:
+        out = _read_ranges(array, rows)
+    else:
+        out = _read_chunks(array, rows, chunks)
+
+    if len(rows) == len(idx) and np.array_equal(rows, idx):
+        return out
+    return out[inverse.reshape(-1)]
+
+
+def _getitem(array, key):
+    """`array[key]` with fancy indices on the first axis read by `_take_rows`
+    for lazy datasets."""
+    if _lazy_chunks(array) is False:
+        return array[key]
+
+    first, rest = (key[0], key[1:]) if isinstance(key, tuple) else (key, ())
+    if isinstance(first, (list, np.ndarray)) and not any(
+        isinstance(k, (list, np.ndarray)) for k in rest
+    ):
+        out = _take_rows(array, first)
+        return out[(slice(None), *rest)] if len(rest) else out
+    return array[key]
+
+
 def _convert_iter_to_str(array):
     """
     This function converts an array of arrays to array of strings.
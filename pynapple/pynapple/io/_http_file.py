@@ -0,0 +1,251 @@
+"""
+Read-only file object over HTTP range requests, used to open remote NWB files with h5py.
+
+Reads go through a cache of fixed-size blocks. Blocks can be fetched ahead of time and in
+parallel with `asyncio` (see `_HTTPRangeFile.prefetch`), for example all the chunks of the
+datasets of an object before building it. In Pyodide, the requests are done with the
+browser fetch API (asynchronous) and with a synchronous XMLHttpRequest (synchronous reads
+by HDF5). Otherwise `urllib` is used.
+"""
+
+import asyncio
+import io
+import re
+import sys
+import urllib.request
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _is_url(file):
+    return isinstance(file, str) and re.match(r"^https?://", file) is not None
+
+
+def _in_pyodide():
+    return "pyodide" in sys.modules
+
+
+def _fetch_range(url, start, end):
+    """Synchronous read of the bytes [start, end) of `url`."""
+    header = "bytes={}-{}".format(start, end - 1)
+    if _in_pyodide():
+        from js import Uint8Array, XMLHttpRequest
+
+        req = XMLHttpRequest.new()
+        req.open("GET", url, False)
+        req.setRequestHeader("Range", header)
+        req.responseType = "arraybuffer"
+        req.send(None)
+        if req.status not in (200, 206):
+            raise OSError("HTTP {} while reading {}".format(req.status, url))
+        data = Uint8Array.new(req.response).to_bytes()
+        return data[start:end] if req.status == 200 else data
+
+    request = urllib.request.Request(url, headers={"Range": header})
+    with urllib.request.urlopen(request) as response:
+        data = response.read()
+        if response.status == 200:  # server ignoring the range
+            return data[start:end]
+        return data
+
+
+async def _afetch_range(url, start, end):
+    """Asynchronous read of the bytes [start, end) of `url`."""
+    if _in_pyodide():
+        from pyodide.http import pyfetch
+
+        response = await pyfetch(
+            url, headers={"Range": "bytes={}-{}".format(start, end - 1)}
+        )
+        data = await response.bytes()
+        return data[start:end] if response.status == 200 else data
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _fetch_range, url, start, end)
+
+
+def _file_size(url):
+    """Size of the remote file, from the Content-Range of a one byte request."""
+    if _in_pyodide():
+        from js import XMLHttpRequest
+
+        req = XMLHttpRequest.new()
+        req.open("GET", url, False)
+        req.setRequestHeader("Range", "bytes=0-0")
+        req.send(None)
+        content_range = req.getResponseHeader("Content-Range")
+    else:
+        request = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+        with urllib.request.urlopen(request) as response:
+            content_range = response.headers.get("Content-Range")
+            if content_range is None:
+                return int(response.headers["Content-Length"])
+    return int(str(content_range).split("/")[-1])
+
+
+class _HTTPRangeFile(io.RawIOBase):
+    """Seekable read-only file object reading a remote file by blocks.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the file. The server has to support HTTP range requests.
+    block_size : int, optional
+        Number of bytes per block.
+    cache_size : int, optional
+        Maximum number of bytes kept in the block cache.
+    max_requests : int, optional
+        Maximum number of concurrent requests when prefetching.
+    """
+
+    def __init__(self, url, block_size=2**16, cache_size=2**28, max_requests=6):
+        super().__init__()
+        self.url = url
+        self.block_size = block_size
+        self.cache_size = cache_size
+        self.max_requests = max_requests
+        self.size = _file_size(url)
+        self._pos = 0
+        self._blocks = OrderedDict()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self.size + offset
+        else:
+            raise ValueError("Invalid whence {}".format(whence))
+        return self._pos
+
+    def _store(self, first, data):
+        """Store the blocks of `data`, starting at block `first`."""
+        for i in range(0, len(data), self.block_size):
+            b = first + i // self.block_size
+            self._blocks[b] = data[i : i + self.block_size]
+            self._blocks.move_to_end(b)
+        while len(self._blocks) * self.block_size > self.cache_size:
+            self._blocks.popitem(last=False)
+
+    def _missing_runs(self, first, last):
+        """Runs of consecutive blocks in [first, last] that are not cached."""
+        missing = [b for b in range(first, last + 1) if b not in self._blocks]
+        runs = []
+        for b in missing:
+            if runs and runs[-1][1] == b - 1:
+                runs[-1][1] = b
+            else:
+                runs.append([b, b])
+        return runs
+
+    def readinto(self, buffer):
+        n = min(len(buffer), max(self.size - self._pos, 0))
+        if n == 0:
+            return 0
+        first = self._pos // self.block_size
+        last = (self._pos + n - 1) // self.block_size
+        # The blocks of the read are kept here as storing the missing blocks can
+        # evict the cached ones (e.g. reads larger than the cache)
+        blocks = {}
+        for b in range(first, last + 1):
+            if b in self._blocks:
+                self._blocks.move_to_end(b)
+                blocks[b] = self._blocks[b]
+        for b0, b1 in self._missing_runs(first, last):
+            start = b0 * self.block_size
+            end = min((b1 + 1) * self.block_size, self.size)
+            data = _fetch_range(self.url, start, end)
+            for b in range(b0, b1 + 1):
+                i = (b - b0) * self.block_size
+                blocks[b] = data[i : i + self.block_size]
+            self._store(b0, data)
+
+        out = memoryview(buffer).cast("B")
+        k = 0
+        for b in range(first, last + 1):
+            lo = self._pos + k - b * self.block_size
+            chunk = blocks[b][lo : lo + n - k]
+            out[k : k + len(chunk)] = chunk
+            k += len(chunk)
+        self._pos += n
+        return n
+
+    async def prefetch(self, ranges):
+        """Fetch the blocks covering byte ranges concurrently.
+
+        Parameters
+        ----------
+        ranges : list of tuple
+            The (start, end) byte ranges
+        """
+        runs = []
+        for start, end in ranges:
+            if end > start:
+                runs += self._missing_runs(
+                    start // self.block_size, (end - 1) // self.block_size
+                )
+        if not len(runs):
+            return
+
+        # Merge the runs and split them in requests of at most 64 blocks
+        blocks = np.unique(np.concatenate([np.arange(b0, b1 + 1) for b0, b1 in runs]))
+        run_starts = np.flatnonzero(np.diff(blocks) != 1) + 1
+        requests = []
+        for run in np.split(blocks, run_starts):
+            requests += np.split(run, np.arange(64, len(run), 64))
+
+        semaphore = asyncio.Semaphore(self.max_requests)
+
+        async def _get(b):
+            async with semaphore:
+                start = int(b[0]) * self.block_size
+                end = min((int(b[-1]) + 1) * self.block_size, self.size)
+                self._store(int(b[0]), await _afetch_range(self.url, start, end))
+
+        await asyncio.gather(*[_get(b) for b in requests])
+
+
+def _dataset_ranges(dataset):
+    """Byte ranges (start, end) of the raw data of a h5py dataset in its file."""
+    h5py = sys.modules["h5py"]
+    dsid = dataset.id
+    layout = dsid.get_create_plist().get_layout()
+    if layout == h5py.h5d.CONTIGUOUS:
+        offset = dsid.get_offset()
+        if offset is None:
+            return []
+        return [(offset, offset + dsid.get_storage_size())]
+    elif layout == h5py.h5d.CHUNKED:
+        ranges = []
+        for i in range(dsid.get_num_chunks()):
+            info = dsid.get_chunk_info(i)
+            ranges.append((info.byte_offset, info.byte_offset + info.size))
+        return ranges
+    return []  # compact datasets are stored in the object header
+
+
+def _group_ranges(group):
+    """Byte ranges of all the datasets below a h5py group."""
+    h5py = sys.modules["h5py"]
+    if isinstance(group, h5py.Dataset):
+        return _dataset_ranges(group)
+
+    ranges = []
+
+    def _visit(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            ranges.extend(_dataset_ranges(obj))
+
+    group.visititems(_visit)
+    return ranges
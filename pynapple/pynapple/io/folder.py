@@ -5,6 +5,7 @@ The Folder class helps to navigate a hierarchical data tree.
 import json
 import string
 from collections import UserDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -12,9 +13,12 @@ from rich.console import Console  # , ConsoleOptions, RenderResult
 from rich.panel import Panel
 from rich.tree import Tree
 
+from ..core import Ts, Tsd, TsdFrame, TsdTensor, TsGroup
 from .interface_npz import NPZFile
 from .interface_nwb import NWBFile
 
+INDEX_FILENAME = ".pynapple_index.json"
+
 
 def _find_files(path, extension=".npz"):
     """Helper to locate files
@@ -24,29 +28,99 @@ def _find_files(path, extension=".npz"):
     path : str or Path
         The directory path where files will be searched.
     extension : str, optional
-        The file extension to look for, default is ".npz".
+        The file extension to look for, default is ".npz". Directory bundles have
+        the extension ".nap".
 
     Returns
     -------
     dict
         Dictionary with filenames (without extension and whitespace) as keys
-        and NPZFile or NWBFile objects as values.
+        and paths as values.
     """
     extension = extension if extension.startswith(".") else "." + extension
     path = Path(path)  # Ensure path is a Path object
     files = {}
-    extensions_dict = {".npz": NPZFile, ".nwb": NWBFile}
-    assert extension in extensions_dict.keys(), f"Extension {extension} not supported"
+    assert extension in (".npz", ".nap", ".nwb"), f"Extension {extension} not supported"
 
     for f in path.iterdir():
-        if f.is_file() and f.suffix == extension:
+        if f.suffix == extension and f.is_dir() == (extension == ".nap"):
             filename = f.stem
             filename = filename.translate({ord(c): None for c in string.whitespace})
-            files[filename] = extensions_dict[extension](f)
+            files[filename] = f
 
     return files
 
 
+def _probe_type(path):
+    """Helper to read the type of a npz file or directory bundle
+
+    Parameters
+    ----------
+    path : Path
+        Path to the file
+
+    Returns
+    -------
+    str
+        The type of the pynapple object, or 'npz'
+    """
+    file = NPZFile(path)
+    type_ = file.type
+    file.close()
+    return type_
+
+
+def _index_npz_files(path, files):
+    """Helper to get the types of npz files without opening them when possible.
+
+    Types are cached in a hidden json index within the folder, keyed by the
+    modification time of each file. Files not in the index, or modified since,
+    are probed in parallel and the index is updated.
+
+    Parameters
+    ----------
+    path : Path
+        The folder
+    files : dict
+        Dictionary with filenames as keys and paths as values.
+
+    Returns
+    -------
+    dict
+        Dictionary with filenames as keys and NPZFile objects as values.
+    """
+    index_path = path / INDEX_FILENAME
+    try:
+        with open(index_path, "r") as ff:
+            index = json.load(ff)
+    except (OSError, ValueError):
+        index = {}
+
+    mtimes = {f.name: f.stat().st_mtime for f in files.values()}
+    to_probe = [
+        f
+        for f in files.values()
+        if index.get(f.name, {}).get("mtime") != mtimes[f.name]
+    ]
+    if len(to_probe):
+        with ThreadPoolExecutor() as executor:
+            types = list(executor.map(_probe_type, to_probe))
+        for f, type_ in zip(to_probe, types):
+            index[f.name] = {"mtime": mtimes[f.name], "type": type_}
+
+    new_index = {name: index[name] for name in mtimes}
+    if len(to_probe) or len(new_index) != len(index):
+        try:
+            with open(index_path, "w") as ff:
+                json.dump(new_index, ff, indent=2)
+        except OSError:  # e.g. read-only folder
+            pass
+
+    return {
+        name: NPZFile(f, type_=new_index[f.name]["type"]) for name, f in files.items()
+    }
+
+
 def _walk_folder(tree, folder):
     """Summary
 
@@ -60,7 +134,7 @@ def _walk_folder(tree, folder):
     # Folder
     for fold in folder.subfolds.keys():
         tree.add(":open_file_folder: " + fold)
-        _walk_folder(tree.children[-1], folder.subfolds[fold])
+        _walk_folder(tree.children[-1], folder._get_subfold(fold))
 
     # NPZ files
     for file in folder.npz_files.values():
@@ -76,6 +150,9 @@ class Folder(UserDict):
     Dictionnary like object to walk and loop through nested folders.
     Handles files and sub-folders discovery
 
+    Only the paths are indexed at initialization. Sub-folders and NWB files are
+    opened on first access, npz files are loaded on first access.
+
     Attributes
     ----------
     data : dict
@@ -85,11 +162,19 @@ class Folder(UserDict):
     npz_files : list
         List of npz files found in the folder
     nwb_files : list
-        List of nwb files found in the folder
+        List of nwb files found in the folder. Paths until opened.
     path : str
         Absolute path of the folder
     subfolds : dict
-        Dictionary of all the subfolders
+        Dictionary of all the subfolders. Paths until opened.
+
+    Notes
+    -----
+    The types of the npz files are cached in a hidden `.pynapple_index.json` file
+    written in each folder that contains npz files. Each entry holds the type and the
+    modification time of a file, so that modified files are probed again. The index
+    can be deleted at any time, it is then rebuilt on the next initialization. It is
+    not written if the folder is read-only.
 
     """
 
@@ -111,7 +196,9 @@ class Folder(UserDict):
 
         # Search sub-folders
         subfolds = [
-            p for p in path.iterdir() if p.is_dir() and not p.name.startswith(".")
+            p
+            for p in path.iterdir()
+            if p.is_dir() and not p.name.startswith(".") and p.suffix != ".nap"
         ]
 
         subfolds.sort()
@@ -120,11 +207,13 @@ class Folder(UserDict):
 
         for s in subfolds:
             sub = s.name
-            self.subfolds[sub] = Folder(s)
+            self.subfolds[sub] = s
             self._basic_view.add(":open_file_folder: [blue]" + sub)
 
         # Search files
-        self.npz_files = _find_files(path, "npz")
+        self.npz_files = _index_npz_files(
+            path, {**_find_files(path, "npz"), **_find_files(path, "nap")}
+        )
         self.nwb_files = _find_files(path, "nwb")
 
         for filename, file in self.npz_files.items():
@@ -171,7 +260,11 @@ class Folder(UserDict):
                     self.data[key] = data
                     # setattr(self, key, data)
                     return data
-                elif isinstance(self.data[key], NWBFile):
+                elif key in self.subfolds:
+                    return self._get_subfold(key)
+                elif isinstance(self.data[key], Path):
+                    self.nwb_files[key] = NWBFile(self.data[key])
+                    self.data[key] = self.nwb_files[key]
                     return self.data[key]
                 else:
                     return self.data[key]
@@ -190,13 +283,21 @@ class Folder(UserDict):
     #     else:
     #         return value
 
+    def _get_subfold(self, name):
+        """Open the sub-folder on first access"""
+        if isinstance(self.subfolds[name], Path):
+            self.subfolds[name] = Folder(self.subfolds[name])
+            if isinstance(self.data.get(name), Path):
+                self.data[name] = self.subfolds[name]
+        return self.subfolds[name]
+
     def _generate_tree_view(self):
         tree = Tree(":open_file_folder: {}".format(self.name), guide_style="blue")
 
         # Folder
         for fold in self.subfolds.keys():
             tree.add(":open_file_folder: " + fold)
-            _walk_folder(tree.children[-1], self.subfolds[fold])
+            _walk_folder(tree.children[-1], self._get_subfold(fold))
 
         # NPZ files
         for file in self.npz_files.values():
@@ -223,7 +324,7 @@ class Folder(UserDict):
         """Summary"""
         return self.expand()
 
-    def save(self, name, obj, description=""):
+    def save(self, name, obj, description="", bundle=False, append=False):
         """Save a pynapple object in the folder in a single file in uncompressed ``.npz`` format.
         By default, the save function overwrite previously save file with the same name.
 
@@ -235,11 +336,32 @@ class Folder(UserDict):
             Pynapple object.
         description : str, optional
             Metainformation added as a json sidecar.
+        bundle : bool, optional
+            If True, save the object as a ``.nap`` directory bundle of ``.npy`` files
+            instead. Timestamps and data of a bundle are memory-mapped when loading.
+        append : bool, optional
+            If True, append the new timestamps of `obj` to the ``.nap`` bundle `name`
+            instead of overwriting it (implies `bundle`). The object is reloaded
+            from the bundle on next access.
+
+        Raises
+        ------
+        TypeError
+            If `append` is True and `obj` is an IntervalSet, which can not be appended.
         """
-        filepath = self.path / (name + ".npz")
-        obj.save(filepath)
+        if append and not isinstance(obj, (Ts, Tsd, TsdFrame, TsdTensor, TsGroup)):
+            raise TypeError(
+                "Appending is only supported for Ts, Tsd, TsdFrame, TsdTensor and "
+                "TsGroup, got {}.".format(type(obj).__name__)
+            )
+        bundle = bundle or append
+        filepath = self.path / (name + (".nap" if bundle else ".npz"))
+        if append:
+            obj.save(filepath, append=True)
+        else:
+            obj.save(filepath)
         self.npz_files[name] = NPZFile(filepath)
-        self.data[name] = obj
+        self.data[name] = self.npz_files[name] if append else obj
 
         metadata = {"time": str(datetime.now()), "info": str(description)}
 
@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import numpy as np
@@ -16,6 +17,10 @@ EXPECTED_ENTRIES = {
 
 
 def _find_class_from_variables(file_variables, data_ndims=None):
+    # TsGroup saved grouped by unit
+    if {"t", "start", "end", "offsets"}.issubset(file_variables):
+        return "TsGroup"
+
     if data_ndims is not None:
 
         assert EXPECTED_ENTRIES["Tsd"].issubset(file_variables)
@@ -34,6 +39,151 @@ def _find_class_from_variables(file_variables, data_ndims=None):
     return "npz"
 
 
+class _SegmentedArray(object):
+    """Read-only array concatenating memory-mapped segments along the first axis.
+
+    Only the segments covering the requested rows are read.
+    """
+
+    chunks = None
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.bounds = np.concatenate(([0], np.cumsum([len(s) for s in segments])))
+        self.shape = (int(self.bounds[-1]),) + segments[0].shape[1:]
+        self.dtype = segments[0].dtype
+        self.ndim = len(self.shape)
+        self.size = int(np.prod(self.shape))
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __iter__(self):
+        for segment in self.segments:
+            yield from segment
+
+    def __array__(self, dtype=None, copy=None):
+        out = np.concatenate(self.segments)
+        return out if dtype is None else out.astype(dtype)
+
+    def __repr__(self):
+        return "<{} shape={} dtype={} segments={}>".format(
+            self.__class__.__name__, self.shape, self.dtype, len(self.segments)
+        )
+
+    def _rows(self, rows):
+        rows = np.asarray(rows)
+        if rows.dtype == bool:
+            rows = np.flatnonzero(rows)
+        rows = np.where(rows < 0, rows + len(self), rows).astype(np.int64)
+        if np.any((rows < 0) | (rows >= len(self))):
+            raise IndexError(
+                "index out of bounds for axis 0 with size {}".format(len(self))
+            )
+        seg = np.searchsorted(self.bounds, rows, side="right") - 1
+        out = np.empty((len(rows),) + self.shape[1:], dtype=self.dtype)
+        for k in np.unique(seg):
+            sel = seg == k
+            out[sel] = self.segments[k][rows[sel] - self.bounds[k]]
+        return out
+
+    def __getitem__(self, key):
+        first, rest = (key[0], key[1:]) if isinstance(key, tuple) else (key, ())
+
+        if isinstance(first, (int, np.integer)):
+            i = first + len(self) if first < 0 else first
+            if not 0 <= i < len(self):
+                raise IndexError(
+                    "index {} is out of bounds for axis 0 with size {}".format(
+                        first, len(self)
+                    )
+                )
+            k = np.searchsorted(self.bounds, i, side="right") - 1
+            out = self.segments[k][i - self.bounds[k]]
+        elif isinstance(first, slice):
+            start, stop, step = first.indices(len(self))
+            if step != 1:
+                out = self._rows(np.arange(start, stop, step))
+            else:
+                stop = max(start, stop)
+                k0 = np.searchsorted(self.bounds, start, side="right") - 1
+                k1 = np.searchsorted(self.bounds, stop, side="left")
+                parts = [
+                    self.segments[k][
+                        max(start - self.bounds[k], 0) : stop - self.bounds[k]
+                    ]
+                    for k in range(max(k0, 0), min(k1, len(self.segments)))
+                ]
+                if len(parts) == 1:
+                    out = parts[0]
+                elif len(parts):
+                    out = np.concatenate(parts)
+                else:
+                    out = self.segments[0][0:0]
+        elif first is Ellipsis:
+            return np.asarray(self)[key]
+        else:
+            out = self._rows(first)
+
+        return out[rest] if len(rest) else out
+
+
+class _NPYBundle(object):
+    """Read-only mapping over a directory bundle saved by pynapple.
+
+    Each array is stored in its own `.npy` file and the list of arrays is given
+    by `header.json`. Timestamps and data are memory-mapped, other arrays are loaded.
+
+    Bundles written with `append` store the timestamps and data in segments
+    `<key>.<n>.npy`. The timestamps of the segments are concatenated and the data is
+    presented as a lazily concatenated array. For TsGroup, the offsets of each segment
+    are shifted so that the segments read as one flat layout where a unit appears
+    once per segment.
+    """
+
+    mmap_keys = ("t", "d")
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "header.json", "r") as ff:
+            self.header = json.load(ff)
+
+    def keys(self):
+        return list(self.header["fields"])
+
+    def __contains__(self, key):
+        return key in self.header["fields"]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, key):
+        if key not in self:
+            raise KeyError("{} is not a file in the bundle".format(key))
+        if key in self.header.get("segmented", ()):
+            return self._load_segments(key)
+        filename = self.path / (key + ".npy")
+        if key in self.mmap_keys:
+            return np.load(filename, mmap_mode="r")
+        return np.load(filename, allow_pickle=True)
+
+    def _load_segments(self, key):
+        segments = [
+            np.load(self.path / "{}.{}.npy".format(key, n), mmap_mode="r")
+            for n in range(self.header["n_segments"])
+        ]
+        if len(segments) == 1:
+            return segments[0]
+        if key == "d":
+            return _SegmentedArray(segments)
+        if key == "offsets":
+            shift = np.cumsum([0] + [s[-1] for s in segments[:-1]])
+            return np.concatenate(
+                [segments[0]] + [s[1:] + k for s, k in zip(segments[1:], shift[1:])]
+            )
+        return np.concatenate(segments)
+
+
 class NPZFile(object):
     """Class to read/write NPZ files as a pynapple object.
     Objects have a save function in npz format as well as the Folder class.
@@ -49,35 +199,68 @@ class NPZFile(object):
     0.2    2
     dtype: int64
 
+    Objects saved with the `.nap` extension are directory bundles. Their timestamps and data
+    are memory-mapped (read-only) instead of being loaded in memory.
+
+    >>> tsdframe.save("path/to/my_tsdframe.nap")
+    >>> tsdframe = nap.load_file("path/to/my_tsdframe.nap")
+
+    Bundles can grow with `append=True`, each save writing only the new timestamps.
+
+    >>> tsd.save("path/to/my_tsd.nap", append=True)
+
     """
 
-    def __init__(self, path):
-        """Initialization of the NPZ file
+    def __init__(self, path, type_=None):
+        """Initialization of the NPZ file. The file is opened on first access.
 
         Parameters
         ----------
         path : str
-            Valid path to a NPZ file
+            Valid path to a NPZ file or to a directory bundle
+        type_ : str, optional
+            Type of the pynapple object if already known (e.g. from the index of a Folder).
         """
         path = Path(path)
         self.path = path
         self.name = path.name
-        self.file = np.load(self.path, allow_pickle=True)
-        type_ = ""
+        self._file = None
+        self._type = None if type_ is None else np.str_(type_)
+
+    @property
+    def file(self):
+        """The opened NPZ file or directory bundle"""
+        if self._file is None:
+            if self.path.is_dir():
+                self._file = _NPYBundle(self.path)
+            else:
+                self._file = np.load(self.path, allow_pickle=True)
+        return self._file
+
+    @property
+    def type(self):
+        """The type of pynapple object within the file, or 'npz'"""
+        if self._type is None:
+            # First check if type is explicitely defined in the file:
+            try:
+                type_ = self.file["type"][0]
+                assert type_ in EXPECTED_ENTRIES.keys()
 
-        # First check if type is explicitely defined in the file:
-        try:
-            type_ = self.file["type"][0]
-            assert type_ in EXPECTED_ENTRIES.keys()
+            # if not, use heuristics:
+            except (KeyError, IndexError, AssertionError):
+                file_variables = set(self.file.keys())
+                data_ndims = self.file["d"].ndim if "d" in file_variables else None
 
-        # if not, use heuristics:
-        except (KeyError, IndexError, AssertionError):
-            file_variables = set(self.file.keys())
-            data_ndims = self.file["d"].ndim if "d" in file_variables else None
+                type_ = _find_class_from_variables(file_variables, data_ndims)
 
-            type_ = _find_class_from_variables(file_variables, data_ndims)
+            self._type = np.str_(type_)
+        return self._type
 
-        self.type = type_
+    def close(self):
+        """Close the underlying file. It is reopened on next access."""
+        if hasattr(self._file, "close"):
+            self._file.close()
+        self._file = None
 
     def load(self):
         """Load the NPZ file
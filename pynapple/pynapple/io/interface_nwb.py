@@ -4,6 +4,7 @@ Data are always lazy-loaded.
 Object behaves like dictionary.
 """
 
+import asyncio
 import errno
 import importlib
 import os
@@ -16,6 +17,48 @@ import numpy as np
 from tabulate import tabulate
 
 from .. import core as nap
+from ._http_file import _group_ranges, _HTTPRangeFile, _is_url
+
+
+def _get_timestamps(obj):
+    """Helper function to get the timestamps of a TimeSeries
+
+    Timestamps written by pynapple carry the `pynapple_validated` attribute
+    and are not sorted and rounded again.
+
+    Parameters
+    ----------
+    obj : pynwb.base.TimeSeries
+        NWB object
+
+    Returns
+    -------
+    numpy.ndarray, TsIndex or RegularTsIndex
+
+    """
+    if obj.timestamps is None:
+        return nap.RegularTsIndex(obj.starting_time, obj.rate, obj.num_samples)
+
+    t = obj.timestamps[:]
+    if getattr(obj.timestamps, "attrs", {}).get("pynapple_validated", False):
+        t = nap.TsIndex(t, validated=True)
+    return t
+
+
+def _set_validated_timestamps(path, location):
+    """Helper function to mark the timestamps of a TimeSeries as written by pynapple
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the NWB file
+    location : str
+        Path of the TimeSeries within the NWB file
+
+    """
+    h5py = importlib.import_module("h5py")
+    with h5py.File(path, "r+") as f:
+        f[location]["timestamps"].attrs["pynapple_validated"] = True
 
 
 def _get_unique_identifier(full_path_to_key):
@@ -91,6 +134,154 @@ def iterate_over_nwb(nwbfile):
                 yield obj, {"id": oid, "type": "Tsd"}
 
 
+def _decode_attr(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _classify_h5_group(group):
+    """Pynapple type of a NWB group, following the rules of `iterate_over_nwb`.
+
+    Parameters
+    ----------
+    group : h5py.Group
+        Group with a `neurodata_type` attribute
+
+    Returns
+    -------
+    str or None
+        The pynapple type, None if the group is not compatible.
+    """
+    names = list(group.keys())
+    if "colnames" in group.attrs:  # DynamicTable
+        if any([n.endswith("_times_index") for n in names]):
+            return "TsGroup"
+        elif _decode_attr(group.attrs["neurodata_type"]) == "TimeIntervals":
+            return "IntervalSet"
+        elif any([n.endswith("_times") for n in names]):
+            return "Ts"
+
+    elif _decode_attr(group.attrs["neurodata_type"]) == "AnnotationSeries":
+        return "Ts"
+
+    elif "data" in names and ("timestamps" in names or "starting_time" in names):
+        ndim = len(group["data"].shape)
+        if ndim > 2:
+            return "TsdTensor"
+        elif ndim == 2:
+            return "TsdFrame"
+        elif ndim == 1:
+            return "Tsd"
+
+    return None
+
+
+# Locations of the children of NWBFile, in the order in which pynwb attaches them
+# when reading a file (see `pynwb.NWBFile.__init__`).
+_NWBFILE_CHILDREN = (
+    "acquisition",
+    "analysis",
+    "stimulus/presentation",
+    "stimulus/templates",
+    "processing",
+    "general/extracellular_ephys/electrodes",
+    "general/extracellular_ephys",
+    "general/devices",
+    "general/optophysiology",
+    "general/optogenetics",
+    "intervals",
+    "general/subject",
+    "units",
+    "scratch",
+)
+
+
+def _nwbfile_rank(location):
+    """Rank of a child of NWBFile in `_NWBFILE_CHILDREN` from its HDF5 path."""
+    for i, prefix in enumerate(_NWBFILE_CHILDREN):
+        if location.startswith("/" + prefix + "/") or location == "/" + prefix:
+            return i
+    return len(_NWBFILE_CHILDREN)
+
+
+def _h5_children(group, skip=()):
+    """NWB groups below `group`, through the groups that are not NWB objects."""
+    h5py = importlib.import_module("h5py")
+    for name in group:
+        # Soft and external links point to objects found elsewhere
+        if not isinstance(group.get(name, getlink=True), h5py.HardLink):
+            continue
+        sub = group[name]
+        if not isinstance(sub, h5py.Group) or sub.name in skip:
+            continue
+        if "neurodata_type" in sub.attrs:
+            yield sub
+        else:
+            yield from _h5_children(sub, skip)
+
+
+def _iterate_over_h5(group, path="", skip=()):
+    """Walk the HDF5 layout of a NWB file and classify the NWB objects.
+
+    Only the attributes are read. The full path of an object is built from the names
+    of its parent NWB objects, as with `_get_full_path`. The objects are yielded in
+    the order of `NWBFile.objects`, which pynwb fills with a stack, the last child
+    first. Objects with the same full path (e.g. in acquisition and intervals) then
+    take precedence as in `iterate_over_nwb`.
+
+    Parameters
+    ----------
+    group : h5py.Group
+        The group to walk
+    path : str
+        Full path of the closest parent NWB object
+    skip : tuple of str
+        HDF5 paths to ignore (e.g. the cached specifications)
+
+    Yields
+    ------
+    tuple
+        Full path, {'id', 'type', 'location'} with the HDF5 path as location.
+    """
+    children = list(_h5_children(group, skip))
+    if not path:  # children of the NWBFile
+        children.sort(key=lambda sub: _nwbfile_rank(sub.name))
+    for sub in children[::-1]:
+        full_path = path + "/" + sub.name.split("/")[-1]
+        type_ = _classify_h5_group(sub)
+        if type_ is not None:
+            yield full_path, {
+                "id": _decode_attr(sub.attrs.get("object_id")),
+                "type": type_,
+                "location": sub.name,
+            }
+        yield from _iterate_over_h5(sub, full_path, skip)
+
+
+def _extract_compatible_data_from_h5(h5file):
+    """Extract all the NWB objects that can be converted to a pynapple object
+    by scanning the HDF5 layout of the file, without building the pynwb objects.
+
+    Parameters
+    ----------
+    h5file : h5py.File
+        NWB file opened with h5py
+
+    Returns
+    -------
+    dict or None
+        Dictionary containing all the object found and their type in pynapple.
+        None if some objects have no `object_id` (i.e. old NWB files).
+    """
+    skip = ()
+    if ".specloc" in h5file.attrs:
+        skip = (h5file[h5file.attrs[".specloc"]].name,)
+
+    data = dict(_iterate_over_h5(h5file, skip=skip))
+    if any([v["id"] is None for v in data.values()]):
+        return None
+    return data
+
+
 def _extract_compatible_data_from_nwbfile(nwbfile):
     """Extract all the NWB objects that can be converted to a pynapple object. If two objects have the same names, they
     are distinguished by adding their module name to their path.
@@ -157,10 +348,7 @@ def _make_tsd(obj, lazy_loading=True):
     if not lazy_loading:
         d = d[:]
 
-    if obj.timestamps is not None:
-        t = obj.timestamps[:]
-    else:
-        t = obj.starting_time + np.arange(obj.num_samples) / obj.rate
+    t = _get_timestamps(obj)
 
     data = nap.Tsd(t=t, d=d, load_array=not lazy_loading)
 
@@ -187,10 +375,7 @@ def _make_tsd_tensor(obj, lazy_loading=True):
     if not lazy_loading:
         d = d[:]
 
-    if obj.timestamps is not None:
-        t = obj.timestamps[:]
-    else:
-        t = obj.starting_time + np.arange(obj.num_samples) / obj.rate
+    t = _get_timestamps(obj)
 
     data = nap.TsdTensor(t=t, d=d, load_array=not lazy_loading)
 
@@ -218,10 +403,7 @@ def _make_tsd_frame(obj, lazy_loading=True):
     if not lazy_loading:
         d = d[:]
 
-    if obj.timestamps is not None:
-        t = obj.timestamps[:]
-    else:
-        t = obj.starting_time + np.arange(obj.num_samples) / obj.rate
+    t = _get_timestamps(obj)
 
     if isinstance(obj, pynwb.behavior.SpatialSeries):
         if obj.data.shape[1] == 2:
@@ -262,6 +444,34 @@ def _make_tsd_frame(obj, lazy_loading=True):
     return data
 
 
+def _split_spike_times(obj):
+    """Helper function to read the spike times of all units at once
+
+    The flat `spike_times` dataset and the `spike_times_index` offsets are read
+    in one go and split per unit. Timestamps are rounded and checked once for all units.
+
+    Parameters
+    ----------
+    obj : pynwb.misc.Units
+        NWB object
+
+    Returns
+    -------
+    list of TsIndex or numpy.ndarray
+        Spike times of each unit, as TsIndex if already sorted.
+    """
+    offsets = np.asarray(obj.spike_times_index.data[:], dtype=np.int64)
+    times = np.asarray(obj.spike_times_index.target.data[:], dtype=np.float64)
+    times = nap.TsIndex.format_timestamps(times)
+
+    # Only decreasing times at the start of a unit are allowed
+    unsorted = np.flatnonzero(np.diff(times) < 0) + 1
+    if np.all(np.isin(unsorted, offsets)):
+        times = nap.TsIndex(times, validated=True)
+
+    return np.split(times, offsets[:-1])
+
+
 def _make_tsgroup(obj, **kwargs):
     """Helper function to make TsGroup
 
@@ -277,16 +487,39 @@ def _make_tsgroup(obj, **kwargs):
     """
     pynwb = importlib.import_module("pynwb")
     index = obj.id[:]
+    spikes = _split_spike_times(obj)
+
+    # Union of the time supports of the units, computed once for all units
+    bounds = np.array([[np.min(t), np.max(t)] for t in spikes if len(t)])
+    time_support = None
+    if len(bounds) and np.any(bounds[:, 1] > bounds[:, 0]):
+        bounds = bounds[bounds[:, 1] > bounds[:, 0]]
+        order = np.argsort(bounds[:, 0])
+        starts = bounds[order, 0]
+        ends = np.maximum.accumulate(bounds[order, 1])
+        new = np.concatenate(([True], starts[1:] > ends[:-1]))
+        last = np.append(np.flatnonzero(new)[1:] - 1, len(ends) - 1)
+        time_support = nap.IntervalSet(starts[new], ends[last])
+
     tsgroup = {}
-    for i, gr in zip(index, obj.spike_times_index[:]):
-        # if np.min(np.diff(gr))<0.0:
-        #     break
-        tsgroup[i] = nap.Ts(t=np.array(gr))
+    for i, t in zip(index, spikes):
+        if time_support is not None and len(t):
+            # Units with a single spike time can be outside of the union
+            ep = np.searchsorted(time_support.start, t[0], side="right") - 1
+            if ep < 0 or t[0] > time_support.end[ep]:
+                t = t[0:0]
+        tsgroup[i] = nap.Ts(t=t, time_support=time_support)
 
     N = len(tsgroup)
     metainfo = {}
     for coln in obj.colnames:
         if coln == "electrode_group":
+            # Attributes are read once per electrode group
+            groups = obj[coln][:]
+            unique_groups = {id(eg): eg for eg in groups}
+            codes = {k: j for j, k in enumerate(unique_groups)}
+            inverse = np.array([codes[id(eg)] for eg in groups], dtype=np.int64)
+            unique_groups = list(unique_groups.values())
             for e in [
                 "location",
                 "x",
@@ -299,9 +532,9 @@ def _make_tsgroup(obj, **kwargs):
                 "rel_z",
                 "reference",
             ]:
-                tmp = [eg.__getattribute__(e) for eg in obj[coln] if hasattr(eg, e)]
-                if len(tmp) == N:
-                    metainfo[e] = np.array(tmp)
+                if len(groups) == N and all([hasattr(eg, e) for eg in unique_groups]):
+                    values = np.array([eg.__getattribute__(e) for eg in unique_groups])
+                    metainfo[e] = values[inverse]
 
         if coln not in ["spike_times_index", "spike_times", "electrode_group"]:
             col = obj[coln]
@@ -321,7 +554,12 @@ def _make_tsgroup(obj, **kwargs):
                 else:
                     pass
 
-    tsgroup = nap.TsGroup(tsgroup, metadata=metainfo)
+    tsgroup = nap.TsGroup(
+        tsgroup,
+        time_support=time_support,
+        bypass_check=time_support is not None,
+        metadata=metainfo,
+    )
 
     return tsgroup
 
@@ -340,7 +578,7 @@ def _make_ts(obj, **kwargs):
 
     """
     if hasattr(obj, "timestamps"):
-        data = nap.Ts(obj.timestamps[:])
+        data = nap.Ts(_get_timestamps(obj))
     else:
         df = obj.to_dataframe()
         data = {}
@@ -369,6 +607,13 @@ class NWBFile(UserDict):
           1    1.0  brain        0
           2    1.0  brain        0
 
+    Remote files are read with HTTP range requests. Objects can be fetched in parallel
+    ahead of time, e.g. in a notebook while other cells run:
+
+    >>> data = nap.load_file("https://my.server/my_file.nwb")
+    >>> await data.prefetch(["units", "position"])
+    >>> units = await data.aget("units")
+
     """
 
     _f_eval = {
@@ -382,10 +627,14 @@ class NWBFile(UserDict):
 
     def __init__(self, file, lazy_loading=True):
         """
+        When a path is given, the objects are discovered by scanning the HDF5 layout of the file
+        and the pynwb objects are built on first access.
+
         Parameters
         ----------
         file : str or pynwb.file.NWBFile
-            Valid file to a NWB file
+            Valid file to a NWB file, or URL of a NWB file on a server supporting
+            HTTP range requests
         lazy_loading: bool
             If True return a memory-view of the data, load otherwise.
 
@@ -399,22 +648,38 @@ class NWBFile(UserDict):
         # TODO: do we really need to have instantiation from file and object in the same place?
         pynwb = importlib.import_module("pynwb")
         NWBHDF5IO = pynwb.NWBHDF5IO
+        self._nwb = None
+        self._h5file = None
+        self._remote = None
+        data = None
         if isinstance(file, pynwb.file.NWBFile):
-            self.nwb = file
+            self._nwb = file
             self.name = self.nwb.session_id
+        elif _is_url(file):
+            self.path = file
+            self.name = Path(file.split("?")[0]).stem
+            h5py = importlib.import_module("h5py")
+            self._remote = _HTTPRangeFile(file)
+            self._h5file = h5py.File(self._remote, "r")
+            self.io = NWBHDF5IO(file=self._h5file, mode="r")
+            data = _extract_compatible_data_from_h5(self._h5file)
         else:
             path = Path(file)
 
             if path.exists():
                 self.path = path
                 self.name = path.stem
-                self.io = NWBHDF5IO(path, "r")
-                self.nwb = self.io.read()
+                h5py = importlib.import_module("h5py")
+                self._h5file = h5py.File(path, "r")
+                self.io = NWBHDF5IO(file=self._h5file, mode="r")
+                data = _extract_compatible_data_from_h5(self._h5file)
             else:
                 raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), file)
 
         # Get a dictionary with full_path -> {'id', 'type'}
-        self.data = _extract_compatible_data_from_nwbfile(self.nwb)
+        if data is None:
+            data = _extract_compatible_data_from_nwbfile(self.nwb)
+        self.data = data
 
         # Need to check if some object names are doublons
         self.full_path_to_key = _get_unique_identifier(
@@ -434,6 +699,21 @@ class NWBFile(UserDict):
 
         UserDict.__init__(self, self.data)
 
+    @property
+    def nwb(self):
+        """The pynwb.file.NWBFile object, read on first access"""
+        if self._nwb is None:
+            self._nwb = self.io.read()
+        return self._nwb
+
+    def _get_nwb_object(self, entry):
+        """Build the pynwb object of an entry {'id', 'type'}"""
+        if self._nwb is None and "location" in entry:
+            # Only the requested object (and its dependencies) is built
+            self.io.read_builder()
+            return self.io.get_container(self._h5file[entry["location"]])
+        return self.nwb.objects[entry["id"]]
+
     def __str__(self):
         title = self.name if isinstance(self.name, str) else "-"
         headers = ["Keys", "Type"]
@@ -488,7 +768,7 @@ class NWBFile(UserDict):
 
             if self.__contains__(key):
                 if isinstance(self.data[key], dict) and "id" in self.data[key]:
-                    obj = self.nwb.objects[self.data[key]["id"]]
+                    obj = self._get_nwb_object(self.data[key])
                     try:
                         data = self._f_eval[self.data[key]["type"]](
                             obj, lazy_loading=self._lazy_loading
@@ -509,9 +789,66 @@ class NWBFile(UserDict):
             else:
                 raise KeyError("Can't find key {} in group index.".format(key))
 
+    async def prefetch(self, keys=None):
+        """Fetch and build objects ahead of their first access.
+
+        For a remote file, the byte ranges of all the datasets of the objects are
+        fetched concurrently with HTTP range requests before the objects are built
+        from the local block cache. Awaiting in a notebook lets other tasks run while
+        the data is downloaded. The objects are then returned by `__getitem__`
+        without further requests (except for the data of lazy objects that did not
+        fit in the cache).
+
+        Parameters
+        ----------
+        keys : str or list of str, optional
+            The objects to fetch. Default is all the objects.
+        """
+        if keys is None:
+            keys = self.keys()
+        elif isinstance(keys, str):
+            keys = [keys]
+        keys = [self.full_path_to_key.get(k, k) for k in keys]
+        for k in keys:
+            if k not in self.data:
+                raise KeyError("Can't find key {} in group index.".format(k))
+
+        pending = [
+            k for k in keys if isinstance(self.data[k], dict) and "id" in self.data[k]
+        ]
+
+        if self._remote is not None:
+            ranges = []
+            for k in pending:
+                if "location" in self.data[k]:
+                    ranges += _group_ranges(self._h5file[self.data[k]["location"]])
+            await self._remote.prefetch(ranges)
+
+        for k in pending:
+            self[k]
+            await asyncio.sleep(0)  # other tasks can run between objects
+
+    async def aget(self, key):
+        """Get object from NWB asynchronously. See `prefetch`.
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        (Ts, Tsd, TsdFrame, TsGroup, IntervalSet or dict of IntervalSet)
+        """
+        await self.prefetch([key])
+        return self[key]
+
     def close(self):
         """Close the NWB file"""
         self.io.close()
+        if self._h5file is not None:
+            self._h5file.close()
+        if self._remote is not None:
+            self._remote.close()
 
     def keys(self):
         """
@@ -12,11 +12,16 @@ BaseLoader is the general class for loading session with pynapple.
 import importlib
 import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from xml.dom import minidom
 
+import numpy as np
 import pandas as pd
+from scipy import signal
 
 from .. import core as nap
+from .interface_nwb import _get_timestamps, _set_validated_timestamps
 
 
 def get_error_text(path):
@@ -48,6 +53,223 @@ def get_error_text(path):
     return error_txt
 
 
+def _waveform_sums(fp, samples, units, unit_channels, window, batch_size=3000000):
+    """
+    Sum the waveforms of spikes read from a (n_samples, n_channels) memory map.
+
+    The spikes are sorted and split in batches of `batch_size` samples. Each batch is
+    read as one contiguous block spanning the windows of all its spikes, so spikes
+    close to the batch boundaries are not lost. Within a block, the waveforms of all
+    the spikes sharing a channel group are gathered with one fancy index and summed
+    per unit. Batches are processed in a thread pool since reading the memory map
+    releases the GIL.
+
+    Parameters
+    ----------
+    fp : numpy.memmap
+        The raw data, shape (n_samples, n_channels).
+    samples : numpy.ndarray
+        Sample index of each spike.
+    units : numpy.ndarray
+        Unit index (in `unit_channels`) of each spike.
+    unit_channels : list of numpy.ndarray
+        Channels of each unit.
+    window : tuple of int
+        Number of samples before and after the spike.
+    batch_size : int, optional
+        Number of samples per batch.
+
+    Returns
+    -------
+    sums : list of numpy.ndarray
+        Sum of the waveforms of each unit, shape (w0 + w1, n_channels of the unit).
+    counts : numpy.ndarray
+        Number of spikes summed for each unit.
+    """
+    w0, w1 = int(window[0]), int(window[1])
+    samples = np.asarray(samples, dtype=np.int64)
+    units = np.asarray(units, dtype=np.int64)
+
+    # Spikes without a full waveform in the file are ignored
+    keep = (samples - w0 >= 0) & (samples + w1 <= fp.shape[0])
+    order = np.argsort(samples[keep], kind="stable")
+    samples = samples[keep][order]
+    units = units[keep][order]
+
+    n_units = len(unit_channels)
+    counts = np.bincount(units, minlength=n_units)
+
+    # Units sharing the same channels are gathered together
+    groups = {}
+    for u, ch in enumerate(unit_channels):
+        groups.setdefault(tuple(np.asarray(ch).tolist()), []).append(u)
+    unit_group = np.zeros(n_units, dtype=np.int64)
+    group_channels = []
+    for i, (ch, members) in enumerate(groups.items()):
+        unit_group[members] = i
+        group_channels.append(np.array(ch, dtype=np.int64))
+
+    offsets = np.arange(-w0, w1)
+    bounds = np.searchsorted(
+        samples, np.arange(0, fp.shape[0] + batch_size, batch_size)
+    )
+    bounds = np.unique(bounds)
+
+    def _batch(k):
+        s = samples[bounds[k] : bounds[k + 1]]
+        u = units[bounds[k] : bounds[k + 1]]
+        start = s[0] - w0
+        block = fp[start : s[-1] + w1]
+        rows = (s - start)[:, None] + offsets[None, :]
+        out = {}
+        g = unit_group[u]
+        for i in np.unique(g):
+            sel = g == i
+            wf = block[rows[sel][:, :, None], group_channels[i][None, None, :]]
+            su = u[sel]
+            # spikes are sorted by unit to sum each unit with one reduceat
+            o = np.argsort(su, kind="stable")
+            su = su[o]
+            first = np.flatnonzero(np.r_[True, su[1:] != su[:-1]])
+            sums = np.add.reduceat(wf[o], first, axis=0, dtype=np.float64)
+            for j, n in enumerate(su[first]):
+                out[n] = sums[j]
+        return out
+
+    sums = [np.zeros((w0 + w1, len(ch))) for ch in unit_channels]
+    with ThreadPoolExecutor() as executor:
+        for out in executor.map(_batch, range(len(bounds) - 1)):
+            for n, wf in out.items():
+                sums[n] += wf
+
+    return sums, counts
+
+
+def _load_binary(
+    filepath,
+    n_channels,
+    frequency,
+    channel=None,
+    precision="int16",
+    bytes_size=None,
+    downsample=None,
+    out_file=None,
+    block_size=2**26,
+):
+    """
+    Load channels of a binary file of interleaved samples (dat, eeg, lfp).
+
+    Without `channel` and `downsample`, the memory map of the file is returned as
+    is. Otherwise the file is read sequentially in blocks of about `block_size`
+    bytes and only the requested channels of each block are copied to the output.
+
+    With `downsample`, each block is low-pass filtered with a zero-phase FIR
+    filter (the same filter as `scipy.signal.decimate(..., ftype="fir")`) and
+    decimated in the same pass. Blocks are read with the filter margin on each
+    side so the result does not depend on the block size. Samples beyond the
+    edges of the file are taken equal to the first and last samples.
+
+    Parameters
+    ----------
+    filepath : str or Path
+        The binary file.
+    n_channels : int
+        Number of channels.
+    frequency : float
+        Sampling rate of the file.
+    channel : int or list of int, optional
+        The channel(s) to load. Default is all the channels.
+    precision : str, optional
+        The precision of the binary file.
+    bytes_size : int, optional
+        Deprecated and ignored, the size of the samples is given by precision.
+    downsample : int, optional
+        Decimation factor, e.g. 16 to go from 20 kHz to 1250 Hz.
+    out_file : str or Path, optional
+        If given, the output is written to a new .npy file and returned as a
+        read-only memory map of this file.
+    block_size : int, optional
+        Approximate number of bytes read per block.
+
+    Returns
+    -------
+    Tsd or TsdFrame
+    """
+    if bytes_size is not None:
+        warnings.warn(
+            "bytes_size is deprecated and ignored, the size of the samples is given "
+            "by precision. It will be removed in future versions.",
+            category=DeprecationWarning,
+            stacklevel=3,
+        )
+    dtype = np.dtype(precision)
+    n_samples = int(os.path.getsize(filepath) / n_channels / dtype.itemsize)
+    duration = n_samples / frequency
+    fp = np.memmap(filepath, dtype, "r", shape=(n_samples, n_channels))
+    time_support = nap.IntervalSet(start=0, end=duration, time_units="s")
+
+    if channel is None and downsample is None and out_file is None:
+        return nap.TsdFrame(
+            t=nap.RegularTsIndex(0, frequency, n_samples),
+            d=fp,
+            time_units="s",
+            time_support=time_support,
+        )
+
+    if channel is None:
+        columns = np.arange(n_channels)
+    else:
+        columns = np.atleast_1d(np.asarray(channel, dtype=np.int64))
+
+    q = int(downsample) if downsample is not None else 1
+    if q < 1:
+        raise ValueError("downsample should be a positive integer.")
+    n_out = -(-n_samples // q)
+    step = max(1, block_size // (n_channels * dtype.itemsize * q)) * q
+
+    if q > 1:
+        # Same filter as scipy.signal.decimate(..., ftype="fir")
+        half = 10 * q
+        h = signal.firwin(2 * half + 1, 1.0 / q, window="hamming")
+        out_dtype = np.result_type(dtype, np.float32)
+    else:
+        half = 0
+        out_dtype = dtype
+
+    if out_file is not None:
+        data = np.lib.format.open_memmap(
+            out_file, mode="w+", dtype=out_dtype, shape=(n_out, len(columns))
+        )
+    else:
+        data = np.empty((n_out, len(columns)), dtype=out_dtype)
+
+    for start in range(0, n_samples, step):
+        end = min(start + step, n_samples)
+        if q == 1:
+            data[start:end] = fp[start:end][:, columns]
+            continue
+        # Input samples centered on the output samples of the block
+        lo, hi = start - half, end - 1 + half + 1
+        block = fp[max(lo, 0) : min(hi, n_samples)][:, columns]
+        block = np.pad(block, ((max(-lo, 0), max(hi - n_samples, 0)), (0, 0)), "edge")
+        # Output k of upfirdn is centered on input k * q - half
+        y = signal.upfirdn(h, block, down=q, axis=0)
+        k = -(-(end - start) // q)
+        data[start // q : start // q + k] = y[2 * half // q : 2 * half // q + k]
+
+    if out_file is not None:
+        data.flush()
+        del data
+        data = np.load(out_file, mmap_mode="r")
+
+    t = nap.RegularTsIndex(0, frequency / q, n_out)
+    if isinstance(channel, (int, np.integer)):
+        return nap.Tsd(t=t, d=data[:, 0], time_units="s", time_support=time_support)
+    return nap.TsdFrame(
+        t=t, d=data, time_units="s", time_support=time_support, columns=columns
+    )
+
+
 class BaseLoader(object):
     """
     General loader for epochs and tracking data
@@ -75,6 +297,126 @@ class BaseLoader(object):
             )
         return nwbfilepath
 
+    def load_neurosuite_xml(self, path):
+        """
+        Read the xml file of a neurosuite session (number of channels, sampling
+        rates and channel groups).
+
+        Parameters
+        ----------
+        path : str or Path
+            Folder containing the xml file.
+        """
+        path = Path(path)
+        try:
+            xmlpath = next(f for f in path.glob("*.xml") if f.stem == self.path.name)
+        except StopIteration:
+            try:
+                xmlpath = next(path.glob("[!.]*.xml"))
+            except StopIteration:
+                raise RuntimeError(f"Path {path} contains no xml file;")
+
+        xmldoc = minidom.parse(str(xmlpath))
+        acquisition = xmldoc.getElementsByTagName("acquisitionSystem")[0]
+        self.nChannels = int(
+            acquisition.getElementsByTagName("nChannels")[0].firstChild.data
+        )
+        self.fs_dat = float(
+            acquisition.getElementsByTagName("samplingRate")[0].firstChild.data
+        )
+        lfp = xmldoc.getElementsByTagName("fieldPotentials")
+        if len(lfp):
+            self.fs_eeg = float(
+                lfp[0].getElementsByTagName("lfpSamplingRate")[0].firstChild.data
+            )
+
+        self.group_to_channel = {}
+        groups = (
+            xmldoc.getElementsByTagName("anatomicalDescription")[0]
+            .getElementsByTagName("channelGroups")[0]
+            .getElementsByTagName("group")
+        )
+        for i, g in enumerate(groups):
+            self.group_to_channel[i] = np.array(
+                [int(c.firstChild.data) for c in g.getElementsByTagName("channel")]
+            )
+        return
+
+    def _load_mean_waveforms(
+        self, epoch=None, waveform_window=None, spike_count=1000, batch_size=3000000
+    ):
+        """
+        Mean waveforms of `self.spikes` computed from the dat file of the session.
+        See `_waveform_sums`.
+        """
+        if not isinstance(waveform_window, nap.IntervalSet):
+            waveform_window = nap.IntervalSet(start=-0.5, end=1, time_units="ms")
+
+        spikes = self.spikes
+        if epoch is not None:
+            if not isinstance(epoch, nap.IntervalSet):
+                raise TypeError("Epoch must be an IntervalSet")
+            spikes = spikes.restrict(epoch)
+
+        self.load_neurosuite_xml(self.path)
+        n_channels = int(self.nChannels)
+        fs = self.fs_dat
+        group = spikes.get_info("group")
+
+        try:
+            file = next(self.path.glob("[!.]*.dat"))
+        except StopIteration:
+            raise RuntimeError(f"Path {self.path} contains no dat file;")
+        n_samples = int(os.path.getsize(file) / n_channels / 2)
+        fp = np.memmap(file, np.int16, "r", shape=(n_samples, n_channels))
+
+        window = np.abs(
+            np.array(
+                [waveform_window.start[0], waveform_window.end[0]], dtype=np.float64
+            )
+            * fs
+        ).astype(int)
+
+        neurons = list(spikes.keys())
+        samples = []
+        for index, neuron in enumerate(neurons):
+            s = (spikes[neuron].index * fs).astype("int")
+            if len(s) >= spike_count:
+                s = np.random.choice(s, spike_count)
+            else:
+                print(
+                    "Not enough spikes in neuron " + str(index) + "... using all spikes"
+                )
+            samples.append(s)
+
+        unit_channels = [self.group_to_channel[group[n]] for n in neurons]
+        sums, counts = _waveform_sums(
+            fp,
+            np.concatenate(samples) if len(samples) else np.array([], dtype=int),
+            np.repeat(np.arange(len(neurons)), [len(s) for s in samples]),
+            unit_channels,
+            window,
+            batch_size,
+        )
+
+        index = np.arange(-window[0], window[1]) / fs
+        meanwf = {
+            n: pd.DataFrame(
+                data=sums[i] / max(counts[i], 1),
+                columns=np.arange(len(unit_channels[i])),
+                index=index,
+            )
+            for i, n in enumerate(neurons)
+        }
+
+        # find the max channel for each neuron
+        maxch = pd.Series(
+            data=[meanwf[n].iloc[window[0]].idxmin() for n in neurons],
+            index=neurons,
+        )
+
+        return meanwf, maxch
+
     def load_data(self):
         """
         Load NWB data saved with pynapple in the pynapplenwb folder
@@ -233,6 +575,7 @@ class BaseLoader(object):
         nwbfile.add_acquisition(ts)
         io.write(nwbfile)
         io.close()
+        _set_validated_timestamps(self.nwbfilepath, "acquisition/" + name)
 
         return
 
@@ -283,7 +626,10 @@ class BaseLoader(object):
         time_support = self.load_nwb_intervals(name + "_timesupport")
 
         tsd = nap.Tsd(
-            t=ts.timestamps[:], d=ts.data[:], time_units="s", time_support=time_support
+            t=_get_timestamps(ts),
+            d=ts.data[:],
+            time_units="s",
+            time_support=time_support,
         )
 
         io.close()
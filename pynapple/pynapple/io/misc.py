@@ -9,26 +9,28 @@ import warnings
 from pathlib import Path
 from xml.dom import minidom
 
-import numpy as np
-
 from .. import core as nap
+from ._http_file import _is_url
 from .cnmfe import CNMF_E, InscopixCNMFE, Minian
 from .folder import Folder
 from .interface_npz import NPZFile
-from .interface_nwb import NWBFile
-from .loader import BaseLoader
+from .interface_nwb import NWBFile, _set_validated_timestamps
+from .loader import BaseLoader, _load_binary
 from .neurosuite import NeuroSuite
 from .phy import Phy
 from .suite2p import Suite2P
 
 
 def load_file(path, lazy_loading=None):
-    """Load file. Current format supported is (npz,nwb,)
+    """Load file. Current format supported is (npz,nap,nwb,)
 
     .npz -> If the file is compatible with a pynapple format, the function will return a pynapple object.
     Otherwise, the function will return the output of numpy.load
 
-    .nwb -> Return the pynapple.io.NWBFile class wrapping the NWBFile
+    .nap -> Directory bundle saved by pynapple. Timestamps and data are memory-mapped.
+
+    .nwb -> Return the pynapple.io.NWBFile class wrapping the NWBFile. The path can be the
+    URL of a NWB file on a server supporting HTTP range requests.
 
     Parameters
     ----------
@@ -48,11 +50,14 @@ def load_file(path, lazy_loading=None):
     FileNotFoundError
         If file is missing
     """
+    if _is_url(path):
+        return NWBFile(path)
+
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"File {path} does not exist")
 
-    if path.suffix == ".npz":
+    if path.suffix in (".npz", ".nap"):
         if lazy_loading:
             warnings.warn("Lazy loading is not supported for NPZ files")
         return NPZFile(path).load()
@@ -157,11 +162,19 @@ def load_eeg(
     n_channels=None,
     frequency=None,
     precision="int16",
-    bytes_size=2,
+    bytes_size=None,
+    downsample=None,
+    out_file=None,
 ):
     """
     Standalone function to load eeg/lfp/dat file in binary format.
 
+    When `channel` or `downsample` is given, the file is read sequentially in
+    blocks and only the requested channels are kept, optionally low-pass
+    filtered and decimated during the read. The output is then loaded in memory
+    (or written to `out_file`), including for a single channel, where previous
+    versions returned a lazy view of the memory map.
+
     Parameters
     ----------
     filepath : str
@@ -175,7 +188,13 @@ def load_eeg(
     precision : str, optional
         The precision of the binary file
     bytes_size : int, optional
-        Bytes size of the binary file
+        Deprecated and ignored, the size of the samples is given by precision.
+    downsample : int, optional
+        Decimation factor applied after anti-aliasing filtering,
+        e.g. 16 to load a 20 kHz dat file at 1250 Hz.
+    out_file : str, optional
+        Path of a .npy file to write the output to. The data is then returned
+        as a memory map of this file.
 
     Raises
     ------
@@ -200,23 +219,23 @@ def load_eeg(
     listdir = list(path.glob("*"))
 
     if frequency is None or n_channels is None:
-        if basename + ".xml" in listdir:
+        if path / (basename + ".xml") in listdir:
             xmlpath = path / (basename + ".xml")
-            xmldoc = minidom.parse(xmlpath)
+            xmldoc = minidom.parse(str(xmlpath))
         else:
             raise RuntimeError(
                 "Can't find xml file; please specify sampling frequency or number of channels"
             )
 
         if frequency is None:
-            if filepath.endswith(".dat"):
+            if filepath.suffix == ".dat":
                 fs_dat = int(
                     xmldoc.getElementsByTagName("acquisitionSystem")[0]
                     .getElementsByTagName("samplingRate")[0]
                     .firstChild.data
                 )
                 frequency = fs_dat
-            elif filepath.endswith((".lfp", ".eeg")):
+            elif filepath.suffix in (".lfp", ".eeg"):
                 fs_eeg = int(
                     xmldoc.getElementsByTagName("fieldPotentials")[0]
                     .getElementsByTagName("lfpSamplingRate")[0]
@@ -231,32 +250,16 @@ def load_eeg(
                 .firstChild.data
             )
 
-    f = open(filepath, "rb")
-    startoffile = f.seek(0, 0)
-    endoffile = f.seek(0, 2)
-    bytes_size = 2
-    n_samples = int((endoffile - startoffile) / n_channels / bytes_size)
-    duration = n_samples / frequency
-    f.close()
-    fp = np.memmap(filepath, precision, "r", shape=(n_samples, n_channels))
-    timestep = np.arange(0, n_samples) / frequency
-
-    time_support = nap.IntervalSet(start=0, end=duration, time_units="s")
-
-    if channel is None:
-        return nap.TsdFrame(t=timestep, d=fp)
-    elif type(channel) is int:
-        return nap.Tsd(
-            t=timestep, d=fp[:, channel], time_units="s", time_support=time_support
-        )
-    elif type(channel) is list:
-        return nap.TsdFrame(
-            t=timestep,
-            d=fp[:, channel],
-            time_units="s",
-            time_support=time_support,
-            columns=channel,
-        )
+    return _load_binary(
+        filepath,
+        n_channels,
+        frequency,
+        channel=channel,
+        precision=precision,
+        bytes_size=bytes_size,
+        downsample=downsample,
+        out_file=out_file,
+    )
 
 
 def append_NWB_LFP(path, lfp, channel=None):
@@ -319,5 +322,6 @@ def append_NWB_LFP(path, lfp, channel=None):
 
     io.write(nwbfile)
     io.close()
+    _set_validated_timestamps(nwb_path, "processing/ecephys/LFP/ElectricalSeries")
 
     return
@@ -7,14 +7,12 @@ Class and functions for loading data processed with the Neurosuite (Klusters, Ne
 """
 
 import importlib
-import sys
 from pathlib import Path
 
 import numpy as np
-import pandas as pd
 
 from .. import core as nap
-from .loader import BaseLoader
+from .loader import BaseLoader, _load_binary
 
 
 class NeuroSuite(BaseLoader):
@@ -87,11 +85,19 @@ class NeuroSuite(BaseLoader):
         extension=".eeg",
         frequency=1250.0,
         precision="int16",
-        bytes_size=2,
+        bytes_size=None,
+        downsample=None,
+        out_file=None,
     ):
         """
         Load the LFP.
 
+        When `channel` or `downsample` is given, the file is read sequentially in
+        blocks and only the requested channels are kept, optionally low-pass
+        filtered and decimated during the read. The output is then loaded in memory
+        (or written to `out_file`), including for a single channel, where previous
+        versions returned a lazy view of the memory map.
+
         Parameters
         ----------
         filename : str, optional
@@ -106,7 +112,13 @@ class NeuroSuite(BaseLoader):
         precision : str, optional
             The precision of the binary file
         bytes_size : int, optional
-            Bytes size of the lfp file
+            Deprecated and ignored, the size of the samples is given by precision.
+        downsample : int, optional
+            Decimation factor applied after anti-aliasing filtering,
+            e.g. 16 to load a 20 kHz dat file at 1250 Hz.
+        out_file : str, optional
+            Path of a .npy file to write the output to. The data is then returned
+            as a memory map of this file.
 
         Raises
         ------
@@ -121,8 +133,7 @@ class NeuroSuite(BaseLoader):
         if filename is not None:
             filepath = self.path / filename
         else:
-            filepath = Path(filename)
-            eegfile = list(filepath.glob(f"*{extension}"))
+            eegfile = list(self.path.glob(f"*{extension}"))
 
             if not len(eegfile):
                 raise RuntimeError(
@@ -133,36 +144,16 @@ class NeuroSuite(BaseLoader):
 
         self.load_neurosuite_xml(self.path)
 
-        n_channels = int(self.nChannels)
-
-        f = open(filepath, "rb")
-        startoffile = f.seek(0, 0)
-        endoffile = f.seek(0, 2)
-        bytes_size = 2
-        n_samples = int((endoffile - startoffile) / n_channels / bytes_size)
-        duration = n_samples / frequency
-        f.close()
-        fp = np.memmap(filepath, np.int16, "r", shape=(n_samples, n_channels))
-        timestep = np.arange(0, n_samples) / frequency
-
-        time_support = nap.IntervalSet(start=0, end=duration, time_units="s")
-
-        if channel is None:
-            return nap.TsdFrame(
-                t=timestep, d=fp, time_units="s", time_support=time_support
-            )
-        elif type(channel) is int:
-            return nap.Tsd(
-                t=timestep, d=fp[:, channel], time_units="s", time_support=time_support
-            )
-        elif type(channel) is list:
-            return nap.TsdFrame(
-                t=timestep,
-                d=fp[:, channel],
-                time_units="s",
-                time_support=time_support,
-                columns=channel,
-            )
+        return _load_binary(
+            filepath,
+            int(self.nChannels),
+            frequency,
+            channel=channel,
+            precision=precision,
+            bytes_size=bytes_size,
+            downsample=downsample,
+            out_file=out_file,
+        )
 
     def read_neuroscope_intervals(self, name=None, path2file=None):
         """
@@ -249,6 +240,10 @@ class NeuroSuite(BaseLoader):
         """
         Load the mean waveforms from a dat file.
 
+        The spikes are read in batches of contiguous samples, each batch being
+        gathered in one vectorized read per channel group. Batches are processed
+        in parallel.
+
         Parameters
         ----------
         epoch : IntervalSet
@@ -261,6 +256,11 @@ class NeuroSuite(BaseLoader):
             default = 1000
             Number of spikes used per neuron for the calculation of waveforms
 
+        Raises
+        ------
+        RuntimeError
+            If can't find the xml or dat file
+
         Returns
         -------
         dictionary
@@ -269,162 +269,4 @@ class NeuroSuite(BaseLoader):
             the channel with the maximum waveform for each neuron
 
         """
-        if not isinstance(waveform_window, nap.IntervalSet):
-            waveform_window = nap.IntervalSet(start=-0.5, end=1, time_units="ms")
-
-        spikes = self.spikes
-        if not self.path.exists():  # check if path exists
-            print("The path " + self.path + " doesn't exist; Exiting ...")
-            sys.exit()
-
-        # Load XML INFO
-        self.load_neurosuite_xml(self.path)
-        n_channels = self.nChannels
-        fs = self.fs_dat
-        group_to_channel = self.group_to_channel
-        group = spikes.get_info("group")
-
-        # Check if there is an epoch, restrict spike times to epoch
-        if epoch is not None:
-            if type(epoch) is not nap.IntervalSet:
-                print("Epoch must be an IntervalSet")
-                sys.exit()
-            else:
-                print("Restricting spikes to epoch")
-                spikes = spikes.restrict(epoch)
-                epstart = int(epoch.as_units("s")["start"].values[0] * fs)
-                epend = int(epoch.as_units("s")["end"].values[0] * fs)
-
-        # Find dat file
-        # files = os.listdir(self.path)
-        #  dat_files = np.sort([f for f in files if "dat" in f and f[0] != "."])
-
-        # Need n_samples collected in the entire recording from dat file to load
-        # file = self.path / dat_files[0]
-        file = next(self.path.glob("^[^.][^.]*.dat"))
-        f = open(
-            file, "rb"
-        )  # open file to get number of samples collected in the entire recording
-        startoffile = f.seek(0, 0)
-        endoffile = f.seek(0, 2)
-        bytes_size = 2
-        n_samples = int((endoffile - startoffile) / n_channels / bytes_size)
-        f.close()
-        # map to memory all samples for all channels, channels are numbered according to neuroscope number
-        fp = np.memmap(file, np.int16, "r", shape=(n_samples, n_channels))
-
-        # convert spike times to spikes in sample number
-        sample_spikes = {
-            neuron: (spikes[neuron].as_units("s").index.values * fs).astype("int")
-            for neuron in spikes
-        }
-
-        # prep for waveforms
-        overlap = int(
-            waveform_window.tot_length(time_units="s")
-        )  # one spike's worth of overlap between windows
-        waveform_window = abs(np.array(waveform_window.as_units("s"))[0] * fs).astype(
-            int
-        )  # convert time to sample number
-        neuron_waveforms = {
-            n: np.zeros([np.sum(waveform_window), len(group_to_channel[group[n]])])
-            for n in sample_spikes
-        }
-
-        # divide dat file into batches that slightly overlap for faster loading
-        batch_size = 3000000
-        windows = np.arange(0, int(endoffile / n_channels / bytes_size), batch_size)
-        if epoch is not None:
-            print("Restricting dat file to epoch")
-            windows = windows[(windows >= epstart) & (windows <= epend)]
-        batches = []
-        for (
-            i
-        ) in windows:  # make overlapping batches from the beginning to end of recording
-            if i == windows[-1]:  # the last batch cannot overlap with the next one
-                batches.append([i, n_samples])
-            else:
-                batches.append([i, i + batch_size + overlap])
-        batches = [np.int32(batch) for batch in batches]
-
-        sample_counted_spikes = {}
-        for index, neuron in enumerate(sample_spikes):
-            if len(sample_spikes[neuron]) >= spike_count:
-                sample_counted_spikes[neuron] = np.array(
-                    np.random.choice(list(sample_spikes[neuron]), spike_count)
-                )
-            elif len(sample_spikes[neuron]) < spike_count:
-                print(
-                    "Not enough spikes in neuron " + str(index) + "... using all spikes"
-                )
-                sample_counted_spikes[neuron] = sample_spikes[neuron]
-
-        # Make one array containing all selected spike times of all neurons - will be used to check for spikes before loading dat file
-        spike_check = np.array(
-            [
-                int(spikes_neuron)
-                for spikes_neuron in sample_counted_spikes[neuron]
-                for neuron in sample_counted_spikes
-            ]
-        )
-
-        for index, timestep in enumerate(batches):
-            print(
-                f"Extracting waveforms from dat file: window {index+1} / {len(windows)}",
-                end="\r",
-            )
-
-            if (
-                len(
-                    spike_check[
-                        (timestep[0] < spike_check) & (timestep[1] > spike_check)
-                    ]
-                )
-                == 0
-            ):
-                continue  # if there are no spikes for any neurons in this batch, skip and go to the next one
-
-            # Load dat file for timestep
-            tmp = pd.DataFrame(
-                data=fp[timestep[0] : timestep[1], :],
-                columns=np.arange(n_channels),
-                index=range(timestep[0], timestep[1]),
-            )  # load dat file
-
-            # Check if any spikes are present
-            for neuron in sample_counted_spikes:
-                neurontmp = sample_counted_spikes[neuron]
-                tmp2 = neurontmp[(timestep[0] < neurontmp) & (timestep[1] > neurontmp)]
-                if len(neurontmp) == 0:
-                    continue  # skip neuron if it has no spikes in this batch
-                tmpn = tmp[
-                    group_to_channel[group[neuron]]
-                ]  # restrict dat file to the channel group of the neuron
-
-                for time in tmp2:  # add each spike waveform to neuron_waveform
-                    spikewindow = tmpn.loc[
-                        time - waveform_window[0] : time + waveform_window[1] - 1
-                    ]  # waveform for this spike time
-                    try:
-                        neuron_waveforms[neuron] += spikewindow.values
-                    except (
-                        Exception
-                    ):  # ignore if full waveform is not present in this batch
-                        pass
-
-        meanwf = {
-            n: pd.DataFrame(
-                data=np.array(neuron_waveforms[n]) / spike_count,
-                columns=np.arange(len(group_to_channel[group[n]])),
-                index=np.array(np.arange(-waveform_window[0], waveform_window[1])) / fs,
-            )
-            for n in sample_counted_spikes
-        }
-
-        # find the max channel for each neuron
-        maxch = pd.Series(
-            data=[meanwf[n][meanwf[n].loc[0].idxmin()].name for n in meanwf],
-            index=spikes.keys(),
-        )
-
-        return meanwf, maxch
+        return self._load_mean_waveforms(epoch, waveform_window, spike_count)
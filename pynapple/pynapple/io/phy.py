@@ -12,7 +12,7 @@ from pathlib import Path
 import numpy as np
 
 from .. import core as nap
-from .loader import BaseLoader
+from .loader import BaseLoader, _load_binary
 
 
 class Phy(BaseLoader):
@@ -73,6 +73,37 @@ class Phy(BaseLoader):
             io.close()
             return True
 
+    def load_mean_waveforms(self, epoch=None, waveform_window=None, spike_count=1000):
+        """
+        Load the mean waveforms from the dat file of the session.
+
+        Uses the same batched extraction as `NeuroSuite.load_mean_waveforms`.
+        Channel groups are read from the xml file.
+
+        Parameters
+        ----------
+        epoch : IntervalSet, optional
+            Restrict spikes to an epoch.
+        waveform_window : IntervalSet, optional
+            Limit waveform extraction before and after spike time.
+            Default is nap.IntervalSet(start=-0.5, end=1, time_units="ms")
+        spike_count : int, optional
+            Number of spikes used per neuron for the calculation of waveforms
+
+        Raises
+        ------
+        RuntimeError
+            If can't find the xml or dat file
+
+        Returns
+        -------
+        dict
+            The mean waveforms for all neurons
+        pandas.Series
+            The channel with the maximum waveform for each neuron
+        """
+        return self._load_mean_waveforms(epoch, waveform_window, spike_count)
+
     def load_lfp(
         self,
         filename=None,
@@ -80,11 +111,19 @@ class Phy(BaseLoader):
         extension=".eeg",
         frequency=1250.0,
         precision="int16",
-        bytes_size=2,
+        bytes_size=None,
+        downsample=None,
+        out_file=None,
     ):
         """
         Load the LFP.
 
+        When `channel` or `downsample` is given, the file is read sequentially in
+        blocks and only the requested channels are kept, optionally low-pass
+        filtered and decimated during the read. The output is then loaded in memory
+        (or written to `out_file`), including for a single channel, where previous
+        versions returned a lazy view of the memory map.
+
         Parameters
         ----------
         filename : str, optional
@@ -99,7 +138,13 @@ class Phy(BaseLoader):
         precision : str, optional
             The precision of the binary file
         bytes_size : int, optional
-            Bytes size of the lfp file
+            Deprecated and ignored, the size of the samples is given by precision.
+        downsample : int, optional
+            Decimation factor applied after anti-aliasing filtering,
+            e.g. 16 to load a 20 kHz dat file at 1250 Hz.
+        out_file : str, optional
+            Path of a .npy file to write the output to. The data is then returned
+            as a memory map of this file.
 
         Raises
         ------
@@ -123,33 +168,13 @@ class Phy(BaseLoader):
         # This is not implemented for this class.
         self.load_neurosuite_xml(self.path)
 
-        n_channels = int(self.nChannels)
-
-        f = open(filepath, "rb")
-        startoffile = f.seek(0, 0)
-        endoffile = f.seek(0, 2)
-        bytes_size = 2
-        n_samples = int((endoffile - startoffile) / n_channels / bytes_size)
-        duration = n_samples / frequency
-        f.close()
-        fp = np.memmap(filepath, np.int16, "r", shape=(n_samples, n_channels))
-        timestep = np.arange(0, n_samples) / frequency
-
-        time_support = nap.IntervalSet(start=0, end=duration, time_units="s")
-
-        if channel is None:
-            return nap.TsdFrame(
-                t=timestep, d=fp, time_units="s", time_support=time_support
-            )
-        elif type(channel) is int:
-            return nap.Tsd(
-                t=timestep, d=fp[:, channel], time_units="s", time_support=time_support
-            )
-        elif type(channel) is list:
-            return nap.TsdFrame(
-                t=timestep,
-                d=fp[:, channel],
-                time_units="s",
-                time_support=time_support,
-                columns=channel,
-            )
+        return _load_binary(
+            filepath,
+            int(self.nChannels),
+            frequency,
+            channel=channel,
+            precision=precision,
+            bytes_size=bytes_size,
+            downsample=downsample,
+            out_file=out_file,
+        )
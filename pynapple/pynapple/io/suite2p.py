@@ -19,9 +19,45 @@ import numpy as np
 import pandas as pd
 
 from .. import core as nap
+from ..core.utils import _take_rows
 from .loader import BaseLoader
 
 
+class ROIMasks(object):
+    """Pixel masks of a set of ROIs in a compressed sparse row layout.
+
+    The pixels of the i-th ROI are `xpix[indptr[i]:indptr[i + 1]]`,
+    `ypix[indptr[i]:indptr[i + 1]]` with weights `lam[indptr[i]:indptr[i + 1]]`.
+
+    Attributes
+    ----------
+    indptr : numpy.ndarray
+        Offsets of the ROIs, of length n_rois + 1
+    xpix, ypix, lam : numpy.ndarray
+        Coordinates and weights of the pixels of all the ROIs
+    roi : numpy.ndarray
+        Index of each ROI in the segmentation table
+    plane : numpy.ndarray
+        Plane of each ROI
+    """
+
+    def __init__(self, indptr, xpix, ypix, lam, roi, plane):
+        self.indptr = indptr
+        self.xpix = xpix
+        self.ypix = ypix
+        self.lam = lam
+        self.roi = roi
+        self.plane = plane
+
+    def __len__(self):
+        return len(self.roi)
+
+    def __getitem__(self, i):
+        """Mask of the i-th ROI as a dict of views of `xpix`, `ypix` and `lam`."""
+        s = slice(self.indptr[i], self.indptr[i + 1])
+        return {"xpix": self.xpix[s], "ypix": self.ypix[s], "lam": self.lam[s]}
+
+
 class Suite2P(BaseLoader):
     """Loader for data processed with Suite2P.
 
@@ -42,9 +78,11 @@ class Suite2P(BaseLoader):
         Deconvolved traces (timepoints x ROIS) for all planes
     plane_info : pandas.DataFrame
         Contains plane identity of each cell
+    rois : ROIMasks
+        Pixel masks of the neurons that were classified as cells
     stats : dict
         dictionnay of statistics from stat.npy for each planes only for the neurons that were classified as cells
-        (Can be smaller when loading from the NWB file)
+        (Can be smaller when loading from the NWB file). Built from `rois` on first access.
     ops : dict
         Parameters from Suite2p. (Can be smaller when loading from the NWB file)
     iscell : numpy.ndarray
@@ -66,6 +104,20 @@ class Suite2P(BaseLoader):
 
         self.load_suite2p_nwb(path)
 
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = {0: {}}
+            for pl in self._planes:
+                self._stats[int(pl)] = {}
+            for i, (n, pl) in enumerate(zip(self.rois.roi, self.rois.plane)):
+                self._stats[int(pl)][int(n)] = self.rois[i]
+        return self._stats
+
+    @stats.setter
+    def stats(self, stats):
+        self._stats = stats
+
     def load_suite2p_nwb(self, path):
         """
         Load suite2p data from NWB
@@ -91,50 +143,50 @@ class Suite2P(BaseLoader):
                 "TwoPhotonSeries"
             ].imaging_plane.imaging_rate
 
-            self.stats = {0: {}}
             self.iscell = ophys["ImageSegmentation"]["PlaneSegmentation"][
                 "iscell"
             ].data[:]
 
-            info = pd.DataFrame(
-                data=self.iscell[:, 0].astype("int"), columns=["iscell"]
-            )
-
             #################################################################
             # ROIS
             #################################################################
-            try:
-                rois = nwbfile.processing["ophys"]["ImageSegmentation"][
-                    "PlaneSegmentation"
-                ]["pixel_mask"]
-                multiplane = False
-            except Exception:
-                rois = nwbfile.processing["ophys"]["ImageSegmentation"][
-                    "PlaneSegmentation"
-                ]["voxel_mask"]
-                multiplane = True
-
-            idx = np.where(self.iscell[:, 0])[0]
-            info["plane"] = 0
-
-            for n in range(len(rois)):
-                roi = pd.DataFrame(rois[n])
-                if "z" in roi.columns:
-                    pl = roi["z"][0]
-                else:
-                    pl = 0
-
-                info.loc[n, "plane"] = pl
-
-                if pl not in self.stats.keys():
-                    self.stats[pl] = {}
-
-                if n in idx:
-                    self.stats[pl][n] = {
-                        "xpix": roi["y"].values,
-                        "ypix": roi["x"].values,
-                        "lam": roi["weight"].values,
-                    }
+            segmentation = ophys["ImageSegmentation"]["PlaneSegmentation"]
+            multiplane = "voxel_mask" in segmentation.colnames
+            column = segmentation["voxel_mask" if multiplane else "pixel_mask"]
+
+            # Flat table of pixels and offsets of each ROI
+            offsets = np.asarray(column.data[:], dtype=np.int64)
+            flat = column.target.data
+            flat = getattr(flat, "dataset", flat)
+            starts = np.concatenate(([0], offsets[:-1]))
+
+            # Plane of each ROI from its first voxel
+            plane = np.zeros(len(offsets), dtype=np.int64)
+            if multiplane:
+                nonempty = offsets > starts
+                plane[nonempty] = _take_rows(flat, starts[nonempty])["z"]
+
+            # Pixels of the cells only
+            idx = np.flatnonzero(self.iscell[:, 0])
+            counts = offsets[idx] - starts[idx]
+            rows = np.repeat(starts[idx] - np.cumsum(counts) + counts, counts)
+            rows += np.arange(len(rows))
+            pixels = _take_rows(flat, rows)
+
+            self.rois = ROIMasks(
+                np.concatenate(([0], np.cumsum(counts))),
+                pixels["y"],
+                pixels["x"],
+                pixels["weight"],
+                idx,
+                plane[idx],
+            )
+            self._planes = np.unique(plane)
+            self._stats = None
+
+            info = pd.DataFrame(
+                {"iscell": self.iscell[:, 0].astype("int"), "plane": plane}
+            )
 
             #################################################################
             # Time Series
@@ -177,7 +229,9 @@ class Suite2P(BaseLoader):
 
                     tokeep = info["iscell"][info["plane"] == n].values == 1
 
-                    d = np.transpose(ophys[name][pl].data[:][tokeep])
+                    d = np.transpose(
+                        _take_rows(ophys[name][pl].data, np.flatnonzero(tokeep))
+                    )
 
                     if ophys[name][pl].timestamps is not None:
                         t = ophys[name][pl].timestamps[:]
@@ -1,9 +1,27 @@
+from ._background import (
+    BackgroundExecutor,
+    BackgroundFuture,
+    ProcessExecutor,
+    WebWorkerExecutor,
+    background,
+    get_background_executor,
+    set_background_executor,
+)
+from ._surrogates import Surrogates, SurrogateStatistics, surrogates
+from .cache import (
+    BaseStorage,
+    BrowserStorage,
+    DirectoryStorage,
+    disable_cache,
+    enable_cache,
+    get_cache,
+)
 from .correlograms import (
     compute_autocorrelogram,
     compute_crosscorrelogram,
     compute_eventcorrelogram,
 )
-from .decoding import decode_1d, decode_2d
+from .decoding import OnlineBayesianDecoder, decode_1d, decode_2d
 from .filtering import (
     apply_bandpass_filter,
     apply_bandstop_filter,
@@ -0,0 +1,747 @@
+"""
+Run the `process` functions in the background.
+
+`nap.background(func, *args, **kwargs)` returns a `BackgroundFuture` immediately and
+runs `func(*args, **kwargs)` in a pool of workers: worker processes natively and web
+workers in Pyodide, so that a long computation does not block the notebook.
+
+Arguments and results are pickled to the workers. When possible, a call is split into
+tasks that are dispatched to the workers and whose results are combined:
+
+- correlograms, event trigger averages and perievents of a TsGroup by group of units,
+- continuous perievents by group of reference times,
+- wavelet transforms by group of columns,
+- decoding of a TsGroup by group of epochs.
+
+The progress is reported as the number of tasks done and a call can be cancelled at
+any time. Natively, the tasks that are already running are completed but their results
+are discarded. In Pyodide, the web workers running them are restarted.
+
+>>> future = nap.background(nap.compute_crosscorrelogram, group, 0.001, 0.5)
+>>> future.add_progress_callback(lambda done, total: print(done, "/", total))
+>>> future.cancel()
+>>> cc = future.result()  # natively
+>>> cc = await future  # in Pyodide, where result() can not block
+"""
+
+import abc
+import asyncio
+import concurrent.futures
+import inspect
+import json
+import os
+import pickle
+import sys
+import threading
+from collections import deque
+from urllib.parse import urljoin
+
+import numpy as np
+import pandas as pd
+
+from .. import core as nap
+from .correlograms import (
+    compute_autocorrelogram,
+    compute_crosscorrelogram,
+    compute_eventcorrelogram,
+)
+from .decoding import decode_1d, decode_2d
+from .perievent import (
+    compute_event_trigger_average,
+    compute_perievent,
+    compute_perievent_continuous,
+)
+from .wavelets import compute_wavelet_transform
+
+_default_executor = None
+
+
+class BackgroundFuture:
+    """
+    Result of a call running in the background.
+
+    It follows the interface of `concurrent.futures.Future` and can be awaited.
+    """
+
+    def __init__(self, executor, tasks, combine):
+        self._executor = executor
+        self._tasks = tasks
+        self._combine = combine
+        self._lock = threading.Lock()
+        self._done = 0
+        self._progress_callbacks = []
+        self._done_callbacks = []
+        for task in tasks:
+            task.add_done_callback(self._task_done)
+
+    def __repr__(self):
+        if self.cancelled():
+            state = "cancelled"
+        elif self.done():
+            state = "finished"
+        else:
+            state = "running"
+        return "<{} {}: {}/{} tasks>".format(
+            type(self).__name__, state, self._done, len(self._tasks)
+        )
+
+    def __await__(self):
+        return self._wait().__await__()
+
+    async def _wait(self):
+        await asyncio.gather(*[asyncio.wrap_future(task) for task in self._tasks])
+        return self.result()
+
+    @property
+    def progress(self):
+        """Fraction of the tasks that are done."""
+        return self._done / len(self._tasks)
+
+    def _task_done(self, task):
+        with self._lock:
+            if task.cancelled():
+                return
+            self._done += 1
+            done = self._done
+            callbacks = list(self._progress_callbacks)
+        for callback in callbacks:
+            callback(done, len(self._tasks))
+        if done == len(self._tasks):
+            self._call_done_callbacks()
+
+    def _call_done_callbacks(self):
+        with self._lock:
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def add_progress_callback(self, fn):
+        """
+        Call `fn(done, total)` each time a task is done.
+
+        Natively, `fn` is called from a thread of the executor.
+        """
+        with self._lock:
+            self._progress_callbacks.append(fn)
+
+    def add_done_callback(self, fn):
+        """Call `fn(future)` when the call is done or cancelled."""
+        with self._lock:
+            if not self.done():
+                self._done_callbacks.append(fn)
+                return
+        fn(self)
+
+    def cancel(self):
+        """
+        Cancel the call.
+
+        Returns
+        -------
+        bool
+            False if the call was already done
+        """
+        if self.done() and not self.cancelled():
+            return False
+        self._executor._cancel(self._tasks)
+        self._call_done_callbacks()
+        return True
+
+    def cancelled(self):
+        return any(task.cancelled() for task in self._tasks)
+
+    def running(self):
+        return not self.done() and not self.cancelled()
+
+    def done(self):
+        return all(task.done() for task in self._tasks)
+
+    def result(self, timeout=None):
+        """
+        Wait for the tasks and return the combined result.
+
+        Raises
+        ------
+        concurrent.futures.CancelledError
+            If the call was cancelled
+        concurrent.futures.TimeoutError
+            If the tasks are not done after `timeout` seconds
+        RuntimeError
+            In Pyodide, if the tasks are not done (the future has to be awaited)
+        """
+        if self.cancelled():
+            raise concurrent.futures.CancelledError()
+        if not self.done() and sys.platform == "emscripten":
+            raise RuntimeError("The call is still running. Use `await future`.")
+        _, pending = concurrent.futures.wait(self._tasks, timeout)
+        if len(pending):
+            raise concurrent.futures.TimeoutError()
+        return self._combine([task.result() for task in self._tasks])
+
+    def exception(self, timeout=None):
+        try:
+            self.result(timeout)
+        except (concurrent.futures.CancelledError, concurrent.futures.TimeoutError):
+            raise
+        except Exception as error:
+            return error
+        return None
+
+
+class BackgroundExecutor(abc.ABC):
+    """
+    Pool of workers running the `process` functions in the background.
+
+    Parameters
+    ----------
+    n_workers : int
+        The number of workers.
+    tasks_per_worker : int, optional
+        A call is split in at most `n_workers * tasks_per_worker` tasks. Default is 4.
+    """
+
+    def __init__(self, n_workers, tasks_per_worker=4):
+        self.n_workers = max(int(n_workers), 1)
+        self.tasks_per_worker = tasks_per_worker
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    @abc.abstractmethod
+    def _submit(self, func, args, kwargs):
+        """Run one task and return a `concurrent.futures.Future`."""
+        pass
+
+    def _cancel(self, tasks):
+        for task in tasks:
+            task.cancel()
+
+    def shutdown(self):
+        """Stop the workers."""
+        pass
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run `func(*args, **kwargs)` in the background.
+
+        Returns
+        -------
+        BackgroundFuture
+        """
+        calls, combine = _split(
+            func, args, kwargs, self.n_workers * self.tasks_per_worker
+        )
+        tasks = [self._submit(f, a, k) for f, a, k in calls]
+        return BackgroundFuture(self, tasks, combine)
+
+
+class ProcessExecutor(BackgroundExecutor):
+    """
+    Run the tasks in a pool of worker processes (`concurrent.futures.ProcessPoolExecutor`).
+
+    Parameters
+    ----------
+    n_workers : int, optional
+        The number of processes. Default is the number of CPUs.
+    tasks_per_worker : int, optional
+        A call is split in at most `n_workers * tasks_per_worker` tasks. Default is 4.
+    """
+
+    def __init__(self, n_workers=None, tasks_per_worker=4):
+        super().__init__(n_workers or os.cpu_count() or 1, tasks_per_worker)
+        self._pool = None
+        self._pool_futures = {}
+
+    def _submit(self, func, args, kwargs):
+        if self._pool is None:
+            self._pool = concurrent.futures.ProcessPoolExecutor(self.n_workers)
+        # The returned future stays pending until the pool future is done so that it
+        # can be cancelled while the task is running
+        future = concurrent.futures.Future()
+        pool_future = self._pool.submit(func, *args, **kwargs)
+        self._pool_futures[future] = pool_future
+        pool_future.add_done_callback(lambda done: self._task_done(future, done))
+        return future
+
+    def _task_done(self, future, pool_future):
+        self._pool_futures.pop(future, None)
+        try:
+            if pool_future.cancelled():
+                future.cancel()
+            elif pool_future.exception() is not None:
+                future.set_exception(pool_future.exception())
+            else:
+                future.set_result(pool_future.result())
+        except concurrent.futures.InvalidStateError:
+            pass  # cancelled in the meantime
+
+    def _cancel(self, tasks):
+        for task in tasks:
+            pool_future = self._pool_futures.pop(task, None)
+            if pool_future is not None:
+                pool_future.cancel()
+        super()._cancel(tasks)
+
+    def shutdown(self):
+        if self._pool is not None:
+            if sys.version_info >= (3, 9):
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            else:  # cancel_futures is new in Python 3.9
+                self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+_WORKER_JS = """
+importScripts("{index_url}pyodide.js");
+const ready = (async () => {{
+    self.pyodide = await loadPyodide({{ indexURL: "{index_url}" }});
+    await self.pyodide.loadPackage("micropip");
+    await self.pyodide.pyimport("micropip").install({packages});
+    self.pyodide.runPython(`{worker_py}`);
+}})();
+self.onmessage = async (event) => {{
+    try {{
+        await ready;
+    }} catch (error) {{
+        self.postMessage({{ id: event.data.id, error: String(error) }});
+        return;
+    }}
+    const payload = self.pyodide.globals.get("_run_task")(event.data.payload);
+    self.postMessage({{ id: event.data.id, payload: payload }}, [payload.buffer]);
+}};
+"""
+
+_WORKER_PY = """
+import os, pickle
+os.environ["PYNAPPLE_CACHE"] = "0"
+from pyodide.ffi import to_js
+
+def _run_task(payload):
+    func, args, kwargs = pickle.loads(payload.to_bytes())
+    try:
+        out = pickle.dumps((True, func(*args, **kwargs)), protocol=5)
+    except Exception as error:
+        try:
+            out = pickle.dumps((False, error), protocol=5)
+        except Exception:
+            out = pickle.dumps((False, RuntimeError(repr(error))), protocol=5)
+    return to_js(out)
+"""
+
+
+_REPL_WHEEL = (
+    "https://pynapple-org.github.io/pynapple-repl/files/pynapple-{}-py3-none-any.whl"
+)
+
+
+def _installed_wheel(name):
+    """URL of the wheel the distribution `name` was installed from, or None."""
+    from importlib.metadata import PackageNotFoundError, distribution
+
+    import js
+
+    try:
+        dist = distribution(name)
+    except PackageNotFoundError:
+        return None
+    # PEP 610 metadata, or the source recorded by micropip
+    source = json.loads(dist.read_text("direct_url.json") or "{}").get("url")
+    source = source or (dist.read_text("PYODIDE_SOURCE") or "").strip()
+    if not source.endswith(".whl"):
+        return None
+    # The workers are started from a blob URL, relative URLs would not resolve
+    return urljoin(str(js.location.href), source)
+
+
+class WebWorkerExecutor(BackgroundExecutor):
+    """
+    Run the tasks in a pool of Pyodide web workers. Only available in Pyodide.
+
+    Each worker loads Pyodide and installs `packages` with micropip when it starts. If
+    the installation fails, the tasks waiting for the workers fail with a RuntimeError.
+
+    Parameters
+    ----------
+    n_workers : int, optional
+        The number of web workers. Default is the number of logical CPUs minus one.
+    tasks_per_worker : int, optional
+        A call is split in at most `n_workers * tasks_per_worker` tasks. Default is 4.
+    packages : list of str, optional
+        The requirements installed in the workers. Default is the wheel of pynapple
+        (and of pynapple-kernels if installed) that is running, or the wheel of the
+        pynapple REPL if its URL is unknown. PyPI pynapple can not be installed in
+        Pyodide as it depends on numba.
+    index_url : str, optional
+        The URL of the Pyodide distribution. Default is the CDN of the running version.
+    """
+
+    def __init__(
+        self, n_workers=None, tasks_per_worker=4, packages=None, index_url=None
+    ):
+        import js
+        import pyodide_js
+        from pyodide.ffi import to_js
+
+        from .. import __version__
+
+        if n_workers is None:
+            n_workers = (js.navigator.hardwareConcurrency or 2) - 1
+        super().__init__(n_workers, tasks_per_worker)
+        if packages is None:
+            packages = [_installed_wheel("pynapple") or _REPL_WHEEL.format(__version__)]
+            kernels = _installed_wheel("pynapple-kernels")
+            if kernels is not None:
+                packages.append(kernels)
+        if index_url is None:
+            index_url = "https://cdn.jsdelivr.net/pyodide/v{}/full/".format(
+                pyodide_js.version
+            )
+        script = _WORKER_JS.format(
+            index_url=index_url, packages=list(packages), worker_py=_WORKER_PY
+        )
+        blob = js.Blob.new(
+            to_js([script]),
+            to_js({"type": "text/javascript"}, dict_converter=js.Object.fromEntries),
+        )
+        self._url = js.URL.createObjectURL(blob)
+        self._queue = deque()  # (id, future, payload) of the waiting tasks
+        self._running = {}  # worker -> (id, future) of its task
+        self._workers = []
+        self._handlers = []
+        self._ids = 0
+
+    def _start_worker(self):
+        import js
+        from pyodide.ffi import create_proxy
+
+        worker = js.Worker.new(self._url)
+        handler = create_proxy(lambda event: self._on_message(worker, event))
+        worker.onmessage = handler
+        self._workers.append(worker)
+        self._handlers.append(handler)
+        return worker
+
+    def _idle_worker(self):
+        for worker in self._workers:
+            if worker not in self._running:
+                return worker
+        if len(self._workers) < self.n_workers:
+            return self._start_worker()
+        return None
+
+    def _dispatch(self):
+        import js
+        from pyodide.ffi import to_js
+
+        while len(self._queue):
+            worker = self._idle_worker()
+            if worker is None:
+                return
+            task_id, future, payload = self._queue.popleft()
+            self._running[worker] = (task_id, future)
+            message = {"id": task_id, "payload": payload}
+            worker.postMessage(to_js(message, dict_converter=js.Object.fromEntries))
+
+    def _on_message(self, worker, event):
+        error = getattr(event.data, "error", None)
+        if error is not None:
+            self._fail(RuntimeError("The web worker could not start: " + str(error)))
+            return
+        task_id, future = self._running.pop(worker, (None, None))
+        if future is not None and task_id == event.data.id and not future.done():
+            ok, out = pickle.loads(event.data.payload.to_bytes())
+            if ok:
+                future.set_result(out)
+            else:
+                future.set_exception(out)
+        self._dispatch()
+
+    def _fail(self, error):
+        # The workers all fail the same way, fail every pending task rather than leave
+        # them waiting
+        futures = [future for _, future, _ in self._queue]
+        futures += [future for _, future in self._running.values()]
+        self.shutdown()
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    def _submit(self, func, args, kwargs):
+        # The future stays pending until the worker answers so that it can be cancelled
+        future = concurrent.futures.Future()
+        payload = pickle.dumps((func, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        self._ids += 1
+        self._queue.append((self._ids, future, payload))
+        self._dispatch()
+        return future
+
+    def _cancel(self, tasks):
+        tasks = set(tasks)
+        self._queue = deque(item for item in self._queue if item[1] not in tasks)
+        for worker, (_, future) in list(self._running.items()):
+            if future in tasks:
+                self._stop_worker(worker)
+        super()._cancel(tasks)
+        self._dispatch()
+
+    def _stop_worker(self, worker):
+        i = self._workers.index(worker)
+        worker.terminate()
+        self._workers.pop(i)
+        self._handlers.pop(i).destroy()
+        self._running.pop(worker, None)
+
+    def shutdown(self):
+        for worker in list(self._workers):
+            self._stop_worker(worker)
+        self._queue.clear()
+
+
+def get_background_executor():
+    """
+    Return the executor used by `background`, created on first use: a `WebWorkerExecutor`
+    in Pyodide and a `ProcessExecutor` otherwise.
+
+    Returns
+    -------
+    BackgroundExecutor
+    """
+    global _default_executor
+    if _default_executor is None:
+        if sys.platform == "emscripten":
+            _default_executor = WebWorkerExecutor()
+        else:
+            _default_executor = ProcessExecutor()
+    return _default_executor
+
+
+def set_background_executor(executor):
+    """
+    Set the executor used by `background`.
+
+    Parameters
+    ----------
+    executor : BackgroundExecutor
+    """
+    global _default_executor
+    if not isinstance(executor, BackgroundExecutor):
+        raise TypeError("executor should be a BackgroundExecutor.")
+    _default_executor = executor
+
+
+def background(func, *args, **kwargs):
+    """
+    Run `func(*args, **kwargs)` in the background.
+
+    Parameters
+    ----------
+    func : callable
+        A function of `pynapple.process` or any function that can be pickled
+    *args, **kwargs
+        The arguments of `func`
+
+    Returns
+    -------
+    BackgroundFuture
+        The future of the result, which can be awaited or cancelled
+
+    Examples
+    --------
+    >>> future = nap.background(nap.compute_autocorrelogram, group, 0.01, 1.0)
+    >>> future.add_progress_callback(lambda done, total: print(done, "/", total))
+    >>> autocorrs = future.result()
+    """
+    return get_background_executor().submit(func, *args, **kwargs)
+
+
+################################
+# Splitting the calls in tasks
+################################
+def _chunks(n_items, n_chunks):
+    """Slices splitting `n_items` in at most `n_chunks` contiguous chunks."""
+    bounds = np.linspace(0, n_items, min(n_items, n_chunks) + 1).astype(int)
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _call(func, bound, **arguments):
+    arguments = dict(bound.arguments, **arguments)
+    call = inspect.BoundArguments(bound.signature, arguments)
+    return func, call.args, call.kwargs
+
+
+def _first(results):
+    return results[0]
+
+
+def _concat_columns(results, columns=True):
+    first = results[0]
+    if isinstance(first, dict):
+        return {key: value for result in results for key, value in result.items()}
+    if isinstance(first, pd.DataFrame):
+        return pd.concat(results, axis=1)
+    d = np.concatenate([result.values for result in results], axis=1)
+    if isinstance(first, nap.TsdFrame):
+        return nap.TsdFrame(
+            t=first.index,
+            d=d,
+            time_support=first.time_support,
+            columns=(
+                np.concatenate([result.columns for result in results])
+                if columns
+                else None
+            ),
+        )
+    return nap.TsdTensor(t=first.index, d=d, time_support=first.time_support)
+
+
+def _concat_rows(results, ep):
+    # (decoded, probabilities) of decode_1d or decode_2d for consecutive epochs
+    decoded = [result[0] for result in results]
+    t = np.concatenate([tsd.index for tsd in decoded])
+    d = np.concatenate([tsd.values for tsd in decoded])
+    if isinstance(decoded[0], nap.TsdFrame):
+        decoded = nap.TsdFrame(t=t, d=d, time_support=ep, columns=decoded[0].columns)
+    else:
+        decoded = nap.Tsd(t=t, d=d, time_support=ep)
+    p = [result[1] for result in results]
+    if isinstance(p[0], nap.TsdFrame):
+        p = nap.TsdFrame(
+            t=t,
+            d=np.concatenate([tsd.values for tsd in p]),
+            time_support=ep,
+            columns=p[0].columns,
+        )
+    else:
+        p = np.concatenate(p)
+    return decoded, p
+
+
+def _split_units(func, bound, n, name="group"):
+    group = bound.arguments[name]
+    if not isinstance(group, nap.TsGroup) or len(group) < 2:
+        return None
+    keys = np.asarray(group.keys())
+    calls = [
+        _call(func, bound, **{name: group[keys[chunk].tolist()]})
+        for chunk in _chunks(len(keys), n)
+    ]
+    return calls, _concat_columns
+
+
+def _crosscorrelogram_pairs(group, refs, reverse, **kwargs):
+    # Cross-correlograms of the pairs (ref, later unit) of compute_crosscorrelogram
+    keys = list(group.keys())
+    results = []
+    for ref in refs:
+        targets = group[keys[keys.index(ref) + 1 :]]
+        pair = (targets, group[[ref]]) if reverse else (group[[ref]], targets)
+        results.append(compute_crosscorrelogram(pair, **kwargs))
+    return pd.concat(results, axis=1)
+
+
+def _split_crosscorrelogram(func, bound, n):
+    if bound.arguments.get("surrogates") is not None:
+        return None
+    group = bound.arguments["group"]
+    if isinstance(group, (tuple, list)):
+        if len(group) != 2 or not isinstance(group[0], nap.TsGroup):
+            return None
+        keys = np.asarray(group[0].keys())
+        calls = [
+            _call(func, bound, group=(group[0][keys[chunk].tolist()], group[1]))
+            for chunk in _chunks(len(keys), n)
+        ]
+        return calls, _concat_columns
+
+    if not isinstance(group, nap.TsGroup) or len(group) < 3:
+        return None
+    # The references are split in chunks with about the same number of pairs
+    keys = np.asarray(group.keys())
+    pairs = np.cumsum(np.arange(len(keys) - 1, 0, -1))
+    bounds = np.searchsorted(
+        pairs, np.linspace(0, pairs[-1], min(n, len(keys) - 1) + 1)[1:-1]
+    )
+    bounds = np.unique(np.r_[0, bounds + 1, len(keys) - 1])
+    kwargs = dict(bound.arguments)
+    del kwargs["group"]
+    reverse = kwargs.pop("reverse", False)
+    calls = [
+        (
+            _crosscorrelogram_pairs,
+            (group[keys[a:].tolist()], keys[a:b].tolist(), reverse),
+            kwargs,
+        )
+        for a, b in zip(bounds[:-1], bounds[1:])
+    ]
+    return calls, _concat_columns
+
+
+def _split_perievent_continuous(func, bound, n):
+    tref = bound.arguments["tref"]
+    if len(tref) < 2:
+        return None
+    calls = [_call(func, bound, tref=tref[chunk]) for chunk in _chunks(len(tref), n)]
+    return calls, lambda results: _concat_columns(results, columns=False)
+
+
+def _split_wavelet_transform(func, bound, n):
+    sig = bound.arguments["sig"]
+    if sig.ndim < 2 or sig.shape[1] < 2:
+        return None
+    calls = [
+        _call(func, bound, sig=sig[:, chunk]) for chunk in _chunks(sig.shape[1], n)
+    ]
+    return calls, _concat_columns
+
+
+def _split_decoding(func, bound, n):
+    group, ep = bound.arguments["group"], bound.arguments["ep"]
+    if not isinstance(group, nap.TsGroup) or len(ep) < 2:
+        return None
+    calls = []
+    for chunk in _chunks(len(ep), n):
+        sub_ep = ep[chunk]
+        calls.append(_call(func, bound, group=group.restrict(sub_ep), ep=sub_ep))
+    return calls, lambda results: _concat_rows(results, ep)
+
+
+_SPLITTERS = {
+    compute_autocorrelogram: _split_units,
+    compute_crosscorrelogram: _split_crosscorrelogram,
+    compute_eventcorrelogram: _split_units,
+    compute_event_trigger_average: _split_units,
+    compute_perievent: lambda func, bound, n: _split_units(
+        func, bound, n, "timestamps"
+    ),
+    compute_perievent_continuous: _split_perievent_continuous,
+    compute_wavelet_transform: _split_wavelet_transform,
+    decode_1d: _split_decoding,
+    decode_2d: _split_decoding,
+}
+
+
+def _split(func, args, kwargs, n):
+    """
+    Split the call `func(*args, **kwargs)` in at most `n` calls.
+
+    Returns
+    -------
+    list of tuple
+        The (function, args, kwargs) of the calls
+    callable
+        Combine the list of results of the calls into the result of `func`
+    """
+    splitter = _SPLITTERS.get(func)
+    if splitter is not None and n > 1:
+        try:
+            bound = inspect.signature(func).bind(*args, **kwargs)
+        except TypeError:
+            bound = None
+        if bound is not None:
+            split = splitter(func, bound, n)
+            if split is not None:
+                return split
+    return [(func, args, kwargs)], _first
@@ -12,9 +12,11 @@ import numpy as np
 # from numba import jit
 
 from .. import core as nap
+from ..core._compiled import compiled
 
 
 # @jit(nopython=True, cache=True)
+@compiled("continuous_perievent")
 def _jitcontinuous_perievent(time_array, time_target_array, starts, ends, windowsize):
     N_epochs = len(starts)
     count = np.zeros((N_epochs, 2), dtype=np.int64)
@@ -71,6 +73,7 @@ def _jitcontinuous_perievent(time_array, time_target_array, starts, ends, window
 
 
 # @jit(nopython=True, cache=True)
+@compiled("perievent_trigger_average")
 def _jitperievent_trigger_average(
     time_array,
     count_array,
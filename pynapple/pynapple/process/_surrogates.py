@@ -0,0 +1,785 @@
+"""
+Batched surrogates of a TsGroup for significance testing.
+
+The functions of `randomize` produce one surrogate per call and build a new TsGroup each
+time. `surrogates` generates `n` surrogates of all the units at once, as a single
+array of shape (n, total number of spikes) in which the spikes of each unit occupy a
+contiguous block of columns:
+
+>>> import pynapple as nap
+>>> surr = nap.surrogates(group, "shift", n=1000, seed=0)
+>>> surr.times.shape
+(1000, 123456)
+>>> counts, t = surr.count(0.1)  # (1000, n_bins, n_units)
+>>> cc, lags = surr.autocorrelogram(0.01, 0.5)  # (1000, n_lags, n_units)
+>>> tc, x = surr.tuning_curves(feature, 30)  # (1000, 30, n_units)
+
+The engines of `Surrogates` work on the array directly and give the same values as
+`TsGroup.count`, `compute_autocorrelogram`, `compute_crosscorrelogram` and
+`compute_1d_tuning_curves` applied to each surrogate, without building the TsGroups.
+A single surrogate can still be materialized with `surr[i]`.
+
+The array holds `8 * n * total_spikes` bytes, e.g. 4 GB for 1000 surrogates of 500 units
+of 1000 spikes. The engines process the surrogates by blocks to bound their own memory.
+"""
+
+import warnings
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from .. import core as nap
+from ..core._core_functions import _bin_bounds
+from ..core._parallel import map_units
+
+_BLOCK_SIZE = 2**22  # Number of values processed at once by the engines
+_TIE_RTOL = 1e-9  # Relative tolerance of the ties with the observed value
+
+
+def surrogates(group, method="shift", n=1000, seed=None, **kwargs):
+    """
+    Generates `n` surrogates of all the units of a TsGroup as a single array.
+
+    The methods follow the functions of `randomize`, applied independently to each unit
+    and each surrogate:
+
+    - 'shift' : shifts all the spikes of a unit of a random amount between `min_shift`
+      (default 0) and `max_shift` (default: length of the time support), wrapping the
+      end of the time support to the beginning (see `shift_timestamps`).
+    - 'jitter' : jitters each spike of a random amount drawn uniformly between
+      `-max_jitter` and `max_jitter` (see `jitter_timestamps`).
+    - 'resample' : draws the spikes uniformly in the time support (see
+      `resample_timestamps`).
+    - 'shuffle' : shuffles the intervals between the spikes (see
+      `shuffle_ts_intervals`).
+
+    The surrogates keep the time support of the group. Spikes falling outside of it
+    (e.g. after jittering) are ignored by the engines, as when building a TsGroup.
+
+    Parameters
+    ----------
+    group : TsGroup
+        The units to randomize
+    method : str, optional
+        'shift' (default), 'jitter', 'resample' or 'shuffle'
+    n : int, optional
+        The number of surrogates. Default is 1000.
+    seed : int, numpy.random.SeedSequence or numpy.random.Generator, optional
+        The seed of the random generator
+    **kwargs
+        The parameters of the method: `min_shift` and `max_shift` for 'shift',
+        `max_jitter` (required) for 'jitter'.
+
+    Returns
+    -------
+    Surrogates
+        The surrogates
+
+    Raises
+    ------
+    TypeError
+        If group is not a TsGroup
+    ValueError
+        If the method or its parameters are not valid
+    """
+    if not isinstance(group, nap.TsGroup):
+        raise TypeError("Invalid input type, should be TsGroup")
+    if method not in _METHODS:
+        raise ValueError(
+            "method should be one of {}, got '{}'.".format(list(_METHODS), method)
+        )
+    if not isinstance(n, (int, np.integer)) or n < 1:
+        raise ValueError("n should be a positive integer.")
+
+    keys = np.asarray(group.keys())
+    arrays = [group[k].index.values for k in keys]
+    lengths = np.array([len(t) for t in arrays], dtype=np.int64)
+    offsets = np.r_[0, np.cumsum(lengths)]
+    times = np.tile(np.hstack(arrays) if len(arrays) else np.zeros(0), (int(n), 1))
+
+    rng = np.random.default_rng(seed)
+    _METHODS[method](times, offsets, group.time_support, rng, **kwargs)
+    return Surrogates(times, offsets, keys, group.time_support)
+
+
+def _generate_shift(times, offsets, time_support, rng, min_shift=0.0, max_shift=None):
+    start_time = time_support.start[0]
+    end_time = time_support.end[0]
+    if max_shift is None:
+        max_shift = end_time - start_time
+    shifts = rng.uniform(min_shift, max_shift, (len(times), len(offsets) - 1))
+    times += np.repeat(shifts, np.diff(offsets), axis=1)
+    np.mod(times, end_time, out=times)
+    times += start_time
+    _sort_units(times, offsets)
+
+
+def _generate_jitter(times, offsets, time_support, rng, max_jitter=None):
+    if max_jitter is None:
+        raise TypeError("missing required argument: max_jitter ")
+    times += rng.uniform(-max_jitter, max_jitter, times.shape)
+    _sort_units(times, offsets)
+
+
+def _generate_resample(times, offsets, time_support, rng):
+    times[:] = rng.uniform(time_support.start[0], time_support.end[0], times.shape)
+    _sort_units(times, offsets)
+
+
+def _generate_shuffle(times, offsets, time_support, rng):
+    for a, b in zip(offsets[:-1], offsets[1:]):
+        if b - a < 2:
+            continue
+        intervals = np.broadcast_to(np.diff(times[0, a:b]), (len(times), b - a - 1))
+        np.cumsum(rng.permuted(intervals, axis=1), axis=1, out=times[:, a + 1 : b])
+        times[:, a + 1 : b] += times[:, a : a + 1]
+
+
+_METHODS = {
+    "shift": _generate_shift,
+    "jitter": _generate_jitter,
+    "resample": _generate_resample,
+    "shuffle": _generate_shuffle,
+}
+
+
+def _sort_units(times, offsets):
+    for a, b in zip(offsets[:-1], offsets[1:]):
+        times[:, a:b].sort(axis=1)
+
+
+def _epoch_of(x, starts, ends):
+    """Epoch of each time point of `x` (bounds included), or -1."""
+    ep = np.searchsorted(starts, x, side="right") - 1
+    inside = ep >= 0
+    inside[inside] = x[inside] <= ends[ep[inside]]
+    ep[~inside] = -1
+    return ep
+
+
+def _surrogate_correlograms(times, offsets, starts, ends, pairs, binsize, windowsize):
+    # Correlograms of the pairs of units of one surrogate, run in parallel by map_units.
+    # Spikes outside of the time support are dropped, as in a TsGroup.
+    # correlograms imports this module
+    from .correlograms import _cross_correlogram
+
+    units = []
+    for a, b in zip(offsets[:-1], offsets[1:]):
+        t = times[a:b]
+        units.append(t[_epoch_of(t, starts, ends) >= 0])
+    values = np.stack(
+        [
+            _cross_correlogram(units[i], units[j], binsize, windowsize)[0]
+            for i, j in pairs
+        ],
+        axis=1,
+    )
+    return values, np.array([len(t) for t in units])
+
+
+class Surrogates:
+    """
+    A batch of surrogates of a TsGroup, as returned by `surrogates`.
+
+    Parameters
+    ----------
+    times : numpy.ndarray
+        The spike times, of shape (n_surrogates, total number of spikes). The spikes of
+        unit `i` are in the columns `offsets[i]:offsets[i + 1]`, sorted.
+    offsets : numpy.ndarray
+        The first column of each unit, followed by the total number of spikes
+    index : numpy.ndarray
+        The keys of the units
+    time_support : IntervalSet
+        The time support of the surrogates
+
+    Attributes
+    ----------
+    times : numpy.ndarray
+        The spike times
+    offsets : numpy.ndarray
+        The first column of each unit, followed by the total number of spikes
+    index : numpy.ndarray
+        The keys of the units
+    time_support : IntervalSet
+        The time support of the surrogates
+    """
+
+    def __init__(self, times, offsets, index, time_support):
+        self.times = times
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.index = np.asarray(index)
+        self.time_support = time_support
+
+    def __repr__(self):
+        return "{}: {} surrogates of {} units ({} spikes)".format(
+            type(self).__name__, len(self), len(self.index), self.times.shape[1]
+        )
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, i):
+        """
+        Materialize the surrogate `i` as a TsGroup. A slice returns the selected
+        surrogates as a Surrogates object.
+        """
+        if isinstance(i, slice):
+            return Surrogates(
+                self.times[i], self.offsets, self.index, self.time_support
+            )
+        row = self.times[i]
+        return nap.TsGroup(
+            {
+                k: nap.Ts(t=row[a:b])
+                for k, a, b in zip(self.index, self.offsets[:-1], self.offsets[1:])
+            },
+            time_support=self.time_support,
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def _units(self):
+        # Unit of each column
+        return np.repeat(np.arange(len(self.index)), np.diff(self.offsets))
+
+    def _blocks(self, size=0):
+        # Slices of surrogates holding about _BLOCK_SIZE values, with `size` values
+        # computed per surrogate
+        step = max(_BLOCK_SIZE // max(self.times.shape[1], size, 1), 1)
+        for i in range(0, len(self), step):
+            yield slice(i, min(i + step, len(self)))
+
+    def _histogram(self, bins, n_bins):
+        """
+        Count the columns of each unit falling in each bin, for each surrogate.
+
+        `bins(block)` returns the bin of each value of the block (-1 outside of the
+        bins), or a list of such arrays if a value can belong to several bins. Values
+        outside of the time support are not counted, as in a TsGroup.
+        """
+        n_units = len(self.index)
+        units = self._units
+        starts, ends = self.time_support.start, self.time_support.end
+        out = np.zeros((len(self), n_bins, n_units), dtype=np.int64)
+        for block in self._blocks():
+            rows = np.arange(block.start, block.stop)[:, None]
+            x = self.times[block]
+            inside = _epoch_of(x, starts, ends) >= 0
+            b = bins(x)
+            for b in b if isinstance(b, list) else [b]:
+                valid = (b >= 0) & inside
+                flat = ((rows - block.start) * n_bins + b) * n_units + units
+                out[block] += np.bincount(
+                    flat[valid], minlength=len(rows) * n_bins * n_units
+                ).reshape(len(rows), n_bins, n_units)
+        return out
+
+    def rates(self):
+        """
+        Rate of each unit in each surrogate, in Hz.
+
+        Returns
+        -------
+        numpy.ndarray
+            The rates, of shape (n_surrogates, n_units)
+        """
+        counts = self._histogram(lambda x: np.zeros(x.shape, dtype=np.int64), 1)
+        return counts[:, 0] / self.time_support.tot_length()
+
+    def count(self, bin_size=None, ep=None, time_units="s"):
+        """
+        Count the spikes of each surrogate within bins of `bin_size` or within the
+        epochs of `ep`, like `TsGroup.count`.
+
+        Parameters
+        ----------
+        bin_size : None or float, optional
+            The bin size. If None, the spikes are counted within each epoch of `ep`.
+        ep : IntervalSet, optional
+            The epochs to bin. Default is the time support of the surrogates.
+        time_units : str, optional
+            Time units of bin size ('us', 'ms', 's' [default])
+
+        Returns
+        -------
+        numpy.ndarray
+            The counts, of shape (n_surrogates, n_bins, n_units)
+        numpy.ndarray
+            The centers of the bins
+        """
+        if bin_size is not None:
+            if isinstance(bin_size, int):
+                bin_size = float(bin_size)
+            if not isinstance(bin_size, float):
+                raise TypeError("bin_size argument should be float or int.")
+        if not isinstance(time_units, str) or time_units not in ["s", "ms", "us"]:
+            raise ValueError("time_units argument should be 's', 'ms' or 'us'.")
+        if ep is None:
+            ep = self.time_support
+        if not isinstance(ep, nap.IntervalSet):
+            raise TypeError("ep argument should be of type IntervalSet")
+
+        starts, ends = ep.start, ep.end
+        if bin_size is None:
+            t = starts + (ends - starts) / 2
+            return self._histogram(lambda x: _epoch_of(x, starts, ends), len(t)), t
+
+        bin_size = nap.TsIndex.format_timestamps(np.array([bin_size]), time_units)[0]
+        t, bin_ep, lbound, rbound = _bin_bounds(starts, ends, bin_size)
+        bin_end = ends[bin_ep]
+
+        def bins(x):
+            # The rounding of the bounds can make consecutive bins overlap slightly,
+            # in which case a spike is counted in both, as in TsGroup.count
+            last = np.searchsorted(lbound, x, side="right") - 1
+            out = []
+            for b in (last, last - 1):
+                valid = b >= 0
+                valid[valid] = (x[valid] < rbound[b[valid]]) & (
+                    x[valid] <= bin_end[b[valid]]
+                )
+                out.append(np.where(valid, b, -1))
+            return out
+
+        return self._histogram(bins, len(t)), t
+
+    def _correlograms(self, pairs, binsize, windowsize, time_units):
+        binsize = nap.TsIndex.format_timestamps(
+            np.array([binsize], dtype=np.float64), time_units
+        )[0]
+        windowsize = nap.TsIndex.format_timestamps(
+            np.array([windowsize], dtype=np.float64), time_units
+        )[0]
+
+        from .correlograms import _cross_correlogram
+
+        lags = _cross_correlogram(np.zeros(1), np.zeros(1), binsize, windowsize)[1]
+        if len(pairs) == 0:
+            counts = np.zeros((len(self), len(self.index)))
+            return np.zeros((len(self), len(lags), 0)), lags, counts
+
+        results = map_units(
+            _surrogate_correlograms,
+            list(self.times),
+            (
+                self.offsets,
+                self.time_support.start,
+                self.time_support.end,
+                pairs,
+                binsize,
+                windowsize,
+            ),
+        )
+        values = np.stack([r[0] for r in results])
+        rates = np.stack([r[1] for r in results]) / self.time_support.tot_length()
+        return values, lags, rates
+
+    def autocorrelogram(self, binsize, windowsize, norm=True, time_units="s"):
+        """
+        Autocorrelograms of each unit of each surrogate, like `compute_autocorrelogram`.
+
+        Parameters
+        ----------
+        binsize : float
+            The bin size
+        windowsize : float
+            The window size
+        norm : bool, optional
+            If True (default), the autocorrelograms are divided by the rate of the unit
+        time_units : str, optional
+            The time units of binsize and windowsize ('s' [default], 'ms', 'us')
+
+        Returns
+        -------
+        numpy.ndarray
+            The autocorrelograms, of shape (n_surrogates, n_lags, n_units)
+        numpy.ndarray
+            The lags
+        """
+        pairs = [(i, i) for i in range(len(self.index))]
+        values, lags, rates = self._correlograms(pairs, binsize, windowsize, time_units)
+        if norm:
+            values = values / rates[:, None, :]
+        values[:, np.round(lags, 6) == 0] = 0.0
+        return values, lags
+
+    def crosscorrelogram(
+        self, binsize, windowsize, norm=True, time_units="s", reverse=False
+    ):
+        """
+        Cross-correlograms of the pairs of units of each surrogate, like
+        `compute_crosscorrelogram` with a single TsGroup.
+
+        The pairs are given by `itertools.combinations` of the units.
+
+        Parameters
+        ----------
+        binsize : float
+            The bin size
+        windowsize : float
+            The window size
+        norm : bool, optional
+            If True (default), the cross-correlograms are divided by the rate of the
+            target unit
+        time_units : str, optional
+            The time units of binsize and windowsize ('s' [default], 'ms', 'us')
+        reverse : bool, optional
+            To reverse the pair order
+
+        Returns
+        -------
+        numpy.ndarray
+            The cross-correlograms, of shape (n_surrogates, n_lags, n_pairs)
+        numpy.ndarray
+            The lags
+        list of tuple
+            The keys of the (reference, target) units of each pair
+        """
+        pairs = list(combinations(range(len(self.index)), 2))
+        if reverse:
+            pairs = [(j, i) for i, j in pairs]
+        values, lags, rates = self._correlograms(pairs, binsize, windowsize, time_units)
+        if norm and len(pairs):
+            values = values / rates[:, None, [j for _, j in pairs]]
+        keys = [(self.index[i], self.index[j]) for i, j in pairs]
+        return values, lags, keys
+
+    def tuning_curves(self, feature, nb_bins, ep=None, minmax=None):
+        """
+        Tuning curves of each unit of each surrogate relative to a 1d feature, like
+        `compute_1d_tuning_curves`.
+
+        Each spike takes the value of the closest sample of the feature within the
+        same epoch of `ep`.
+
+        Parameters
+        ----------
+        feature : Tsd (or TsdFrame with 1 column only)
+            The 1-dimensional target feature (e.g. head-direction)
+        nb_bins : int
+            Number of bins in the tuning curve
+        ep : IntervalSet, optional
+            The epoch on which tuning curves are computed.
+            If None, the epoch is the time support of the feature.
+        minmax : tuple or list, optional
+            The min and max boundaries of the tuning curves.
+            If None, the boundaries are inferred from the target feature
+
+        Returns
+        -------
+        numpy.ndarray
+            The tuning curves, of shape (n_surrogates, nb_bins, n_units)
+        numpy.ndarray
+            The centers of the bins
+        """
+        if isinstance(feature, nap.TsdFrame):
+            if feature.shape[1] != 1:
+                raise RuntimeError(
+                    "feature should be a Tsd (or TsdFrame with 1 column only)"
+                )
+            feature = feature[:, 0]
+        if not isinstance(feature, nap.Tsd):
+            raise RuntimeError(
+                "feature should be a Tsd (or TsdFrame with 1 column only)"
+            )
+        if minmax is not None and len(minmax) != 2:
+            raise ValueError("minmax should be of length 2.")
+        if ep is None:
+            ep = feature.time_support
+
+        if minmax is None:
+            edges = np.linspace(np.nanmin(feature), np.nanmax(feature), nb_bins + 1)
+        else:
+            edges = np.linspace(minmax[0], minmax[1], nb_bins + 1)
+        idx = edges[0:-1] + np.diff(edges) / 2
+
+        starts, ends = ep.start, ep.end
+        restricted = feature.restrict(ep)
+        ft, fv = restricted.index.values, restricted.values
+        bounds = np.searchsorted(
+            _epoch_of(ft, starts, ends), np.arange(len(starts) + 1)
+        )
+
+        def bins(x):
+            ep_x = _epoch_of(x, starts, ends)
+            inside = ep_x >= 0
+            first, last = bounds[ep_x[inside]], bounds[ep_x[inside] + 1]
+            xi = x[inside]
+            # Closest sample of the feature in the same epoch, the later one on ties
+            right = np.clip(np.searchsorted(ft, xi, side="right"), first, last)
+            left = right - 1
+            has_left, has_right = left >= first, right < last
+            dl = np.where(has_left, xi - ft[np.clip(left, 0, None)], np.inf)
+            dr = np.where(has_right, ft[np.minimum(right, len(ft) - 1)] - xi, np.inf)
+            take_right = has_right & (dr <= dl)
+            j = np.where(take_right, right, left)
+            j[take_right] = np.minimum(
+                np.searchsorted(ft, ft[j[take_right]], side="right") - 1,
+                last[take_right] - 1,
+            )
+            v = np.full(x.shape, np.nan)
+            found = has_left | has_right
+            vi = np.full(xi.shape, np.nan)
+            vi[found] = fv[j[found]]
+            v[inside] = vi
+            # Same bins as numpy.histogram, the last edge included
+            b = np.searchsorted(edges, v, side="right") - 1
+            b[v == edges[-1]] = nb_bins - 1
+            b[(b >= nb_bins) | np.isnan(v)] = -1
+            return b
+
+        counts = self._histogram(bins, nb_bins)
+        occupancy, _ = np.histogram(fv, edges)
+        return counts / occupancy[:, None] * feature.rate, idx
+
+
+class _P2Quantiles:
+    """
+    Streaming estimates of quantiles with the P-square algorithm, for arrays of
+    independent elements updated together.
+
+    Each quantile of each element is tracked with 5 markers, whatever the number of
+    observations. NaN observations are skipped.
+
+    Jain, R., & Chlamtac, I. (1985). The P2 algorithm for dynamic calculation of
+    quantiles and histograms without storing observations.
+    Communications of the ACM, 28(10), 1076-1085.
+
+    Parameters
+    ----------
+    quantiles : array_like
+        The quantiles, between 0 and 1
+    size : int
+        The number of elements
+    """
+
+    def __init__(self, quantiles, size):
+        p = np.asarray(quantiles, dtype=np.float64)[:, None]
+        self._dn = np.hstack([0 * p, p / 2, p, (1 + p) / 2, 1 + 0 * p])
+        self._q = np.zeros((len(p), 5, size))
+        self._n = np.tile(np.arange(1.0, 6.0)[:, None], (len(p), 1, size))
+        self._buffer = np.full((5, size), np.nan)
+        self.count = np.zeros(size, dtype=np.int64)
+
+    def update(self, x):
+        """Add one observation of each element."""
+        valid = ~np.isnan(x)
+        first = valid & (self.count < 5)
+        ready = valid & (self.count >= 5)
+        self._buffer[self.count[first], first] = x[first]
+        self.count[valid] += 1
+
+        init = first & (self.count == 5)
+        if init.any():
+            self._q[:, :, init] = np.sort(self._buffer[:, init], axis=0)
+        if ready.any():
+            self._update(x[ready], ready)
+
+    def _update(self, x, mask):
+        q, n = self._q[:, :, mask], self._n[:, :, mask]
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+        # Cell of x between the markers, and shift of the markers above it
+        k = (x >= q[:, 1]).astype(np.int64) + (x >= q[:, 2]) + (x >= q[:, 3])
+        n += np.arange(5)[None, :, None] > k[:, None, :]
+        desired = 1 + (self.count[mask] - 1) * self._dn[:, :, None]
+
+        for i in range(1, 4):
+            d = desired[:, i] - n[:, i]
+            up = (d >= 1) & (n[:, i + 1] - n[:, i] > 1)
+            down = (d <= -1) & (n[:, i - 1] - n[:, i] < -1)
+            s = up.astype(np.float64) - down
+            if not s.any():
+                continue
+            parabolic = q[:, i] + s / (n[:, i + 1] - n[:, i - 1]) * (
+                (n[:, i] - n[:, i - 1] + s)
+                * (q[:, i + 1] - q[:, i])
+                / (n[:, i + 1] - n[:, i])
+                + (n[:, i + 1] - n[:, i] - s)
+                * (q[:, i] - q[:, i - 1])
+                / (n[:, i] - n[:, i - 1])
+            )
+            q_next = np.where(s > 0, q[:, i + 1], q[:, i - 1])
+            n_next = np.where(s > 0, n[:, i + 1], n[:, i - 1])
+            linear = q[:, i] + s * (q_next - q[:, i]) / (n_next - n[:, i])
+            inside = (q[:, i - 1] < parabolic) & (parabolic < q[:, i + 1])
+            q[:, i] = np.where(s != 0, np.where(inside, parabolic, linear), q[:, i])
+            n[:, i] += s
+
+        self._q[:, :, mask], self._n[:, :, mask] = q, n
+
+    def result(self):
+        """
+        The estimated quantiles, of shape (n_quantiles, size). Elements with less than
+        5 observations get the exact quantiles of their observations.
+        """
+        out = self._q[:, 2].copy()
+        few = self.count < 5
+        if few.any():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                out[:, few] = np.nanquantile(
+                    self._buffer[:, few], self._dn[:, 2], axis=0
+                )
+        return out
+
+
+class SurrogateStatistics:
+    """
+    Online statistics of the surrogates of a result, accumulated one block of
+    surrogates at a time in constant memory.
+
+    For each element of the result (e.g. each bin of each cross-correlogram), it keeps
+    the mean and standard deviation of the surrogates, an estimate of the chosen
+    percentiles with a streaming quantile sketch (P-square algorithm) and the number
+    of surrogates above and below the observed value. Surrogate values within a
+    relative tolerance of 1e-9 of the observed value count as ties, on both sides, so
+    that rounding errors of the batched engines do not change the p-values. NaN
+    surrogate values are skipped.
+
+    Parameters
+    ----------
+    observed : pandas.DataFrame
+        The result computed on the data
+    percentiles : tuple of float, optional
+        The percentiles to estimate, between 0 and 100. Default is (2.5, 97.5).
+
+    Attributes
+    ----------
+    observed : pandas.DataFrame
+        The result computed on the data
+    n_surrogates : int
+        The number of surrogates accumulated
+    """
+
+    def __init__(self, observed, percentiles=(2.5, 97.5)):
+        percentiles = np.atleast_1d(np.asarray(percentiles, dtype=np.float64))
+        if np.any((percentiles < 0) | (percentiles > 100)):
+            raise ValueError("percentiles should be between 0 and 100.")
+        self.observed = observed
+        self.n_surrogates = 0
+        self._percentiles = percentiles
+        self._obs = np.asarray(observed.values, dtype=np.float64).ravel()
+        size = len(self._obs)
+        self._count = np.zeros(size, dtype=np.int64)
+        self._mean = np.zeros(size)
+        self._m2 = np.zeros(size)
+        self._greater = np.zeros(size, dtype=np.int64)
+        self._less = np.zeros(size, dtype=np.int64)
+        self._sketch = _P2Quantiles(percentiles / 100, size)
+
+    def __repr__(self):
+        return "{}: {} surrogates, shape {}".format(
+            type(self).__name__, self.n_surrogates, self.observed.shape
+        )
+
+    def update(self, values):
+        """
+        Add surrogates.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            One surrogate, with the shape of `observed`, or a block of surrogates of
+            shape (n, *observed.shape)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape == self.observed.shape:
+            values = values[None]
+        if values.shape[1:] != self.observed.shape:
+            raise ValueError(
+                "Surrogates of shape {} do not match the observed result of shape "
+                "{}.".format(values.shape[1:], self.observed.shape)
+            )
+        for x in values.reshape(len(values), -1):
+            valid = ~np.isnan(x)
+            self._count += valid
+            count = np.maximum(self._count, 1)
+            delta = np.where(valid, x - self._mean, 0.0)
+            self._mean += delta / count
+            self._m2 += np.where(valid, delta * (x - self._mean), 0.0)
+            tie = np.isclose(x, self._obs, rtol=_TIE_RTOL, atol=0.0)
+            self._greater += valid & ((x >= self._obs) | tie)
+            self._less += valid & ((x <= self._obs) | tie)
+            self._sketch.update(x)
+            self.n_surrogates += 1
+
+    def _frame(self, values):
+        return pd.DataFrame(
+            values.reshape(self.observed.shape),
+            index=self.observed.index,
+            columns=self.observed.columns,
+        )
+
+    @property
+    def mean(self):
+        """Mean of the surrogates, as a DataFrame shaped like `observed`."""
+        return self._frame(np.where(self._count > 0, self._mean, np.nan))
+
+    @property
+    def std(self):
+        """Standard deviation of the surrogates (ddof=0), as a DataFrame."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self._frame(np.sqrt(self._m2 / self._count))
+
+    @property
+    def percentiles(self):
+        """Estimated percentiles of the surrogates, as a dict of DataFrames."""
+        estimates = self._sketch.result()
+        return {p: self._frame(e) for p, e in zip(self._percentiles, estimates)}
+
+    def pvalue(self, alternative="two-sided"):
+        """
+        Empirical p-value of the observed result against the surrogates,
+        (1 + number of surrogates at least as extreme) / (1 + number of surrogates).
+
+        Parameters
+        ----------
+        alternative : str, optional
+            'greater' (observed above the surrogates), 'less' or 'two-sided' (default,
+            twice the smallest one-sided p-value)
+
+        Returns
+        -------
+        pandas.DataFrame
+            The p-values, shaped like `observed`
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            greater = (1 + self._greater) / (1 + self._count)
+            less = (1 + self._less) / (1 + self._count)
+        if alternative == "greater":
+            p = greater
+        elif alternative == "less":
+            p = less
+        elif alternative == "two-sided":
+            p = np.minimum(2 * np.minimum(greater, less), 1.0)
+        else:
+            raise ValueError(
+                "alternative should be 'two-sided', 'greater' or 'less', got "
+                "'{}'.".format(alternative)
+            )
+        return self._frame(np.where(np.isnan(self._obs), np.nan, p))
+
+
+def _surrogate_statistics(observed, surrogates, percentiles, func, engine=None):
+    """
+    Accumulate the statistics of `func` over `surrogates`.
+
+    A Surrogates object is processed by blocks with `engine(block)`, which returns the
+    values of a block of surrogates. Any other iterable is processed one surrogate at
+    a time with `func(surrogate)`.
+    """
+    stats = SurrogateStatistics(observed, percentiles)
+    if isinstance(surrogates, Surrogates) and engine is not None:
+        for block in surrogates._blocks(observed.size):
+            stats.update(engine(surrogates[block]))
+    else:
+        for surrogate in surrogates:
+            result = func(surrogate)
+            stats.update(getattr(result, "values", result))
+    return stats
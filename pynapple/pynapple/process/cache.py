@@ -0,0 +1,465 @@
+"""
+Content-addressed cache of the results of the `process` functions.
+
+The key of a result is a hash of the function, of the pynapple version and of the
+arguments: the timestamps, data, time support and metadata of pynapple objects, the
+content of arrays and DataFrames, and the value of the other parameters. Results are
+pickled into a storage backend:
+
+- `DirectoryStorage` keeps one file per result in a local directory.
+- `BrowserStorage` keeps the files in the persistent storage of the browser (IndexedDB)
+  when running in Pyodide.
+
+Any object implementing the methods of `BaseStorage` can be used as a backend. The
+total size of the stored results is bounded and the least recently used results are
+evicted first.
+
+The cache is enabled by default in Pyodide (e.g. JupyterLite), where results persist
+across page reloads. Elsewhere, it is enabled with `enable_cache`:
+
+>>> import pynapple as nap
+>>> nap.process.enable_cache("/tmp/pynapple_cache", max_size=2**30)
+>>> cc = nap.compute_autocorrelogram(group, 0.01, 1.0)  # computed and stored
+>>> cc = nap.compute_autocorrelogram(group, 0.01, 1.0)  # loaded from the cache
+>>> nap.process.get_cache().clear()
+>>> nap.process.disable_cache()
+
+Functions with random outputs (`randomize`) are never cached.
+"""
+
+import abc
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .. import core as nap
+from ..core.utils import _is_pandas
+
+DEFAULT_MAX_SIZE = 2**28
+
+_cache = None
+
+
+class BaseStorage(abc.ABC):
+    """
+    Interface of the storage backends of the result cache.
+
+    Entries are bytes identified by a key (an hexadecimal string).
+    """
+
+    @abc.abstractmethod
+    def get(self, key):
+        """Return the bytes stored under `key`, or None."""
+        pass
+
+    @abc.abstractmethod
+    def set(self, key, data):
+        """Store `data` under `key`."""
+        pass
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """Remove the entry `key`, if it exists."""
+        pass
+
+    @abc.abstractmethod
+    def entries(self):
+        """Return the list of (key, size in bytes, last access time) of the entries."""
+        pass
+
+    def touch(self, key):
+        """Mark the entry `key` as used."""
+        pass
+
+    def flush(self):
+        """Persist the changes made since the last call."""
+        pass
+
+
+class DirectoryStorage(BaseStorage):
+    """
+    Store each entry in a file of a local directory.
+
+    The last access time of an entry is the modification time of its file.
+
+    Parameters
+    ----------
+    path : str or Path
+        The directory. It is created if it does not exist.
+    """
+
+    suffix = ".pkl"
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def __repr__(self):
+        return "{}('{}')".format(type(self).__name__, self.path)
+
+    def _file(self, key):
+        return self.path / (key + self.suffix)
+
+    def get(self, key):
+        try:
+            return self._file(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, data):
+        file = self._file(key)
+        tmp = file.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, file)
+
+    def delete(self, key):
+        try:
+            self._file(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def entries(self):
+        entries = []
+        for file in self.path.glob("*" + self.suffix):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((file.stem, stat.st_size, stat.st_mtime))
+        return entries
+
+    def touch(self, key):
+        try:
+            os.utime(self._file(key))
+        except FileNotFoundError:
+            pass
+
+
+class BrowserStorage(DirectoryStorage):
+    """
+    Store each entry in a file of a directory persisted in the IndexedDB of the browser.
+
+    Only available in Pyodide. The directory is mounted with the IDBFS file system of
+    Emscripten. The stored entries are loaded asynchronously when the storage is created
+    and the changes are written back to IndexedDB after each update of the cache.
+
+    Parameters
+    ----------
+    path : str or Path
+        The mount point of the directory.
+    """
+
+    def __init__(self, path="/home/pyodide/.cache/pynapple"):
+        import js
+        import pyodide_js
+
+        super().__init__(path)
+        self._fs = pyodide_js.FS
+        self._fs.mount(self._fs.filesystems.IDBFS, js.Object.new(), str(self.path))
+        self._sync(populate=True)
+
+    def _sync(self, populate):
+        from pyodide.ffi import create_once_callable
+
+        self._fs.syncfs(populate, create_once_callable(_warn_sync_error))
+
+    def flush(self):
+        self._sync(populate=False)
+
+
+def _warn_sync_error(error):
+    if error:
+        warnings.warn(
+            "Result cache could not be synchronized with IndexedDB: {}".format(error),
+            stacklevel=2,
+        )
+
+
+class ResultCache:
+    """
+    Size-bounded store of pickled results with least-recently-used eviction.
+
+    Parameters
+    ----------
+    storage : BaseStorage
+        The storage backend.
+    max_size : int
+        The maximum total size of the entries, in bytes.
+
+    Attributes
+    ----------
+    hits : int
+        The number of results loaded from the cache.
+    misses : int
+        The number of results that were not in the cache.
+    """
+
+    def __init__(self, storage, max_size=DEFAULT_MAX_SIZE):
+        self.storage = storage
+        self.max_size = int(max_size)
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+
+    def __repr__(self):
+        return "{}({!r}, max_size={}): {} entries, {} bytes".format(
+            type(self).__name__, self.storage, self.max_size, len(self), self.size
+        )
+
+    def __len__(self):
+        return len(self._entries())
+
+    @property
+    def size(self):
+        """Total size of the entries, in bytes."""
+        return sum(self._entries().values())
+
+    def _entries(self):
+        # Size of the entries, from the least to the most recently used
+        if self._index is None:
+            entries = sorted(self.storage.entries(), key=lambda entry: entry[2])
+            self._index = OrderedDict((key, size) for key, size, _ in entries)
+        return self._index
+
+    def get(self, key):
+        """
+        Load the result stored under `key`.
+
+        Returns
+        -------
+        bool
+            True if the result was in the cache
+        object
+            The result, or None
+        """
+        # The storage is asked directly since entries can be added by other sessions
+        data = self.storage.get(key)
+        if data is None:
+            self.misses += 1
+            return False, None
+        try:
+            result = pickle.loads(data)
+        except Exception:
+            self.delete(key)
+            self.misses += 1
+            return False, None
+        index = self._entries()
+        index[key] = len(data)
+        index.move_to_end(key)
+        self.storage.touch(key)
+        self.hits += 1
+        return True, result
+
+    def set(self, key, result):
+        """
+        Store `result` under `key` and evict the least recently used entries if the
+        cache is full. Results that cannot be pickled or that are larger than the
+        cache are not stored.
+        """
+        try:
+            data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        if len(data) > self.max_size:
+            return
+        index = self._entries()
+        self.storage.set(key, data)
+        index[key] = len(data)
+        index.move_to_end(key)
+        total = sum(index.values())
+        while total > self.max_size:
+            old, size = index.popitem(last=False)
+            self.storage.delete(old)
+            total -= size
+        self.storage.flush()
+
+    def delete(self, key):
+        """Remove the entry `key`."""
+        self._entries().pop(key, None)
+        self.storage.delete(key)
+        self.storage.flush()
+
+    def clear(self):
+        """Remove all the entries."""
+        for key in list(self._entries()):
+            self.storage.delete(key)
+        self._index.clear()
+        self.storage.flush()
+
+
+def _default_storage():
+    if sys.platform == "emscripten":
+        return BrowserStorage()
+    return DirectoryStorage(Path.home() / ".cache" / "pynapple")
+
+
+def enable_cache(storage=None, max_size=DEFAULT_MAX_SIZE):
+    """
+    Cache the results of the `process` functions.
+
+    Parameters
+    ----------
+    storage : str, Path or BaseStorage, optional
+        The storage backend, or the directory of a `DirectoryStorage`. By default, the
+        persistent storage of the browser in Pyodide and `~/.cache/pynapple` otherwise.
+    max_size : int, optional
+        The maximum total size of the cached results, in bytes. Default is 256 MB.
+
+    Returns
+    -------
+    ResultCache
+        The cache
+    """
+    global _cache
+    if storage is None:
+        storage = _default_storage()
+    elif isinstance(storage, (str, Path)):
+        storage = DirectoryStorage(storage)
+    elif not isinstance(storage, BaseStorage):
+        raise TypeError("storage should be a path or a BaseStorage.")
+    _cache = ResultCache(storage, max_size)
+    return _cache
+
+
+def disable_cache():
+    """
+    Stop caching the results of the `process` functions. The stored results are kept.
+    """
+    global _cache
+    _cache = None
+
+
+def get_cache():
+    """
+    Return the cache in use, or None if caching is disabled.
+
+    Returns
+    -------
+    ResultCache or None
+    """
+    return _cache
+
+
+class _Unhashable(Exception):
+    pass
+
+
+def _update_array(h, array):
+    array = np.asarray(array)
+    if array.dtype.hasobject:
+        _update(h, array.tolist())
+        return
+    h.update("{}{}".format(array.dtype.str, array.shape).encode())
+    h.update(np.ascontiguousarray(array).reshape(-1).view(np.uint8))
+
+
+def _update_metadata(h, obj):
+    columns = obj.metadata_columns
+    _update(h, list(columns))
+    for column in columns:
+        _update_array(h, obj._metadata[column].values)
+
+
+def _update(h, obj):
+    """Feed the content of `obj` to the hash `h`."""
+    h.update(type(obj).__name__.encode())
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes)):
+        h.update(repr(obj).encode())
+    elif isinstance(obj, np.generic):
+        _update_array(h, np.asarray(obj))
+    elif isinstance(obj, nap.TsGroup):
+        _update(h, list(obj.keys()))
+        for key in obj.keys():
+            _update(h, obj[key])
+        _update_array(h, obj.time_support.values)
+        _update_metadata(h, obj)
+    elif isinstance(obj, nap.IntervalSet):
+        _update_array(h, obj.values)
+        _update_metadata(h, obj)
+    elif isinstance(obj, (nap.Ts, nap.Tsd, nap.TsdFrame, nap.TsdTensor)):
+        _update_array(h, obj.index.values)
+        if not isinstance(obj, nap.Ts):
+            _update_array(h, obj.values)
+        _update_array(h, obj.time_support.values)
+        if isinstance(obj, nap.TsdFrame):
+            _update(h, list(obj.columns))
+            _update_metadata(h, obj)
+    elif _is_pandas(obj, "DataFrame"):
+        _update(h, list(obj.index))
+        _update(h, list(obj.columns))
+        _update_array(h, obj.values)
+    elif _is_pandas(obj, "Series", "Index"):
+        if not _is_pandas(obj, "Index"):
+            _update(h, list(obj.index))
+        _update_array(h, obj.values)
+    elif isinstance(obj, np.ndarray):
+        _update_array(h, obj)
+    elif isinstance(obj, (list, tuple)):
+        h.update(str(len(obj)).encode())
+        for item in obj:
+            _update(h, item)
+    elif isinstance(obj, dict):
+        h.update(str(len(obj)).encode())
+        for key, value in obj.items():
+            _update(h, key)
+            _update(h, value)
+    else:
+        raise _Unhashable(type(obj))
+
+
+def _key(name, arguments):
+    from .. import __version__
+
+    h = hashlib.blake2b(digest_size=20)
+    _update(h, [name, __version__])
+    _update(h, dict(arguments))
+    return h.hexdigest()
+
+
+def cached(func):
+    """
+    Load the result of `func` from the cache, if enabled, or compute and store it.
+
+    The function is called directly if one of its arguments cannot be hashed.
+    """
+    signature = inspect.signature(func)
+    name = "{}.{}".format(func.__module__, func.__qualname__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = _cache
+        if cache is None:
+            return func(*args, **kwargs)
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = _key(name, bound.arguments)
+        except (TypeError, _Unhashable):
+            return func(*args, **kwargs)
+
+        found, result = cache.get(key)
+        if found:
+            return result
+        result = func(*args, **kwargs)
+        cache.set(key, result)
+        return result
+
+    return wrapper
+
+
+# The cache is off in the web workers of `background`, which set PYNAPPLE_CACHE=0
+if sys.platform == "emscripten" and os.environ.get("PYNAPPLE_CACHE") != "0":
+    try:
+        enable_cache()
+    except Exception as error:
+        warnings.warn(
+            "Result cache disabled: {}".format(error), RuntimeWarning, stacklevel=2
+        )
@@ -9,9 +9,14 @@ from numbers import Number
 
 import numpy as np
 import pandas as pd
+
 # from numba import jit
 
 from .. import core as nap
+from ..core._compiled import compiled
+from ..core._parallel import map_units
+from ._surrogates import Surrogates, _surrogate_statistics
+from .cache import cached
 
 
 def _validate_correlograms_inputs(func):
@@ -62,6 +67,7 @@ def _validate_correlograms_inputs(func):
 
 
 # @jit(nopython=True, cache=True)
+@compiled("cross_correlogram")
 def _cross_correlogram(t1, t2, binsize, windowsize):
     """
     Performs the discrete cross-correlogram of two time series.
@@ -130,6 +136,12 @@ def _cross_correlogram(t1, t2, binsize, windowsize):
     return C, B
 
 
+def _autocorrelogram(spk_time, binsize, windowsize):
+    # Autocorrelogram of one unit, run in parallel by map_units
+    return _cross_correlogram(spk_time, spk_time, binsize, windowsize)
+
+
+@cached
 @_validate_correlograms_inputs
 def compute_autocorrelogram(
     group, binsize, windowsize, ep=None, norm=True, time_units="s"
@@ -182,9 +194,12 @@ def compute_autocorrelogram(
         np.array([windowsize], dtype=np.float64), time_units
     )[0]
 
-    for n in newgroup.keys():
-        spk_time = newgroup[n].index
-        auc, times = _cross_correlogram(spk_time, spk_time, binsize, windowsize)
+    results = map_units(
+        _autocorrelogram,
+        [newgroup[n].index.values for n in newgroup.keys()],
+        (binsize, windowsize),
+    )
+    for n, (auc, times) in zip(newgroup.keys(), results):
         autocorrs[n] = pd.Series(index=np.round(times, 6), data=auc, dtype="float")
 
     autocorrs = pd.DataFrame.from_dict(autocorrs)
@@ -199,9 +214,18 @@ def compute_autocorrelogram(
     return autocorrs.astype("float")
 
 
+@cached
 @_validate_correlograms_inputs
 def compute_crosscorrelogram(
-    group, binsize, windowsize, ep=None, norm=True, time_units="s", reverse=False
+    group,
+    binsize,
+    windowsize,
+    ep=None,
+    norm=True,
+    time_units="s",
+    reverse=False,
+    surrogates=None,
+    percentiles=(2.5, 97.5),
 ):
     """
     Computes all the pairwise cross-correlograms for TsGroup or list/tuple of two TsGroup.
@@ -234,19 +258,36 @@ def compute_crosscorrelogram(
         ('s' [default], 'ms', 'us').
     reverse : bool, optional
         To reverse the pair order if input is TsGroup
+    surrogates : Surrogates or iterable, optional
+        Surrogates of the group, e.g. `nap.surrogates(group, "shift", n=1000)` or a
+        generator of randomized TsGroups (of tuples of two TsGroups if group is a
+        tuple). The cross-correlograms of the surrogates are reduced to online
+        statistics, without keeping them in memory.
+    percentiles : tuple of float, optional
+        The percentiles of the surrogates to estimate. Default is (2.5, 97.5).
 
     Returns
     -------
     pandas.DataFrame
         _
+    SurrogateStatistics
+        Only if surrogates is given. The mean, std, percentiles and p-values of the
+        surrogates for each bin of each cross-correlogram.
 
     Raises
     ------
     RuntimeError
         group must be TsGroup or tuple/list of two TsGroups
+    TypeError
+        If group is a tuple and surrogates is a Surrogates object, whose surrogates
+        are single TsGroups
 
     """
-    crosscorrs = {}
+    if isinstance(group, tuple) and isinstance(surrogates, Surrogates):
+        raise TypeError(
+            "surrogates should be an iterable of tuples of two TsGroups when group "
+            "is a tuple, not a Surrogates object of a single TsGroup."
+        )
 
     binsize = nap.TsIndex.format_timestamps(
         np.array([binsize], dtype=np.float64), time_units
@@ -255,6 +296,26 @@ def compute_crosscorrelogram(
         np.array([windowsize], dtype=np.float64), time_units
     )[0]
 
+    crosscorrs = _crosscorrelogram(group, binsize, windowsize, ep, norm, reverse)
+    if surrogates is None:
+        return crosscorrs
+
+    def engine(block):
+        return block.crosscorrelogram(binsize, windowsize, norm, "s", reverse)[0]
+
+    stats = _surrogate_statistics(
+        crosscorrs,
+        surrogates,
+        percentiles,
+        lambda g: _crosscorrelogram(g, binsize, windowsize, ep, norm, reverse),
+        engine if ep is None else None,
+    )
+    return crosscorrs, stats
+
+
+def _crosscorrelogram(group, binsize, windowsize, ep, norm, reverse):
+    crosscorrs = {}
+
     if isinstance(group, tuple):
         if isinstance(ep, nap.IntervalSet):
             newgroup = [group[i].restrict(ep) for i in range(2)]
@@ -300,6 +361,7 @@ def compute_crosscorrelogram(
     return crosscorrs.astype("float")
 
 
+@cached
 @_validate_correlograms_inputs
 def compute_eventcorrelogram(
     group, event, binsize, windowsize, ep=None, norm=True, time_units="s"
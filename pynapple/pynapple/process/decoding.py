@@ -5,8 +5,38 @@ Decoding functions for timestamps data (spike times). The first argument is alwa
 import numpy as np
 
 from .. import core as nap
+from .cache import cached
 
 
+def _edges(centers):
+    # Edges of bins from their centers, assuming the size of the last 2 bins is equal
+    diff = np.diff(centers)
+    bins = centers[:-1] - diff / 2
+    return np.hstack((bins, [bins[-1] + diff[-1], bins[-1] + 2 * diff[-1]]))
+
+
+def _occupancy_1d(tuning_curves, feature):
+    if feature is None:
+        return np.ones(tuning_curves.shape[0])
+    elif isinstance(feature, nap.Tsd):
+        occupancy, _ = np.histogram(feature.values, _edges(tuning_curves.index.values))
+        return occupancy
+    else:
+        raise RuntimeError("Unknown format for feature in decode_1d")
+
+
+def _occupancy_2d(tuning_curve, xy, features):
+    if features is None:
+        return np.ones_like(tuning_curve).flatten()
+    occupancy, _, _ = np.histogram2d(
+        features[:, 0].values,
+        features[:, 1].values,
+        [_edges(xy[0]), _edges(xy[1])],
+    )
+    return occupancy.flatten()
+
+
+@cached
 def decode_1d(tuning_curves, group, ep, bin_size, time_units="s", feature=None):
     """
     Perform Bayesian decoding over a one dimensional feature.
@@ -79,18 +109,7 @@ def decode_1d(tuning_curves, group, ep, bin_size, time_units="s", feature=None):
     else:
         raise RuntimeError("Unknown format for group")
 
-    # Occupancy
-    if feature is None:
-        occupancy = np.ones(tuning_curves.shape[0])
-    elif isinstance(feature, nap.Tsd):
-        diff = np.diff(tuning_curves.index.values)
-        bins = tuning_curves.index.values[:-1] - diff / 2
-        bins = np.hstack(
-            (bins, [bins[-1] + diff[-1], bins[-1] + 2 * diff[-1]])
-        )  # assuming the size of the last 2 bins is equal
-        occupancy, _ = np.histogram(feature.values, bins)
-    else:
-        raise RuntimeError("Unknown format for feature in decode_1d")
+    occupancy = _occupancy_1d(tuning_curves, feature)
 
     # Transforming to pure numpy array
     tc = tuning_curves.values
@@ -123,6 +142,7 @@ def decode_1d(tuning_curves, group, ep, bin_size, time_units="s", feature=None):
     return decoded, p
 
 
+@cached
 def decode_2d(tuning_curves, group, ep, bin_size, xy, time_units="s", features=None):
     """
     Performs Bayesian decoding over 2 dimensional features.
@@ -206,23 +226,7 @@ def decode_2d(tuning_curves, group, ep, bin_size, xy, time_units="s", features=N
 
     indexes = list(tuning_curves.keys())
 
-    # Occupancy
-    if features is None:
-        occupancy = np.ones_like(tuning_curves[indexes[0]]).flatten()
-    else:
-        binsxy = []
-        for i in range(len(xy)):
-            diff = np.diff(xy[i])
-            bins = xy[i][:-1] - diff / 2
-            bins = np.hstack(
-                (bins, [bins[-1] + diff[-1], bins[-1] + 2 * diff[-1]])
-            )  # assuming the size of the last 2 bins is equal
-            binsxy.append(bins)
-
-        occupancy, _, _ = np.histogram2d(
-            features[:, 0].values, features[:, 1].values, [binsxy[0], binsxy[1]]
-        )
-        occupancy = occupancy.flatten()
+    occupancy = _occupancy_2d(tuning_curves[indexes[0]], xy, features)
 
     # Transforming to pure numpy array
     tc = np.array([tuning_curves[i] for i in tuning_curves.keys()])
@@ -262,3 +266,174 @@ def decode_2d(tuning_curves, group, ep, bin_size, xy, time_units="s", features=N
     )
 
     return decoded, p
+
+
+class OnlineBayesianDecoder:
+    """
+    Bayesian decoding of a 1d or 2d feature one time bin at a time, for closed-loop
+    experiments.
+
+    The posterior is the one of `decode_1d` (if tuning_curves is a DataFrame) or
+    `decode_2d` (if tuning_curves is a dict), computed in log space. The terms that do
+    not depend on the counts, i.e. the log of the tuning curves, their sum and the
+    occupancy prior, are computed once. Each call to `update` then only involves the
+    units that spiked.
+
+    With `window` > 1, the posterior of each bin is computed from the counts of the
+    last `window` bins, i.e. as `decode_1d` with a bin size of `window * bin_size`.
+    The sum of the counts over the window is updated incrementally.
+
+    See:
+    Zhang, K., Ginzburg, I., McNaughton, B. L., & Sejnowski, T. J.
+    (1998). Interpreting neuronal population activity by
+    reconstruction: unified framework with application to
+    hippocampal place cells. Journal of neurophysiology, 79(2),
+    1017-1044.
+
+    Parameters
+    ----------
+    tuning_curves : pandas.DataFrame or dict
+        1d tuning curves as returned by `compute_1d_tuning_curves`, or dictionary of
+        2d tuning curves (one for each neuron) as returned by `compute_2d_tuning_curves`
+    bin_size : float
+        Bin size of the counts. Default is second. Use the parameter time_units to
+        change it.
+    xy : tuple, optional
+        For 2d tuning curves, a tuple of bin positions i.e. xy=(x,y)
+    feature : Tsd or TsdFrame, optional
+        The feature used to compute the tuning curves (a TsdFrame with 2 columns for 2d
+        tuning curves). Used to correct for occupancy. If feature is not passed, the
+        occupancy is uniform.
+    window : int, optional
+        The number of bins used to decode each bin. Default is 1.
+    time_units : str, optional
+        Time unit of the bin size ('s' [default], 'ms', 'us').
+
+    Attributes
+    ----------
+    index : numpy.ndarray
+        The units, in the order expected for the counts
+
+    Examples
+    --------
+    >>> decoder = nap.OnlineBayesianDecoder(tc, 0.02, feature=position, window=5)
+    >>> for counts in stream:  # one count per unit every 20 ms
+    ...     position, posterior = decoder.update(counts)
+    """
+
+    def __init__(
+        self, tuning_curves, bin_size, xy=None, feature=None, window=1, time_units="s"
+    ):
+        if isinstance(tuning_curves, dict):
+            if xy is None:
+                raise RuntimeError("xy is required for 2d tuning curves")
+            self.index = np.array(list(tuning_curves.keys()))
+            tc = np.array([tuning_curves[i] for i in self.index])
+            occupancy = _occupancy_2d(tc[0], xy, feature)
+            self._shape = tc.shape[1:]
+            tc = tc.reshape(len(tc), -1)
+            # NaN bins of the tuning curves are ignored, as in decode_2d
+            self._tc_sum = np.nansum(tc, 0)
+            tc = np.where(np.isnan(tc), 1.0, tc)
+            self._positions = np.array(np.meshgrid(*xy, indexing="ij")).reshape(2, -1).T
+        else:
+            self.index = tuning_curves.columns.values
+            tc = tuning_curves.values.T
+            occupancy = _occupancy_1d(tuning_curves, feature)
+            self._shape = tc.shape[1:]
+            self._tc_sum = tc.sum(0)
+            self._positions = tuning_curves.index.values
+
+        if not isinstance(window, (int, np.integer)) or window < 1:
+            raise ValueError("window should be a positive integer.")
+        self.bin_size = nap.TsIndex.format_timestamps(
+            np.array([bin_size], dtype=np.float64), time_units
+        )[0]
+        self.window = int(window)
+
+        # log(tc) of each unit in rows. Spikes of a unit whose tuning curve is 0 at a
+        # position are counted apart, as log(0) cannot be added and removed.
+        with np.errstate(divide="ignore"):
+            self._log_tc = np.ascontiguousarray(np.log(tc))
+            self._log_prior = np.log(occupancy / occupancy.sum())
+        self._zero_tc = tc == 0
+        self._log_tc[self._zero_tc] = 0.0
+
+        n_units, n_positions = self._log_tc.shape
+        self._counts = np.zeros((self.window, n_units))
+        self._sum = np.zeros(n_units)
+        self._log_likelihood = np.zeros(n_positions)
+        self._zeros = np.zeros(n_positions)
+        self.reset()
+
+    def __repr__(self):
+        return "{}: {} units, {} positions, window of {} bins of {} s".format(
+            type(self).__name__,
+            len(self.index),
+            self._log_tc.shape[1],
+            self.window,
+            self.bin_size,
+        )
+
+    def reset(self):
+        """Empty the window of counts."""
+        self._counts[:] = 0
+        self._sum[:] = 0
+        self._log_likelihood[:] = 0
+        self._zeros[:] = 0
+        self._n = 0
+
+    def _add(self, counts):
+        units = np.flatnonzero(counts)
+        if len(units):
+            c = counts[units]
+            self._log_likelihood += c @ self._log_tc[units]
+            self._zeros += c @ self._zero_tc[units]
+
+    def update(self, counts):
+        """
+        Add the counts of a new bin and decode it.
+
+        Parameters
+        ----------
+        counts : array_like
+            The spike count of each unit in the bin, in the order of `index`
+
+        Returns
+        -------
+        float or numpy.ndarray
+            The decoded feature (MAP estimate), as a (x, y) array in 2d
+        numpy.ndarray
+            The posterior distribution of the feature, of the shape of the tuning
+            curves
+        """
+        counts = np.asarray(counts, dtype=np.float64).ravel()
+        if len(counts) != len(self._sum):
+            raise RuntimeError("Different shapes for tuning_curves and counts")
+
+        slot = self._n % self.window
+        old = self._counts[slot]
+        if slot == 0 and self._n >= self.window:
+            # Sum the window again from time to time to avoid rounding drift
+            self._sum += counts - old
+            self._counts[slot] = counts
+            self._log_likelihood[:] = 0
+            self._zeros[:] = 0
+            self._add(self._sum)
+        else:
+            self._add(counts - old)
+            self._sum += counts - old
+            self._counts[slot] = counts
+        self._n += 1
+
+        n_bins = min(self._n, self.window)
+        log_p = (
+            self._log_prior
+            - n_bins * self.bin_size * self._tc_sum
+            + self._log_likelihood
+        )
+        log_p[self._zeros > 0] = -np.inf
+        idxmax = np.argmax(log_p)
+        p = np.exp(log_p - log_p[idxmax])
+        p /= p.sum()
+        return self._positions[idxmax], p.reshape(self._shape)
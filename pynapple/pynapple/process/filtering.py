@@ -10,6 +10,7 @@ import pandas as pd
 from scipy.signal import butter, sosfiltfilt, sosfreqz
 
 from .. import core as nap
+from .cache import cached
 
 
 def _validate_filtering_inputs(func):
@@ -226,6 +227,7 @@ def _compute_filter(
         raise ValueError("Unrecognized filter mode. Choose either 'butter' or 'sinc'")
 
 
+@cached
 def apply_bandpass_filter(
     data, cutoff, fs=None, mode="butter", order=4, transition_bandwidth=0.02
 ):
@@ -284,6 +286,7 @@ def apply_bandpass_filter(
     )
 
 
+@cached
 def apply_bandstop_filter(
     data, cutoff, fs=None, mode="butter", order=4, transition_bandwidth=0.02
 ):
@@ -342,6 +345,7 @@ def apply_bandstop_filter(
     )
 
 
+@cached
 def apply_highpass_filter(
     data, cutoff, fs=None, mode="butter", order=4, transition_bandwidth=0.02
 ):
@@ -400,6 +404,7 @@ def apply_highpass_filter(
     )
 
 
+@cached
 def apply_lowpass_filter(
     data, cutoff, fs=None, mode="butter", order=4, transition_bandwidth=0.02
 ):
@@ -10,6 +10,7 @@ import numpy as np
 
 from .. import core as nap
 from ._process_functions import _perievent_continuous, _perievent_trigger_average
+from .cache import cached
 
 
 def _validate_perievent_inputs(func):
@@ -86,6 +87,7 @@ def _align_tsd(tsd, tref, window, new_time_support):
     return group
 
 
+@cached
 @_validate_perievent_inputs
 def compute_perievent(timestamps, tref, minmax, time_unit="s", **kwargs):
     """
@@ -145,6 +147,7 @@ def compute_perievent(timestamps, tref, minmax, time_unit="s", **kwargs):
         return _align_tsd(timestamps, tref, window, new_time_support)
 
 
+@cached
 @_validate_perievent_inputs
 def compute_perievent_continuous(
     timeseries, tref, minmax, ep=None, time_unit="s", **kwargs
@@ -223,6 +226,7 @@ def compute_perievent_continuous(
         return nap.TsdTensor(t=time_idx, d=new_data_array, time_support=time_support)
 
 
+@cached
 @_validate_perievent_inputs
 def compute_event_trigger_average(
     group,
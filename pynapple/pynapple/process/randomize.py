@@ -5,6 +5,7 @@ Functions to shuffle timestamps to create surrogate datasets.
 import numpy as np
 
 from .. import core as nap
+from ..core._parallel import map_units, spawn_generators
 
 
 def shift_timestamps(ts, min_shift=0.0, max_shift=None):
@@ -198,11 +199,9 @@ def _shift_tsgroup(tsgroup, min_shift=0, max_shift=None):
     if max_shift is None:
         max_shift = end_time - start_time
 
-    shifted_tsgroup = {}
-    for k in tsgroup.keys():
-        shift = np.random.uniform(min_shift, max_shift)
-        shifted_timestamps = (tsgroup[k].times() + shift) % end_time + start_time
-        shifted_tsgroup[k] = nap.Ts(t=np.sort(shifted_timestamps))
+    shifted_tsgroup = _map_tsgroup(
+        _shift_times, tsgroup, (min_shift, max_shift, start_time, end_time)
+    )
     return nap.TsGroup(shifted_tsgroup, time_support=tsgroup.time_support)
 
 
@@ -259,12 +258,7 @@ def _jitter_tsgroup(tsgroup, max_jitter=None, keep_tsupport=False):
         The jittered timestamps
     """
 
-    jittered_tsgroup = {}
-    for k in tsgroup.keys():
-        jittered_timestamps = tsgroup[k].times() + np.random.uniform(
-            -max_jitter, max_jitter, len(tsgroup[k])
-        )
-        jittered_tsgroup[k] = nap.Ts(t=np.sort(jittered_timestamps))
+    jittered_tsgroup = _map_tsgroup(_jitter_times, tsgroup, (max_jitter,))
 
     if keep_tsupport:
         jittered_tsgroup = nap.TsGroup(
@@ -314,10 +308,7 @@ def _resample_tsgroup(tsgroup):
     start_time = tsgroup.time_support.start[0]
     end_time = tsgroup.time_support.end[0]
 
-    resampled_tsgroup = {}
-    for k in tsgroup.keys():
-        resampled_timestamps = np.random.uniform(start_time, end_time, len(tsgroup[k]))
-        resampled_tsgroup[k] = nap.Ts(t=np.sort(resampled_timestamps))
+    resampled_tsgroup = _map_tsgroup(_resample_times, tsgroup, (start_time, end_time))
 
     return nap.TsGroup(resampled_tsgroup, time_support=tsgroup.time_support)
 
@@ -360,6 +351,37 @@ def _shuffle_intervals_tsgroup(tsgroup):
     tsGroup
         The TsGroup with shuffled intervals.
     """
-    randomized_tsgroup = {k: _shuffle_intervals_ts(tsgroup[k]) for k in tsgroup.keys()}
+    randomized_tsgroup = _map_tsgroup(_shuffle_intervals_times, tsgroup)
 
     return nap.TsGroup(randomized_tsgroup)
+
+
+# Per-unit functions of the TsGroup strategies, run in parallel by map_units
+def _map_tsgroup(func, tsgroup, args=()):
+    """Apply `func(t, rng, *args)` to the timestamps of each unit, with one generator per unit."""
+    keys = list(tsgroup.keys())
+    times = map_units(
+        func,
+        [tsgroup[k].index.values for k in keys],
+        args,
+        rngs=spawn_generators(len(keys)),
+    )
+    return {k: nap.Ts(t=t) for k, t in zip(keys, times)}
+
+
+def _shift_times(t, rng, min_shift, max_shift, start_time, end_time):
+    shift = rng.uniform(min_shift, max_shift)
+    return np.sort((t + shift) % end_time + start_time)
+
+
+def _jitter_times(t, rng, max_jitter):
+    return np.sort(t + rng.uniform(-max_jitter, max_jitter, len(t)))
+
+
+def _resample_times(t, rng, start_time, end_time):
+    return np.sort(rng.uniform(start_time, end_time, len(t)))
+
+
+def _shuffle_intervals_times(t, rng):
+    intervals = rng.permutation(np.diff(t))
+    return np.hstack([t[0], t[0] + np.cumsum(intervals)])
@@ -12,6 +12,7 @@ import pandas as pd
 from scipy import signal
 
 from .. import core as nap
+from .cache import cached
 
 
 # @njit
@@ -66,6 +67,7 @@ def _validate_spectrum_inputs(func):
     return wrapper
 
 
+@cached
 @_validate_spectrum_inputs
 def compute_fft(sig, fs=None, ep=None, full_range=False, norm=False, n=None):
     """
@@ -125,6 +127,7 @@ def compute_fft(sig, fs=None, ep=None, full_range=False, norm=False, n=None):
     return ret
 
 
+@cached
 @_validate_spectrum_inputs
 def compute_power_spectral_density(sig, fs=None, ep=None, full_range=False, n=None):
     """
@@ -189,6 +192,7 @@ def compute_power_spectral_density(sig, fs=None, ep=None, full_range=False, n=No
     return psd
 
 
+@cached
 @_validate_spectrum_inputs
 def compute_mean_power_spectral_density(
     sig, interval_size, fs=None, overlap=0.25, ep=None, full_range=False, time_unit="s"
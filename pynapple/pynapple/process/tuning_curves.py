@@ -12,6 +12,8 @@ import numpy as np
 import pandas as pd
 
 from .. import core as nap
+from ._surrogates import _surrogate_statistics
+from .cache import cached
 
 
 def _validate_tuning_inputs(func):
@@ -81,6 +83,7 @@ def _validate_tuning_inputs(func):
     return wrapper
 
 
+@cached
 @_validate_tuning_inputs
 def compute_discrete_tuning_curves(group, dict_ep):
     """
@@ -132,8 +135,17 @@ def compute_discrete_tuning_curves(group, dict_ep):
     return tuning_curves
 
 
+@cached
 @_validate_tuning_inputs
-def compute_1d_tuning_curves(group, feature, nb_bins, ep=None, minmax=None):
+def compute_1d_tuning_curves(
+    group,
+    feature,
+    nb_bins,
+    ep=None,
+    minmax=None,
+    surrogates=None,
+    percentiles=(2.5, 97.5),
+):
     """
     Computes 1-dimensional tuning curves relative to a 1d feature.
 
@@ -151,11 +163,20 @@ def compute_1d_tuning_curves(group, feature, nb_bins, ep=None, minmax=None):
     minmax : tuple or list, optional
         The min and max boundaries of the tuning curves.
         If None, the boundaries are inferred from the target feature
+    surrogates : Surrogates or iterable, optional
+        Surrogates of the group, e.g. `nap.surrogates(group, "shift", n=1000)` or a
+        generator of randomized TsGroups. The tuning curves of the surrogates are
+        reduced to online statistics, without keeping them in memory.
+    percentiles : tuple of float, optional
+        The percentiles of the surrogates to estimate. Default is (2.5, 97.5).
 
     Returns
     -------
     pandas.DataFrame
         DataFrame to hold the tuning curves
+    SurrogateStatistics
+        Only if surrogates is given. The mean, std, percentiles and p-values of the
+        surrogates for each bin of each tuning curve.
 
     Raises
     ------
@@ -168,6 +189,21 @@ def compute_1d_tuning_curves(group, feature, nb_bins, ep=None, minmax=None):
     if ep is None:
         ep = feature.time_support
 
+    tuning_curves = _tuning_curves_1d(group, feature, nb_bins, ep, minmax)
+    if surrogates is None:
+        return tuning_curves
+
+    stats = _surrogate_statistics(
+        tuning_curves,
+        surrogates,
+        percentiles,
+        lambda g: _tuning_curves_1d(g, feature, nb_bins, ep, minmax),
+        lambda block: block.tuning_curves(feature, nb_bins, ep, minmax)[0],
+    )
+    return tuning_curves, stats
+
+
+def _tuning_curves_1d(group, feature, nb_bins, ep, minmax):
     if minmax is None:
         bins = np.linspace(np.nanmin(feature), np.nanmax(feature), nb_bins + 1)
     else:
@@ -190,6 +226,7 @@ def compute_1d_tuning_curves(group, feature, nb_bins, ep=None, minmax=None):
     return tuning_curves
 
 
+@cached
 @_validate_tuning_inputs
 def compute_2d_tuning_curves(group, features, nb_bins, ep=None, minmax=None):
     """
@@ -274,8 +311,17 @@ def compute_2d_tuning_curves(group, features, nb_bins, ep=None, minmax=None):
     return tc, xy
 
 
+@cached
 @_validate_tuning_inputs
-def compute_1d_mutual_info(tc, feature, ep=None, minmax=None, bitssec=False):
+def compute_1d_mutual_info(
+    tc,
+    feature,
+    ep=None,
+    minmax=None,
+    bitssec=False,
+    surrogates=None,
+    percentiles=(2.5, 97.5),
+):
     """
     Mutual information of a tuning curve computed from a 1-d feature.
 
@@ -300,11 +346,23 @@ def compute_1d_mutual_info(tc, feature, ep=None, minmax=None, bitssec=False):
     bitssec : bool, optional
         By default, the function return bits per spikes.
         Set to true for bits per seconds
+    surrogates : Surrogates or iterable, optional
+        Surrogates of the group of the tuning curves, e.g.
+        `nap.surrogates(group, "shift", n=1000)`, or an iterable of randomized
+        TsGroups or of surrogate tuning curves. The tuning curves of the surrogate
+        groups are computed like tc with `compute_1d_tuning_curves`. The mutual
+        information of the surrogates is reduced to online statistics, without keeping
+        them in memory.
+    percentiles : tuple of float, optional
+        The percentiles of the surrogates to estimate. Default is (2.5, 97.5).
 
     Returns
     -------
     pandas.DataFrame
         Spatial Information (default is bits/spikes)
+    SurrogateStatistics
+        Only if surrogates is given. The mean, std, percentiles and p-values of the
+        mutual information of the surrogates.
     """
     if isinstance(tc, pd.DataFrame):
         columns = tc.columns.values
@@ -326,23 +384,44 @@ def compute_1d_mutual_info(tc, feature, ep=None, minmax=None, bitssec=False):
     occupancy = occupancy / occupancy.sum()
     occupancy = occupancy[:, np.newaxis]
 
-    fr = np.sum(fx * occupancy, 0)
-    fxfr = fx / fr
+    SI = pd.DataFrame(
+        index=columns, columns=["SI"], data=_mutual_info_1d(fx, occupancy, bitssec)
+    )
+    if surrogates is None:
+        return SI
+
+    def func(surrogate):
+        if isinstance(surrogate, nap.TsGroup):
+            tc_ep = feature.time_support if ep is None else ep
+            surrogate = _tuning_curves_1d(
+                surrogate, feature, nb_bins - 1, tc_ep, minmax
+            )
+        fx = np.asarray(surrogate, dtype=np.float64)
+        return _mutual_info_1d(fx, occupancy, bitssec)[..., None]
+
+    def engine(block):
+        values = block.tuning_curves(feature, nb_bins - 1, ep, minmax)[0]
+        return _mutual_info_1d(values, occupancy, bitssec)[..., None]
+
+    stats = _surrogate_statistics(SI, surrogates, percentiles, func, engine)
+    return SI, stats
+
+
+def _mutual_info_1d(fx, occupancy, bitssec):
+    # Mutual information of the tuning curves in the last two axes (bins, units)
+    fr = np.sum(fx * occupancy, -2)
+    fxfr = fx / fr[..., None, :]
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
         logfx = np.log2(fxfr)
     logfx[np.isinf(logfx)] = 0.0
-    SI = np.sum(occupancy * fx * logfx, 0)
-
-    if bitssec:
-        SI = pd.DataFrame(index=columns, columns=["SI"], data=SI)
-        return SI
-    else:
+    SI = np.sum(occupancy * fx * logfx, -2)
+    if not bitssec:
         SI = SI / fr
-        SI = pd.DataFrame(index=columns, columns=["SI"], data=SI)
-        return SI
+    return SI
 
 
+@cached
 @_validate_tuning_inputs
 def compute_2d_mutual_info(dict_tc, features, ep=None, minmax=None, bitssec=False):
     """
@@ -426,6 +505,7 @@ def compute_2d_mutual_info(dict_tc, features, ep=None, minmax=None, bitssec=Fals
         return SI
 
 
+@cached
 @_validate_tuning_inputs
 def compute_1d_tuning_curves_continuous(
     tsdframe, feature, nb_bins, ep=None, minmax=None
@@ -496,6 +576,7 @@ def compute_1d_tuning_curves_continuous(
     return tc
 
 
+@cached
 @_validate_tuning_inputs
 def compute_2d_tuning_curves_continuous(
     tsdframe, features, nb_bins, ep=None, minmax=None
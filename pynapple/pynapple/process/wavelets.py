@@ -11,6 +11,7 @@ the function `nap.generate_morlet_filterbank` to plot the wavelets.
 import numpy as np
 
 from .. import core as nap
+from .cache import cached
 
 
 def _morlet(M=1024, gaussian_width=1.5, window_length=1.0, precision=8):
@@ -41,6 +42,7 @@ def _morlet(M=1024, gaussian_width=1.5, window_length=1.0, precision=8):
     )
 
 
+@cached
 def compute_wavelet_transform(
     sig, freqs, fs=None, gaussian_width=1.5, window_length=1.0, precision=16, norm="l1"
 ):
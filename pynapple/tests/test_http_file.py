@@ -0,0 +1,196 @@
+"""Tests of the remote NWB files read over HTTP range requests"""
+
+import asyncio
+import re
+import threading
+from datetime import datetime, timezone
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+
+import pynapple as nap
+from pynapple.io._http_file import _HTTPRangeFile
+
+pynwb = pytest.importorskip("pynwb")
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serve the files of a directory with support of the HTTP Range header.
+
+    The byte ranges of the requests are recorded in `server.requests`. If
+    `server.ignore_range` is True, the whole file is returned as some servers do.
+    """
+
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            self.send_error(404)
+            return
+
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match is None or self.server.ignore_range:
+            self.server.requests.append((0, len(content)))
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+            return
+
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(content) - 1), len(content) - 1) + 1
+        self.server.requests.append((start, end))
+        self.send_response(206)
+        self.send_header(
+            "Content-Range", "bytes {}-{}/{}".format(start, end - 1, len(content))
+        )
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+        self.wfile.write(content[start:end])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server(tmp_path):
+    """A local range server of `tmp_path`, as its base URL."""
+    handler = partial(RangeRequestHandler, directory=str(tmp_path))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.requests = []
+    httpd.ignore_range = False
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, "http://127.0.0.1:{}/".format(httpd.server_address[1])
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def nwb_path(tmp_path):
+    """A small NWB file with a time series, units and epochs."""
+    nwbfile = pynwb.NWBFile(
+        session_description="test",
+        identifier="test",
+        session_start_time=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+    rng = np.random.default_rng(0)
+    nwbfile.add_acquisition(
+        pynwb.TimeSeries(
+            name="lfp",
+            data=rng.standard_normal((10000, 3)),
+            timestamps=np.arange(10000) / 100.0,
+            unit="mV",
+        )
+    )
+    for i in range(3):
+        nwbfile.add_unit(spike_times=np.sort(rng.uniform(0, 100, 500)))
+    nwbfile.add_epoch(start_time=0.0, stop_time=40.0)
+    nwbfile.add_epoch(start_time=60.0, stop_time=100.0)
+
+    path = tmp_path / "session.nwb"
+    with pynwb.NWBHDF5IO(path, "w") as io:
+        io.write(nwbfile)
+    return path
+
+
+@pytest.mark.parametrize("ignore_range", [False, True])
+def test_http_range_file_read(server, nwb_path, ignore_range):
+    httpd, url = server
+    httpd.ignore_range = ignore_range
+    content = nwb_path.read_bytes()
+    f = _HTTPRangeFile(url + nwb_path.name, block_size=1000, cache_size=10000)
+    assert f.size == len(content)
+
+    rng = np.random.default_rng(1)
+    for start in rng.integers(0, len(content), 20):
+        f.seek(start)
+        assert f.read(2500) == content[start : start + 2500]
+
+    # larger than the cache
+    f.seek(10)
+    assert f.read(20000) == content[10:20010]
+    f.seek(-5, 2)
+    assert f.read(100) == content[-5:]
+    assert f.read(100) == b""
+
+
+def test_http_range_file_cache(server, nwb_path):
+    httpd, url = server
+    f = _HTTPRangeFile(url + nwb_path.name, block_size=1000)
+    httpd.requests.clear()
+    f.seek(1500)
+    f.read(1000)  # blocks 1 and 2 in one request
+    assert httpd.requests == [(1000, 3000)]
+    f.seek(2500)
+    f.read(1000)  # block 2 is cached
+    assert httpd.requests == [(1000, 3000), (3000, 4000)]
+
+
+def test_http_range_file_prefetch(server, nwb_path):
+    httpd, url = server
+    content = nwb_path.read_bytes()
+    f = _HTTPRangeFile(url + nwb_path.name, block_size=100)
+    httpd.requests.clear()
+
+    # Overlapping and contiguous ranges are merged, then split by 64 blocks
+    ranges = [(0, 150), (120, 300), (300, 350), (1000, 1001), (2000, 10000)]
+    asyncio.run(f.prefetch(ranges))
+    assert sorted(httpd.requests) == [
+        (0, 400),
+        (1000, 1100),
+        (2000, 8400),
+        (8400, 10000),
+    ]
+
+    httpd.requests.clear()
+    for start, end in ranges:
+        f.seek(start)
+        assert f.read(end - start) == content[start:end]
+    assert httpd.requests == []
+
+    # Cached blocks are not fetched again
+    asyncio.run(f.prefetch([(0, 500)]))
+    assert httpd.requests == [(400, 500)]
+
+
+def test_load_nwb_over_http(server, nwb_path):
+    httpd, url = server
+    local = nap.load_file(nwb_path)
+    remote = nap.load_file(url + nwb_path.name)
+    assert isinstance(remote, nap.NWBFile)
+    assert remote.keys() == local.keys()
+
+    lfp = remote["lfp"]
+    assert isinstance(lfp, nap.TsdFrame)
+    np.testing.assert_array_equal(lfp.index, local["lfp"].index)
+    np.testing.assert_array_equal(lfp.values, local["lfp"].values)
+
+    units = remote["units"]
+    assert isinstance(units, nap.TsGroup)
+    for k in units.keys():
+        np.testing.assert_array_equal(units[k].index, local["units"][k].index)
+
+    np.testing.assert_array_equal(remote["epochs"].values, local["epochs"].values)
+    local.close()
+    remote.close()
+
+
+def test_prefetch_nwb_over_http(server, nwb_path):
+    httpd, url = server
+    remote = nap.load_file(url + nwb_path.name)
+    asyncio.run(remote.prefetch("lfp"))
+
+    httpd.requests.clear()
+    lfp = remote["lfp"]
+    lfp.values[:]  # the data of lazy objects was prefetched
+    assert httpd.requests == []
+
+    units = asyncio.run(remote.aget("units"))
+    assert isinstance(units, nap.TsGroup)
+    assert len(units) == 3
+    remote.close()
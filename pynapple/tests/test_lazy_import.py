@@ -0,0 +1,47 @@
+"""Tests of the lazy import of the io and process packages"""
+
+import subprocess
+import sys
+
+import pytest
+
+import pynapple as nap
+
+
+def run(code):
+    """Run `code` in a fresh interpreter, as the import state matters here."""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.split()
+
+
+def test_import_is_lazy():
+    modules = run(
+        "import sys, pynapple\n"
+        "print(*[m for m in sys.modules if m.split('.')[0] in "
+        "('scipy', 'pynwb', 'pynapple')])"
+    )
+    assert "pynapple.core" in modules
+    assert not any(m.startswith(("pynapple.io", "pynapple.process")) for m in modules)
+    assert not any(m.startswith(("scipy", "pynwb")) for m in modules)
+
+
+@pytest.mark.parametrize("package", ["io", "process"])
+def test_lazy_names(package):
+    # The names bound by a star import of the package in a fresh interpreter
+    names = run(
+        "ns = {{}}\n"
+        "exec('from pynapple.{} import *', ns)\n"
+        "print(*[n for n in ns if not n.startswith('_')])".format(package)
+    )
+    assert sorted(nap._LAZY_NAMES[package]) == sorted(names)
+
+
+@pytest.mark.parametrize(
+    "name", [n for names in nap._LAZY_NAMES.values() for n in names]
+)
+def test_lazy_attributes(name):
+    package = nap._LAZY_MODULES[name]
+    assert getattr(nap, name) is getattr(getattr(nap, package), name)
+    assert name in dir(nap)
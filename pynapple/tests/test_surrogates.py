@@ -0,0 +1,68 @@
+"""Tests of the batched surrogates and of their online statistics"""
+
+import numpy as np
+import pytest
+
+import pynapple as nap
+
+
+@pytest.fixture
+def group():
+    rng = np.random.default_rng(2)
+    return nap.TsGroup(
+        {
+            i: nap.Ts(np.sort(rng.uniform(0, 100, rng.integers(20, 400))))
+            for i in range(4)
+        }
+    )
+
+
+def test_crosscorrelogram_pvalue_batch_and_list(group):
+    # Correlogram values repeat, so the observed value is often equal to surrogate
+    # values up to the rounding errors of the engine.
+    surr = nap.surrogates(group, "shift", n=100, seed=0)
+    _, batch = nap.compute_crosscorrelogram(group, 0.01, 0.1, surrogates=surr)
+    _, single = nap.compute_crosscorrelogram(group, 0.01, 0.1, surrogates=list(surr))
+
+    np.testing.assert_allclose(batch.mean.values, single.mean.values, atol=1e-12)
+    for alternative in ["two-sided", "greater", "less"]:
+        np.testing.assert_array_equal(
+            batch.pvalue(alternative).values, single.pvalue(alternative).values
+        )
+
+
+@pytest.fixture
+def jittered():
+    # Jittered spikes fall outside of the time support of the group
+    rng = np.random.default_rng(0)
+    group = nap.TsGroup(
+        {i: nap.Ts(np.sort(rng.uniform(0, 100, 500))) for i in range(3)},
+        time_support=nap.IntervalSet(0, 100),
+    )
+    return nap.surrogates(group, "jitter", n=5, seed=0, max_jitter=3.0)
+
+
+def test_count_outside_time_support(jittered):
+    ep = nap.IntervalSet(-5, 105)
+    counts, t = jittered.count(1.0, ep)
+    for i, surrogate in enumerate(jittered):
+        expected = surrogate.count(1.0, ep)
+        np.testing.assert_array_equal(t, expected.index)
+        np.testing.assert_array_equal(counts[i], expected.values)
+    np.testing.assert_allclose(
+        jittered.rates(), [s.rates.values for s in jittered], rtol=1e-12
+    )
+
+
+def test_tuning_curves_outside_time_support(jittered):
+    t = np.arange(-5, 105, 0.1)
+    feature = nap.Tsd(t=t, d=np.sin(t))
+    tc, _ = jittered.tuning_curves(feature, 10)
+    for i, surrogate in enumerate(jittered):
+        expected = nap.compute_1d_tuning_curves(surrogate, feature, 10)
+        np.testing.assert_allclose(tc[i], expected.values, rtol=1e-12)
+
+    observed = nap.compute_1d_tuning_curves(jittered[0], feature, 10)
+    _, batch = nap.compute_1d_mutual_info(observed, feature, surrogates=jittered)
+    _, single = nap.compute_1d_mutual_info(observed, feature, surrogates=list(jittered))
+    np.testing.assert_allclose(batch.mean.values, single.mean.values, rtol=1e-12)
@@ -0,0 +1,142 @@
+"""
+Parity and per-bin latency of `OnlineBayesianDecoder`.
+
+The posteriors of the online decoder are compared with `decode_1d` and `decode_2d` on
+random place fields and Poisson counts. The latency of `update` is then measured bin by
+bin. The script exits with an error if the outputs differ or if the 99th percentile of
+the latency is above the target.
+
+    $ python scripts/benchmark_decoder.py --path pynapple
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+
+def place_fields(n_units, shape, rng, peak=20.0):
+    """Gaussian place fields on a grid of `shape` (1d or 2d), in Hz."""
+    grids = np.meshgrid(*[np.linspace(0, 1, n) for n in shape], indexing="ij")
+    centers = rng.uniform(0, 1, (n_units, len(shape)))
+    d2 = np.zeros((n_units, *shape))
+    for i, g in enumerate(grids):
+        d2 += (g[None] - centers[:, i].reshape((-1,) + (1,) * len(shape))) ** 2
+    return 0.1 + peak * np.exp(-d2 / (2 * 0.1**2))
+
+
+def decoders(n_units=200, n_positions=100, grid=(50, 50), bin_size=0.02, seed=0):
+    """The 1d and 2d cases, as (name, decoder, reference function, rates of the units)."""
+    import pandas as pd
+
+    import pynapple as nap
+    from pynapple.process.decoding import decode_1d, decode_2d
+
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 1, n_positions)
+    tc1 = pd.DataFrame(place_fields(n_units, (n_positions,), rng).T, index=x)
+    feature = nap.Tsd(t=np.arange(10000.0), d=rng.uniform(0, 1, 10000))
+
+    xy = tuple(np.linspace(0, 1, n) for n in grid)
+    fields = place_fields(n_units, grid, rng)
+    tc2 = {i: fields[i] for i in range(n_units)}
+    features = nap.TsdFrame(t=np.arange(10000.0), d=rng.uniform(0, 1, (10000, 2)))
+
+    def reference_1d(counts):
+        group = nap.TsdFrame(
+            t=np.arange(len(counts)) * bin_size, d=counts, columns=tc1.columns
+        )
+        return decode_1d(tc1, group, group.time_support, bin_size, feature=feature)
+
+    def reference_2d(counts):
+        group = nap.TsdFrame(t=np.arange(len(counts)) * bin_size, d=counts)
+        _, p = decode_2d(
+            tc2, group, group.time_support, bin_size, xy, features=features
+        )
+        return None, p
+
+    return [
+        (
+            "1d ({} positions)".format(n_positions),
+            nap.OnlineBayesianDecoder(tc1, bin_size, feature=feature),
+            reference_1d,
+            tc1.values.T,
+        ),
+        (
+            "2d ({}x{} positions)".format(*grid),
+            nap.OnlineBayesianDecoder(tc2, bin_size, xy=xy, feature=features),
+            reference_2d,
+            fields.reshape(n_units, -1),
+        ),
+    ]
+
+
+def counts_for(tc, n_bins, bin_size, rng):
+    """Poisson counts of the units at random positions."""
+    positions = rng.integers(0, tc.shape[1], n_bins)
+    return rng.poisson(tc[:, positions].T * bin_size).astype(float)
+
+
+def run(n_bins=2000, n_units=200, bin_size=0.02, seed=0):
+    """
+    Check and time the decoder.
+
+    Returns
+    -------
+    list of tuple
+        The name, the median, 99th percentile and maximum latency of update (s)
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for name, decoder, reference, tc in decoders(n_units, bin_size=bin_size):
+        counts = counts_for(tc, n_bins, bin_size, rng)
+
+        _, expected = reference(counts[:200])
+        expected = np.asarray(expected)
+        decoder.reset()
+        for ct, p in zip(counts[:200], expected):
+            _, posterior = decoder.update(ct)
+            np.testing.assert_allclose(
+                posterior, p, rtol=1e-6, atol=1e-12, err_msg=name
+            )
+
+        decoder.reset()
+        latency = np.zeros(n_bins)
+        for i, ct in enumerate(counts):
+            t0 = time.perf_counter()
+            decoder.update(ct)
+            latency[i] = time.perf_counter() - t0
+        results.append(
+            (name, np.median(latency), np.percentile(latency, 99), latency.max())
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=None, help="Folder containing pynapple")
+    parser.add_argument("-n", type=int, default=2000, help="Number of bins")
+    parser.add_argument("--units", type=int, default=200, help="Number of units")
+    parser.add_argument("--bin-size", type=float, default=0.02, help="In seconds")
+    parser.add_argument("--target", type=float, default=1.0, help="In milliseconds")
+    args = parser.parse_args()
+
+    if args.path:
+        sys.path.insert(0, args.path)
+
+    print(
+        "{:<24}{:>14}{:>14}{:>14}".format(
+            "decoder", "median (ms)", "p99 (ms)", "max (ms)"
+        )
+    )
+    slow = False
+    for name, median, p99, worst in run(args.n, args.units, args.bin_size):
+        print(
+            "{:<24}{:>14.3f}{:>14.3f}{:>14.3f}".format(
+                name, median * 1e3, p99 * 1e3, worst * 1e3
+            )
+        )
+        slow |= p99 * 1e3 > args.target
+    if slow:
+        sys.exit("The latency is above the target of {} ms".format(args.target))
@@ -0,0 +1,93 @@
+"""
+Import-time benchmark of pynapple.
+
+Each run imports pynapple in a fresh interpreter, runs a few core operations on
+Ts, Tsd, TsdFrame, TsGroup and IntervalSet objects and checks that the heavy modules loaded lazily
+(io, process, scipy, pandas, ...) were not imported.
+The script exits with an error if one of them was imported or if the median import
+time is above --max-time.
+
+    $ python scripts/benchmark_import.py --path pynapple-repl --max-time 1.0
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+LAZY_MODULES = [
+    "pynapple.io",
+    "pynapple.process",
+    "scipy",
+    "pynwb",
+    "h5py",
+    "rich",
+    "xml.dom.minidom",
+    "pandas",
+]
+
+SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import pynapple as nap
+t1 = time.perf_counter()
+ts = nap.Ts(t=[0.0, 1.0, 2.0])
+tsd = nap.Tsd(t=[0.0, 1.0, 2.0], d=[1.0, 2.0, 3.0])
+ep = nap.IntervalSet(start=[0.0, 1.5], end=[1.0, 2.5])
+ep.union(tsd.time_support).intersect(ep).set_diff(nap.IntervalSet(0.5, 0.6))
+ts.restrict(ep).count(0.5)
+tsd.bin_average(0.5, ep)
+frame = nap.TsdFrame(t=[0.0, 1.0, 2.0], d=[[1.0, 2.0]] * 3, columns=["a", "b"])
+frame.restrict(ep)["a"].bin_average(0.5)
+group = nap.TsGroup({0: ts, 3: nap.Ts(t=[0.5, 2.2])})
+group.restrict(ep).count(0.5)
+group[[3]].count(ep=ep)
+print(json.dumps({
+    "import_time": t1 - t0,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def run(path=None, repeat=5):
+    """Import pynapple `repeat` times in new interpreters.
+
+    Returns
+    -------
+    list of float
+        The import times
+    list of str
+        The lazy modules that were loaded
+    """
+    env_path = [path] if path else []
+    code = "import sys; sys.path[:0] = %r\n" % env_path + SNIPPET % LAZY_MODULES
+    times, loaded = [], set()
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(result["import_time"])
+        loaded.update(result["loaded"])
+    return times, sorted(loaded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=None, help="Folder containing pynapple")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-time", type=float, default=None)
+    args = parser.parse_args()
+
+    times, loaded = run(args.path, args.repeat)
+    median = statistics.median(times)
+    print("import pynapple: median {:.3f} s over {} runs".format(median, len(times)))
+
+    errors = []
+    if len(loaded):
+        errors.append("modules imported eagerly: {}".format(", ".join(loaded)))
+    if args.max_time is not None and median > args.max_time:
+        errors.append("import time above {} s".format(args.max_time))
+    if errors:
+        sys.exit("\n".join(errors))
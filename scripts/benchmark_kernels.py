@@ -0,0 +1,158 @@
+"""
+Parity and speed of the compiled kernels of pynapple-kernels.
+
+Each kernel is compared with the Python function it replaces (`func.py_func`) on random
+inputs. The script exits with an error if pynapple-kernels is not installed or if one
+of the outputs differs.
+
+    $ pip install ./kernels
+    $ python scripts/benchmark_kernels.py --path pynapple
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+
+def _epochs(m, span, rng):
+    """Starts and ends of `m` non-overlapping epochs within [0, span)."""
+    bounds = np.sort(rng.uniform(0, span, 2 * m))
+    return bounds[0::2], bounds[1::2]
+
+
+def cases(n=100000, m=100, seed=0):
+    """Arguments of each kernel, as (name, function, args)."""
+    from pynapple.core import _jitted_functions as jf
+    from pynapple.process import _process_functions as pf
+    from pynapple.process import correlograms
+
+    rng = np.random.default_rng(seed)
+    t = np.sort(rng.uniform(0, n, n))
+    t2 = np.sort(rng.uniform(0, n, n // 2))
+    starts, ends = _epochs(m, n, rng)
+
+    idx, count = jf.jitrestrict_with_count.py_func(t, starts, ends)
+    idx2, count2 = jf.jitrestrict_with_count.py_func(t2, starts, ends)
+    tr = t[idx]
+    data = rng.standard_normal(len(tr))
+
+    s1, e1 = _epochs(10 * m, n, rng)
+    s2, e2 = _epochs(10 * m, n, rng)
+
+    # Binned counts and a regularly sampled signal, as in compute_event_trigger_average
+    bin_size = 0.5
+    eta_starts, eta_ends = np.array([0.0, n / 20]), np.array([n / 40, n / 10])
+    bins = np.hstack([np.arange(s, e, bin_size) for s, e in zip(eta_starts, eta_ends)])
+    signal_t = np.hstack([np.arange(s, e, 0.1) for s, e in zip(eta_starts, eta_ends)])
+    counts = rng.poisson(1.0, (len(bins), 4)).astype(float)
+    return [
+        ("restrict", jf.jitrestrict, (t, starts, ends)),
+        ("restrict_with_count", jf.jitrestrict_with_count, (t, starts, ends)),
+        (
+            "value_from before",
+            jf.jitvaluefrom,
+            (tr, t2[idx2], count, count2, starts, 0),
+        ),
+        (
+            "value_from closest",
+            jf.jitvaluefrom,
+            (tr, t2[idx2], count, count2, starts, 1),
+        ),
+        ("value_from after", jf.jitvaluefrom, (tr, t2[idx2], count, count2, starts, 2)),
+        ("in_interval", jf.jitin_interval, (t, starts, ends)),
+        ("remove_nan", jf.jitremove_nan, (t, rng.random(n) > 0.7)),
+        ("threshold", jf.jitthreshold, (tr, data, starts, ends, 0.3, "above")),
+        ("intersect", jf.jitintersect, (s1, e1, s2, e2)),
+        ("union", jf.jitunion, (s1, e1, s2, e2)),
+        ("diff", jf.jitdiff, (s1, e1, s2, e2)),
+        ("union_isets", jf.jitunion_isets, (np.r_[s1, s2], np.r_[e1, e2])),
+        (
+            "fix_iset",
+            jf._jitfix_iset,
+            (np.sort(rng.uniform(0, n, n)), np.sort(rng.uniform(0, n, n))),
+        ),
+        (
+            "cross_correlogram",
+            correlograms._cross_correlogram,
+            (t[: n // 10], t2, 0.1, 2.0),
+        ),
+        (
+            "continuous_perievent",
+            pf._jitcontinuous_perievent,
+            (t, t2[::100], starts, ends, np.array([10, 20])),
+        ),
+        (
+            "perievent_trigger_average",
+            pf._jitperievent_trigger_average,
+            (
+                bins,
+                counts,
+                signal_t,
+                rng.standard_normal((len(signal_t), 3)),
+                eta_starts,
+                eta_ends,
+                np.array([5, 5]),
+                bin_size,
+            ),
+        ),
+    ]
+
+
+def _assert_equal(a, b, name):
+    if isinstance(a, tuple):
+        assert len(a) == len(b), name
+        for x, y in zip(a, b):
+            _assert_equal(x, y, name)
+        return
+    a, b = np.asarray(a), np.asarray(b)
+    assert a.shape == b.shape, "{}: shape {} != {}".format(name, a.shape, b.shape)
+    if np.issubdtype(b.dtype, np.floating):
+        np.testing.assert_allclose(a, b, rtol=1e-12, atol=1e-12, err_msg=name)
+    else:
+        np.testing.assert_array_equal(a, b, err_msg=name)
+
+
+def _time(func, args, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = func(*args)
+    return (time.perf_counter() - t0) / repeat, out
+
+
+def run(n=100000, repeat=3):
+    """Check and time each kernel.
+
+    Returns
+    -------
+    list of tuple
+        The name, the time of the Python function and the time of the kernel
+    """
+    results = []
+    for name, func, args in cases(n):
+        t_py, expected = _time(func.py_func, args, 1)
+        t_c, out = _time(func, args, repeat)
+        _assert_equal(out, expected, name)
+        results.append((name, t_py, t_c))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default=None, help="Folder containing pynapple")
+    parser.add_argument("-n", type=int, default=100000, help="Number of timestamps")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.path:
+        sys.path.insert(0, args.path)
+
+    from pynapple.core import _compiled
+
+    if _compiled.pynapple_kernels is None:
+        sys.exit("pynapple-kernels is not installed")
+
+    print("{:<28}{:>12}{:>12}{:>10}".format("kernel", "python (s)", "C (s)", "speedup"))
+    for name, t_py, t_c in run(args.n, args.repeat):
+        print("{:<28}{:>12.4f}{:>12.5f}{:>10.0f}".format(name, t_py, t_c, t_py / t_c))
@@ -0,0 +1,56 @@
+"""
+Build the wheels of the optional pynapple-kernels package (see kernels/).
+
+The native wheel is built with `python -m build`. The Pyodide wheel is built with
+`pyodide build` (pyodide-build, with the Emscripten toolchain matching the Pyodide
+version of the REPL). The Pyodide wheel is skipped if pyodide-build is not installed.
+
+    $ python scripts/build_kernels.py --out dist
+"""
+
+import argparse
+import pathlib
+import shutil
+import subprocess
+import sys
+
+KERNELS_FOLDER = pathlib.Path(__file__).resolve().parents[1] / "kernels"
+
+
+def build_native(out, src=KERNELS_FOLDER):
+    """Build the wheel of pynapple-kernels for the current interpreter."""
+    subprocess.run(
+        [sys.executable, "-m", "build", "--wheel", "--outdir", str(out), str(src)],
+        check=True,
+    )
+
+
+def build_emscripten(out, src=KERNELS_FOLDER):
+    """Build the Pyodide wheel of pynapple-kernels. Returns False if pyodide-build is missing."""
+    if shutil.which("pyodide") is None:
+        print("pyodide-build not found, skipping the Pyodide wheel of pynapple-kernels")
+        return False
+    subprocess.run(
+        ["pyodide", "build", str(src), "--outdir", str(pathlib.Path(out).resolve())],
+        check=True,
+    )
+    return True
+
+
+def build_kernels(out, native=True, emscripten=True):
+    out = pathlib.Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    if native:
+        build_native(out)
+    if emscripten:
+        build_emscripten(out)
+    print("Kernels built!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", default="dist", help="Output folder of the wheels")
+    parser.add_argument("--no-native", action="store_true")
+    parser.add_argument("--no-emscripten", action="store_true")
+    args = parser.parse_args()
+    build_kernels(args.out, not args.no_native, not args.no_emscripten)